@@ -1,5 +1,6 @@
 import streamlit as st
-import leafmap.foliumap as leafmap
+
+from queimadas.scheduler import format_status, start_scheduler
 
 st.set_page_config(layout="wide")
 
@@ -11,5 +12,6 @@ st.sidebar.title("Projeto Integrador II")
 st.sidebar.info(markdown)
 logo = "https://www.ufms.br/wp-content/uploads/2015/11/ufms_logo_assinatura_vertical_positiva.png"
 st.sidebar.image(logo)
+st.sidebar.caption(format_status(start_scheduler().status()))
 
 st.title("Dashboard Interativo de Risco de Queimadas em Propriedades Rurais Brasileiras")
\ No newline at end of file
@@ -0,0 +1,180 @@
+"""Arquivo histórico: ingestão e consultas com filtros empurrados ao Parquet.
+
+Gera ``--years`` anos de arquivos mensais sintéticos (``--rows-per-month``
+focos cada), arquiva todos com `archive.ingest` e mede algumas consultas
+típicas das páginas (estado e bioma são atribuídos pela posição, como nos
+arquivos reais). Para cada uma, mostra quantos arquivos e grupos de
+linhas sobraram depois dos filtros (de quantos existem) e compara com ler
+o período inteiro para o pandas e filtrar depois.
+
+Uso: python benchmarks/bench_archive.py [--years 3] [--rows-per-month 100000]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from queimadas import archive  # noqa: E402
+from queimadas.synthetic import generate_hotspots  # noqa: E402
+
+PANTANAL = (-58.5, -22.0, -54.5, -16.0)
+
+
+# centro aproximado dos estados do gerador sintético
+CENTROS = {
+    "AMAZONAS": (-64.0, -4.0),
+    "PARÁ": (-52.0, -4.0),
+    "MARANHÃO": (-45.0, -5.0),
+    "TOCANTINS": (-48.0, -10.0),
+    "MATO GROSSO": (-56.0, -13.0),
+    "MATO GROSSO DO SUL": (-55.0, -20.0),
+}
+
+
+def localize(df):
+    """Estado e bioma coerentes com a posição, como nos arquivos reais
+    (no gerador sintético eles são sorteados independentemente)."""
+    lon = df["lon"].to_numpy("float64")
+    lat = df["lat"].to_numpy("float64")
+    nomes = list(CENTROS)
+    centros = np.array(list(CENTROS.values()))
+    distancia = (lon[:, None] - centros[:, 0]) ** 2 + (
+        lat[:, None] - centros[:, 1]
+    ) ** 2
+    df["estado"] = pd.Categorical.from_codes(distancia.argmin(axis=1), nomes)
+    bioma = np.select(
+        [
+            (lon >= -58.5) & (lon <= -54.5) & (lat >= -22) & (lat <= -16),
+            lat > -8,
+            lat < -25,
+            lon > -42,
+        ],
+        ["Pantanal", "Amazônia", "Pampa", "Mata Atlântica"],
+        "Cerrado",
+    )
+    df["bioma"] = pd.Categorical(bioma)
+    return df
+
+
+def write_month(directory, year, month, n):
+    df = generate_hotspots(n, day=date(year, month, 1), seed=year * 100 + month)
+    df = localize(df)
+    # espalha os focos pelos dias do mês
+    dias = np.random.default_rng(month).integers(0, 28, n).astype("timedelta64[D]")
+    df["data_hora_gmt"] = df["data_hora_gmt"] + dias
+    path = Path(directory) / f"focos_mensal_br_{year}{month:02d}.csv"
+    df.to_csv(path, index=False, date_format="%Y-%m-%d %H:%M:%S")
+    return path
+
+
+def scanned(dados, filtro):
+    """(arquivos, grupos de linhas) que sobrevivem ao filtro."""
+    fragmentos = list(dados.get_fragments(filter=filtro))
+    grupos = sum(
+        len(f.split_by_row_group(filtro, schema=dados.schema)) for f in fragmentos
+    )
+    return len(fragmentos), grupos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--rows-per-month", type=int, default=100_000)
+    args = parser.parse_args()
+
+    anos = list(range(2024 - args.years + 1, 2025))
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        arquivos = [
+            write_month(tmp, a, m, args.rows_per_month)
+            for a in anos
+            for m in range(1, 13)
+        ]
+        destino = tmp / "arquivo"
+        pa.default_memory_pool().release_unused()
+        inicio = time.perf_counter()
+        for path in arquivos:
+            archive.ingest(path, destino)
+        ingestao = time.perf_counter() - inicio
+        pico = pa.default_memory_pool().max_memory()
+        total = len(arquivos) * args.rows_per_month
+        print(
+            f"ingestão: {total:,} focos em {len(arquivos)} arquivos · "
+            f"{ingestao:.1f} s ({total / ingestao:,.0f} focos/s) · "
+            f"pico Arrow {pico / 2**20:.0f} MiB"
+        )
+
+        dados = archive.dataset(destino)
+        todos = scanned(dados, None)
+        consultas = {
+            "1 semana, Pantanal": dict(
+                start=date(anos[-1], 9, 1),
+                end=date(anos[-1], 9, 7),
+                biomas=["Pantanal"],
+            ),
+            "temporada (jul–out), Pantanal": dict(
+                start=date(anos[-1], 7, 1),
+                end=date(anos[-1], 10, 31),
+                biomas=["Pantanal"],
+            ),
+            f"{args.years} anos, retângulo do Pantanal": dict(
+                start=date(anos[0], 1, 1), end=date(anos[-1], 12, 31), bbox=PANTANAL
+            ),
+            f"{args.years} anos, MS": dict(
+                start=date(anos[0], 1, 1),
+                end=date(anos[-1], 12, 31),
+                estados=["MATO GROSSO DO SUL"],
+            ),
+            f"{args.years} anos, tudo": dict(
+                start=date(anos[0], 1, 1), end=date(anos[-1], 12, 31)
+            ),
+        }
+        colunas = ["lat", "lon", "frp", "bioma", "estado", "municipio"]
+        print(
+            f"{'consulta':<32}{'focos':>10}{'ms':>8}{'arquivos':>12}"
+            f"{'grupos':>12}{'sem filtro na leitura':>24}"
+        )
+        for nome, filtros in consultas.items():
+            melhor = float("inf")
+            for _ in range(3):
+                inicio = time.perf_counter()
+                df = archive.query(columns=colunas, archive_dir=destino, **filtros)
+                melhor = min(melhor, time.perf_counter() - inicio)
+            arqs, grupos = scanned(dados, archive.build_filter(**filtros))
+
+            # mesmo resultado lendo tudo e filtrando no pandas
+            inicio = time.perf_counter()
+            bruto = dados.to_table(columns=[*colunas, "data_hora_gmt"]).to_pandas()
+            inicio_f = filtros.get("start")
+            fim_f = filtros.get("end")
+            mask = bruto["data_hora_gmt"].between(str(inicio_f), f"{fim_f} 23:59:59")
+            if "biomas" in filtros:
+                mask &= bruto["bioma"].isin(filtros["biomas"])
+            if "estados" in filtros:
+                mask &= bruto["estado"].isin(filtros["estados"])
+            if "bbox" in filtros:
+                minx, miny, maxx, maxy = filtros["bbox"]
+                mask &= bruto["lon"].between(minx, maxx) & bruto["lat"].between(
+                    miny, maxy
+                )
+            assert int(mask.sum()) == len(df), (nome, int(mask.sum()), len(df))
+            sem = time.perf_counter() - inicio
+
+            print(
+                f"{nome:<32}{len(df):>10,}{melhor * 1000:>8.0f}"
+                f"{f'{arqs}/{todos[0]}':>12}{f'{grupos}/{todos[1]}':>12}"
+                f"{sem * 1000:>21.0f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Mapas de fundo pelo cache em disco contra buscar cada tile no servidor.
+
+Sobe o servidor substituto (`make_standin_server`) com ``--latency``
+segundos por pedido, no lugar do servidor remoto, e o proxy local sobre um
+cache num diretório temporário. Mede uma tela de ``--viewport`` pixels
+sobre o Pantanal em vários zooms, em XYZ e WMS, como o navegador a pede
+(6 conexões): direto no servidor, pelo proxy com o cache vazio, de novo
+pelo proxy e depois de reabrir o cache (como num reinício do app). Em
+seguida, pré-carrega o Brasil e o Pantanal e mostra quantos pedidos
+chegaram ao servidor, a taxa de acertos e o LRU com um limite pequeno.
+
+Uso: python benchmarks/bench_basemaps.py [--latency 0.1]
+"""
+
+import argparse
+import math
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import quote, urlencode
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from queimadas import basemaps  # noqa: E402
+from queimadas.tiles import mercator  # noqa: E402
+
+CENTRO = (-56.5, -19.0)
+ZOOMS = (6, 8, 10)
+
+
+def viewport(z, largura, altura):
+    """Tiles (z, x, y) de uma tela de `largura` × `altura` px em CENTRO."""
+    x, y = mercator(*CENTRO)
+    cx, cy = float(x) * 2**z * 256, float(y) * 2**z * 256
+    return [
+        (z, tx, ty)
+        for tx in range(
+            math.floor((cx - largura / 2) / 256),
+            math.floor((cx + largura / 2) / 256) + 1,
+        )
+        for ty in range(
+            math.floor((cy - altura / 2) / 256), math.floor((cy + altura / 2) / 256) + 1
+        )
+    ]
+
+
+def browse(urls):
+    def get(url):
+        with urllib.request.urlopen(url) as resposta:
+            return len(resposta.read())
+
+    inicio = time.perf_counter()
+    # o navegador abre ~6 conexões por origem
+    with ThreadPoolExecutor(6) as executor:
+        list(executor.map(get, urls))
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--viewport", type=int, nargs=2, default=[1280, 700])
+    args = parser.parse_args()
+
+    remoto = basemaps.make_standin_server(port=0, latency=args.latency)
+    threading.Thread(target=remoto.serve_forever, daemon=True).start()
+    xyz = f"{remoto.server_url}/xyz/{{z}}/{{x}}/{{y}}.png"
+    wms = f"{remoto.server_url}/wms"
+    telas = [t for z in ZOOMS for t in viewport(z, *args.viewport)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = basemaps.DiskCache(tmp)
+        proxy = basemaps.make_proxy_server(cache, port=0)
+        threading.Thread(target=proxy.serve_forever, daemon=True).start()
+        proxy.allowed.add(remoto.server_address[0] + f":{remoto.server_port}")
+
+        def pelo_proxy():
+            # as URLs que o Leaflet monta a partir de proxy_xyz/proxy_wms
+            base = f"{proxy.server_url}/xyz/{{z}}/{{x}}/{{y}}?u={quote(xyz, safe='')}"
+            urls = [basemaps.xyz_url(base, z, x, y) for z, x, y in telas]
+            wms_proxy = f"{proxy.server_url}/wms?u={quote(wms, safe='')}"
+            urls += [
+                f"{wms_proxy}&{urlencode(basemaps.wms_params('FOCOS', z, x, y))}"
+                for z, x, y in telas
+            ]
+            return urls
+
+        direto = basemaps.xyz_tile_urls(xyz, telas) + basemaps.wms_tile_urls(
+            wms, "FOCOS", telas
+        )
+        linhas = [("direto no servidor", browse(direto), remoto.config["pedidos"])]
+        for rotulo in ("proxy, cache vazio", "proxy, de novo"):
+            antes = remoto.config["pedidos"]
+            linhas.append(
+                (rotulo, browse(pelo_proxy()), remoto.config["pedidos"] - antes)
+            )
+
+        # reinício: um cache novo sobre o mesmo diretório
+        proxy.cache = basemaps.DiskCache(tmp)
+        antes = remoto.config["pedidos"]
+        linhas.append(
+            (
+                "proxy, após reinício",
+                browse(pelo_proxy()),
+                remoto.config["pedidos"] - antes,
+            )
+        )
+
+        print(
+            f"tela de {args.viewport[0]}×{args.viewport[1]} px nos zooms "
+            f"{', '.join(map(str, ZOOMS))}: {len(telas)} tiles XYZ + {len(telas)} WMS, "
+            f"{args.latency * 1000:.0f} ms por pedido no servidor"
+        )
+        print(f"{'':<24}{'s':>8}{'pedidos ao servidor':>22}")
+        for rotulo, segundos, pedidos in linhas:
+            print(f"{rotulo:<24}{segundos:>8.2f}{pedidos:>22}")
+
+        tiles = basemaps.extent_tiles()
+        urls = basemaps.xyz_tile_urls(xyz, tiles)
+        inicio = time.perf_counter()
+        baixados, em_cache, falhas = basemaps.prefetch(urls, 8, proxy.cache)
+        print(
+            f"\npré-carga do Brasil e do Pantanal: {len(tiles)} tiles XYZ, "
+            f"{baixados} baixados, {em_cache} já no cache, {len(falhas)} falhas, "
+            f"{time.perf_counter() - inicio:.1f} s"
+        )
+        estatisticas = proxy.cache.stats()
+        print(basemaps.format_stats(estatisticas))
+        tamanho = estatisticas["bytes"] / estatisticas["arquivos"]
+
+    # LRU: com espaço para ~100 tiles, os vistos por último ficam
+    with tempfile.TemporaryDirectory() as tmp:
+        pequeno = basemaps.DiskCache(tmp, budget_bytes=100 * tamanho)
+        basemaps.prefetch(urls[:300], 8, pequeno)
+        _, recentes, _ = basemaps.prefetch(urls[250:300], 8, pequeno)
+        estatisticas = pequeno.stats()
+        print(
+            f"\nLRU com {pequeno.budget_bytes / 1024:.0f} KiB: "
+            f"{estatisticas['arquivos']} arquivos, {estatisticas['removidos']} "
+            f"removidos; dos 50 últimos tiles, {recentes} ainda no cache"
+        )
+
+
+if __name__ == "__main__":
+    main()
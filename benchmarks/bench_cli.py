@@ -0,0 +1,114 @@
+"""Escalonamento do relatório por propriedade (`python -m queimadas report`).
+
+Gera um diretório de KMLs sintéticos e um cache com vários dias de focos
+sintéticos, e roda `run_report` com 1, 2, 4... até ``--max-workers``
+processos, informando tempo e aceleração em relação a um processo. Em
+máquinas com um só núcleo a aceleração fica perto de 1 (ou abaixo, pelo
+custo de subir os processos).
+
+Uso: python benchmarks/bench_cli.py [--files 100] [--per-file 20] [--days 14] [--rows 300000]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# o cache precisa valer também nos processos do pool
+CACHE = tempfile.mkdtemp()
+os.environ["INPE_CACHE_DIR"] = CACHE
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from queimadas import inpe  # noqa: E402
+from queimadas.cli import run_report  # noqa: E402
+
+END = date(2024, 9, 30)
+
+PLACEMARK = (
+    "<Placemark><name>{nome}</name><Polygon><outerBoundaryIs><LinearRing>"
+    "<coordinates>{coords}</coordinates></LinearRing></outerBoundaryIs>"
+    "</Polygon></Placemark>"
+)
+
+
+def make_kml_dir(files, per_file, rng):
+    pasta = Path(tempfile.mkdtemp())
+    angulos = np.linspace(0, 2 * np.pi, 33)
+    for i in range(files):
+        marcas = []
+        for j in range(per_file):
+            lon, lat = rng.uniform(-58.5, -54.0), rng.uniform(-22.0, -16.5)
+            raio = rng.uniform(0.02, 0.15)
+            anel = zip(lon + raio * np.cos(angulos), lat + raio * np.sin(angulos))
+            coords = " ".join(f"{x:.5f},{y:.5f}" for x, y in anel)
+            marcas.append(PLACEMARK.format(nome=f"Fazenda {i}-{j}", coords=coords))
+        (pasta / f"propriedades_{i:03d}.kml").write_text(
+            '<kml xmlns="http://www.opengis.net/kml/2.2"><Document>'
+            + "".join(marcas)
+            + "</Document></kml>"
+        )
+    return pasta
+
+
+def seed_days(days, rows, rng):
+    datas = inpe.days_between(END - timedelta(days=days - 1), END)
+    for d in datas:
+        df = pd.DataFrame(
+            {
+                "lat": rng.uniform(-33.7, 5.3, rows).astype("float32"),
+                "lon": rng.uniform(-73.9, -34.8, rows).astype("float32"),
+                "frp": rng.uniform(0, 500, rows).astype("float32"),
+            }
+        )
+        inpe.write_cache(df, inpe.cache_path(d))
+    return datas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--per-file", type=int, default=20)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    pasta = make_kml_dir(args.files, args.per_file, rng)
+    datas = seed_days(args.days, args.rows, rng)
+    print(
+        f"{args.files * args.per_file} propriedades · {args.days} dias de "
+        f"{args.rows} focos · {os.cpu_count()} núcleos"
+    )
+
+    workers = [1]
+    while workers[-1] * 2 <= args.max_workers:
+        workers.append(workers[-1] * 2)
+    if workers[-1] != args.max_workers:
+        workers.append(args.max_workers)
+
+    base = None
+    for n in workers:
+        inicio = time.perf_counter()
+        df, _ = run_report(pasta, datas, workers=n)
+        segundos = time.perf_counter() - inicio
+        base = base or segundos
+        print(
+            f"{n:>3} processos: {segundos:6.2f} s · aceleração {base / segundos:4.1f}x "
+            f"· {len(df)} linhas · {int(df['focos'].sum())} focos"
+        )
+
+    shutil.rmtree(pasta)
+    shutil.rmtree(CACHE)
+
+
+if __name__ == "__main__":
+    main()
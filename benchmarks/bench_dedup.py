@@ -0,0 +1,116 @@
+"""Agrupamento de detecções repetidas numa temporada inteira.
+
+Simula uma temporada (``--days`` dias, de julho em diante) com fogos que
+são detectados várias vezes: cada fogo gera 1 + Poisson(``--repeats``)
+detecções, de satélites sorteados, espalhadas por até duas horas e com
+erro de posição de ~300 m. Mede `deduplicate` com os limites padrão em
+vários tamanhos e mostra quantos eventos saíram para quantos fogos
+simulados. Para o menor tamanho (até ``--pairwise-max``), compara com a
+comparação de todos os pares, em blocos no numpy.
+
+Uso: python benchmarks/bench_dedup.py [--detections 300000 1000000 3000000]
+"""
+
+import argparse
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from queimadas.dedup import (  # noqa: E402
+    DISTANCE_KM,
+    WINDOW_H,
+    _components,
+    deduplicate,
+)
+from queimadas.geo import KM_POR_GRAU  # noqa: E402
+from queimadas.synthetic import SATELITES, generate_hotspots  # noqa: E402
+
+
+def season(n, days, repeats, seed=0):
+    """~`n` detecções de fogos repetidos ao longo de `days` dias."""
+    rng = np.random.default_rng(seed)
+    fogos = max(int(n / (1 + repeats)), 1)
+    base = generate_hotspots(fogos, seed=seed)
+    base["data_hora_gmt"] = pd.Timestamp("2024-07-01") + pd.to_timedelta(
+        rng.uniform(0, days * 24, fogos), unit="h"
+    )
+    vezes = 1 + rng.poisson(repeats, fogos)
+    df = base.loc[base.index.repeat(vezes)].reset_index(drop=True)
+    df["fogo"] = np.repeat(np.arange(fogos), vezes)
+    m = len(df)
+    erro = 0.3 / KM_POR_GRAU
+    df["lat"] = (df["lat"] + rng.normal(0, erro / 2, m)).astype("float32")
+    df["lon"] = (df["lon"] + rng.normal(0, erro / 2, m)).astype("float32")
+    df["data_hora_gmt"] += pd.to_timedelta(rng.uniform(0, 2, m), unit="h")
+    df["satelite"] = pd.Categorical(rng.choice(list(SATELITES), m))
+    df["frp"] = (df["frp"] * rng.uniform(0.5, 1.5, m)).astype("float32")
+    return df, fogos
+
+
+def pairwise(df, distance_km=DISTANCE_KM, window_h=WINDOW_H, bloco=2048):
+    """Mesmo agrupamento comparando cada detecção com todas as outras."""
+    lon = df["lon"].to_numpy("float64")
+    lat = df["lat"].to_numpy("float64")
+    horas = df["data_hora_gmt"].to_numpy("datetime64[s]").astype("int64") / 3600
+    coslat = np.cos(np.radians(lat))
+    us, vs = [], []
+    for a in range(0, len(df), bloco):
+        fatia = slice(a, a + bloco)
+        dx = (lon[fatia, None] - lon) * KM_POR_GRAU * (coslat[fatia, None] + coslat) / 2
+        dy = (lat[fatia, None] - lat) * KM_POR_GRAU
+        perto = (dx * dx + dy * dy <= distance_km**2) & (
+            np.abs(horas[fatia, None] - horas) <= window_h
+        )
+        i, j = np.nonzero(perto)
+        us.append(i + a)
+        vs.append(j)
+    return _components(len(df), np.concatenate(us), np.concatenate(vs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--detections", type=int, nargs="+", default=[300_000, 1_000_000, 3_000_000]
+    )
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--repeats", type=float, default=2.0)
+    parser.add_argument("--pairwise-max", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(f"{'detecções':>12}{'fogos':>12}{'eventos':>12}{'s':>8}{'µs/detecção':>14}")
+    for n in args.detections:
+        df, fogos = season(n, args.days, args.repeats)
+        inicio = time.perf_counter()
+        eventos = deduplicate(df)
+        segundos = time.perf_counter() - inicio
+        assert int(eventos["deteccoes"].sum()) == len(df)
+        print(
+            f"{len(df):>12,}{fogos:>12,}{len(eventos):>12,}{segundos:>8.2f}"
+            f"{segundos / len(df) * 1e6:>14.2f}"
+        )
+
+    # mesma resposta que comparar todos os pares, num tamanho que cabe
+    n = min(args.pairwise_max, min(args.detections))
+    df, _ = season(n, max(1, math.ceil(args.days * n / min(args.detections))), 2.0)
+    inicio = time.perf_counter()
+    grade = deduplicate(df)
+    t_grade = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    rotulos = pairwise(df)
+    t_pares = time.perf_counter() - inicio
+    assert len(grade) == rotulos.max() + 1
+    print(
+        f"\n{len(df):,} detecções: grade {t_grade * 1000:.0f} ms · todos os "
+        f"pares {t_pares * 1000:.0f} ms (mesmos {len(grade):,} eventos); "
+        f"os pares crescem com n², a grade com n"
+    )
+
+
+if __name__ == "__main__":
+    main()
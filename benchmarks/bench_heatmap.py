@@ -0,0 +1,68 @@
+"""Tamanho do HTML e tempo de montagem do mapa de calor, com e sem grade.
+
+Uso: python benchmarks/bench_heatmap.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import folium
+import numpy as np
+import pandas as pd
+from folium import plugins
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from queimadas.grid import bin_points, cell_size_deg  # noqa: E402
+from queimadas.render import map_html_bytes  # noqa: E402
+
+ZOOM = 4
+
+
+def make_points(n):
+    rng = np.random.default_rng(1)
+    return pd.DataFrame(
+        {
+            "lat": rng.uniform(-33.7, 5.3, n).astype("float32"),
+            "lon": rng.uniform(-73.9, -34.8, n).astype("float32"),
+            "frp": rng.uniform(0, 500, n).astype("float32"),
+        }
+    )
+
+
+def build(df, radius, grade):
+    inicio = time.perf_counter()
+    if grade:
+        df = bin_points(df, "frp", cell_size_deg(radius, ZOOM))
+    m = folium.Map(location=[-10.91, -51.0641], zoom_start=ZOOM)
+    # mesma chamada feita por leafmap.Map.add_heatmap
+    plugins.HeatMap(df[["lat", "lon", "frp"]].values.tolist(), radius=radius).add_to(m)
+    tamanho = map_html_bytes(m)
+    return time.perf_counter() - inicio, tamanho, len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--radius", type=int, default=10)
+    args = parser.parse_args()
+
+    print(
+        f"{'focos':>9} {'modo':>7} {'pontos no mapa':>15} {'tempo (s)':>10} {'HTML (MiB)':>11}"
+    )
+    for n in args.sizes:
+        df = make_points(n)
+        for grade in (False, True):
+            segundos, tamanho, pontos = build(df, args.radius, grade)
+            modo = "grade" if grade else "bruto"
+            print(
+                f"{n:>9} {modo:>7} {pontos:>15} {segundos:>10.3f} {tamanho / 2**20:>11.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Relatório de tempo de importação, por módulo e por página.
+
+Cada medida roda num processo Python novo, como depois de um deploy:
+
+* módulos: quanto ``import <módulo>`` leva num processo que já importou
+  o ``streamlit`` (para ver o que pesa em cada um, use
+  ``python -X importtime -c "import <módulo>"``);
+* páginas: o tempo das importações de topo de cada página e a primeira
+  renderização com ``streamlit.testing`` apontando para um servidor INPE
+  local que responde 404 na hora, de modo que a página pare logo depois
+  de montar os controles. Lista também quais dependências pesadas foram
+  carregadas.
+
+Uso: python benchmarks/bench_imports.py [--repeat 3]
+"""
+
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = [
+    "pandas",
+    "pyarrow.parquet",
+    "requests",
+    "shapely",
+    "folium",
+    "altair",
+    "leafmap.foliumap",
+    "queimadas.inpe",
+    "queimadas.kml",
+    "queimadas.render",
+    "queimadas.scheduler",
+]
+HEAVY = ["leafmap", "folium", "altair", "shapely", "pyarrow", "pandas", "requests"]
+
+RENDER = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+inicio = time.perf_counter()
+AppTest.from_file(sys.argv[1], default_timeout=120).run()
+segundos = time.perf_counter() - inicio
+print(json.dumps({"segundos": segundos,
+                  "pesados": [m for m in sys.argv[2:] if m in sys.modules]}))
+"""
+
+
+def import_time(code, base="import streamlit"):
+    """Tempo (s) para executar as importações de `code` num processo novo
+    em que `base` já foi importado."""
+    medida = (
+        f"import time\n{base}\ninicio = time.perf_counter()\n{code}\n"
+        "print(time.perf_counter() - inicio)"
+    )
+    saida = subprocess.run(
+        [sys.executable, "-c", medida],
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+        check=True,
+    ).stdout
+    return float(saida.splitlines()[-1])
+
+
+def page_imports(path):
+    """Comandos de importação de topo da página, como código executável."""
+    arvore = ast.parse(path.read_text())
+    return "\n".join(
+        ast.unparse(no)
+        for no in arvore.body
+        if isinstance(no, (ast.Import, ast.ImportFrom))
+    )
+
+
+def start_server():
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def render(path, base_url):
+    env = dict(
+        os.environ,
+        INPE_BASE_URL=base_url,
+        INPE_CACHE_DIR=str(ROOT / ".cache" / "bench_imports"),
+        INPE_PREFETCH="0",
+    )
+    saida = subprocess.run(
+        [sys.executable, "-c", RENDER, str(path), *HEAVY],
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+        env=env,
+        check=True,
+    ).stdout
+    return json.loads(saida.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    base = statistics.median(
+        import_time("import streamlit", base="") for _ in range(args.repeat)
+    )
+    print(f"streamlit: {base * 1000:7.0f} ms\n")
+    print("módulo (além do streamlit):")
+    for modulo in MODULES:
+        segundos = statistics.median(
+            import_time(f"import {modulo}") for _ in range(args.repeat)
+        )
+        print(f"  {modulo:<22} {segundos * 1000:7.0f} ms")
+
+    print("\npágina: importações de topo · primeira renderização · pesados carregados")
+    server = start_server()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    paginas = [ROOT / "Home.py", *sorted((ROOT / "pages").glob("*.py"))]
+    for pagina in paginas:
+        codigo = page_imports(pagina)
+        topo = statistics.median(import_time(codigo) for _ in range(args.repeat))
+        rodadas = [render(pagina, base_url) for _ in range(args.repeat)]
+        segundos = statistics.median(r["segundos"] for r in rodadas)
+        print(
+            f"  {pagina.name:<42} {topo * 1000:6.0f} ms · "
+            f"{segundos * 1000:6.0f} ms · {', '.join(rodadas[0]['pesados'])}"
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
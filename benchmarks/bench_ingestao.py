@@ -0,0 +1,123 @@
+"""Mede a ingestão de um intervalo de dias contra um servidor INPE local.
+
+Sobe um servidor HTTP de mentira que responde qualquer
+``focos_diario_br_YYYYMMDD.csv`` com o mesmo CSV sintético após uma
+latência fixa, e compara o download sequencial antigo (um ``requests.get``
+por dia) com `fetch_days` em 1 e N workers. O cache em disco é recriado a
+cada rodada para que todas baixem tudo.
+
+Uso: python benchmarks/bench_ingestao.py [--days 30] [--rows 20000] [--latency 0.3]
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from queimadas import inpe  # noqa: E402
+
+
+def make_csv(rows):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "lat": rng.uniform(-33.7, 5.3, rows).round(5),
+            "lon": rng.uniform(-73.9, -34.8, rows).round(5),
+            "data_hora_gmt": "2024-09-01 17:30:00",
+            "satelite": rng.choice(["AQUA_M-T", "NOAA-20", "GOES-16"], rows),
+            "municipio": rng.choice(["CORUMBÁ", "POCONÉ", "CÁCERES"], rows),
+            "estado": rng.choice(["MATO GROSSO DO SUL", "MATO GROSSO"], rows),
+            "bioma": rng.choice(["Pantanal", "Cerrado", "Amazônia"], rows),
+            "frp": rng.uniform(0, 500, rows).round(1),
+        }
+    )
+    return df.to_csv(index=False).encode("utf-8")
+
+
+def start_server(body, latency, missing):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # permite keep-alive
+
+        def do_GET(self):
+            time.sleep(latency)
+            if any(dia in self.path for dia in missing):
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def legacy(dates):
+    # comportamento antigo: um requests.get sem sessão por dia, em série
+    frames = []
+    for d in dates:
+        response = requests.get(inpe.build_url(d))
+        if response.status_code == 200:
+            frames.append(pd.read_csv(StringIO(response.text)))
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--workers", type=int, default=inpe.MAX_WORKERS)
+    args = parser.parse_args()
+
+    end = date(2024, 9, 30)
+    dates = inpe.days_between(end - timedelta(days=args.days - 1), end)
+    missing = {(end - timedelta(days=3)).strftime("%Y%m%d")}
+    body = make_csv(args.rows)
+    server = start_server(body, args.latency, missing)
+    inpe.BASE_URL = f"http://127.0.0.1:{server.server_port}"
+
+    print(
+        f"{args.days} dias · {len(body) / 2**20:.1f} MiB por dia · "
+        f"latência {args.latency * 1000:.0f} ms"
+    )
+
+    inicio = time.perf_counter()
+    legacy(dates)
+    print(f"{'sequencial antigo':>22}: {time.perf_counter() - inicio:6.2f} s")
+
+    for workers in sorted({1, args.workers}):
+        inpe.CACHE_DIR = Path(tempfile.mkdtemp())
+        inicio = time.perf_counter()
+        df, falhas = inpe.fetch_days(dates, max_workers=workers)
+        segundos = time.perf_counter() - inicio
+        shutil.rmtree(inpe.CACHE_DIR)
+        print(
+            f"{f'fetch_days ({workers} workers)':>22}: {segundos:6.2f} s · "
+            f"{len(df)} linhas · falhas: {list(map(str, falhas))}"
+        )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Mede a atualização do dia corrente contra um servidor INPE local.
+
+O servidor de mentira serve um CSV que cresce: a cada rodada são
+acrescentados ``--batch`` focos novos (mais algumas linhas repetidas, como
+quando o INPE republica um lote). Compara o download completo a cada
+atualização com `refresh_day`, que pede só o final do arquivo com
+``Range`` e requisição condicional. Informa bytes recebidos, tempo e
+confere que o cache final tem os mesmos focos do arquivo inteiro.
+
+Uso: python benchmarks/bench_intraday.py [--rows 200000] [--batch 2000] [--mbps 50]
+"""
+
+import argparse
+import hashlib
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from queimadas import inpe  # noqa: E402
+from queimadas.schema import parse_inpe_csv  # noqa: E402
+
+DAY = date(2024, 9, 1)
+
+
+def make_rows(start, rows, seed, horas=(0, 12)):
+    # cada lote novo vem de passagens de satélite mais recentes
+    rng = np.random.default_rng(seed)
+    horas = rng.integers(horas[0] * 3600, horas[1] * 3600, rows)
+    return pd.DataFrame(
+        {
+            "id": [f"foco-{i}" for i in range(start, start + rows)],
+            "lat": rng.uniform(-33.7, 5.3, rows).round(5),
+            "lon": rng.uniform(-73.9, -34.8, rows).round(5),
+            "data_hora_gmt": (
+                pd.Timestamp(DAY) + pd.to_timedelta(horas, unit="s")
+            ).strftime("%Y-%m-%d %H:%M:%S"),
+            "satelite": rng.choice(["AQUA_M-T", "NOAA-20", "GOES-16"], rows),
+            "municipio": rng.choice(["CORUMBÁ", "POCONÉ", "CÁCERES"], rows),
+            "estado": rng.choice(["MATO GROSSO DO SUL", "MATO GROSSO"], rows),
+            "bioma": rng.choice(["Pantanal", "Cerrado", "Amazônia"], rows),
+            "frp": rng.uniform(0, 500, rows).round(1),
+        }
+    )
+
+
+class GrowingFile:
+    def __init__(self, df):
+        self.body = df.to_csv(index=False).encode("utf-8")
+        self.sent = 0
+
+    def append(self, df):
+        self.body += df.to_csv(index=False, header=False).encode("utf-8")
+
+    @property
+    def etag(self):
+        return '"' + hashlib.md5(self.body).hexdigest() + '"'
+
+
+def start_server(arquivo, mbps):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            body, etag = arquivo.body, arquivo.etag
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            faixa = self.headers.get("Range")
+            status, parte = 200, body
+            if faixa:
+                inicio = int(faixa.removeprefix("bytes=").rstrip("-"))
+                if inicio >= len(body):
+                    self.send_response(416)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                status, parte = 206, body[inicio:]
+            self.send_response(status)
+            self.send_header("ETag", etag)
+            if status == 206:
+                self.send_header(
+                    "Content-Range", f"bytes {inicio}-{len(body) - 1}/{len(body)}"
+                )
+            self.send_header("Content-Length", str(len(parte)))
+            self.end_headers()
+            # simula o enlace até o servidor do INPE
+            time.sleep(len(parte) * 8 / (mbps * 1e6))
+            self.wfile.write(parte)
+            arquivo.sent += len(parte)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(args, incremental):
+    arquivo = GrowingFile(make_rows(0, args.rows, 0))
+    server = start_server(arquivo, args.mbps)
+    inpe.BASE_URL = f"http://127.0.0.1:{server.server_port}"
+    inpe.CACHE_DIR = Path(tempfile.mkdtemp())
+    inpe.refresh_day(DAY)
+    arquivo.sent = 0
+
+    segundos = 0.0
+    adicionados = 0
+    proximo = args.rows
+    for rodada in range(args.rounds):
+        janela = (12 + rodada, 13 + rodada)
+        lote = make_rows(proximo, args.batch, rodada + 1, janela)
+        # algumas linhas do lote anterior voltam repetidas
+        anterior = (
+            lote.iloc[:0]
+            if rodada == 0
+            else make_rows(proximo - args.batch, 50, rodada, (11 + rodada, 12 + rodada))
+        )
+        arquivo.append(pd.concat([anterior, lote]))
+        proximo += args.batch
+        if not incremental:
+            inpe.meta_path(DAY).unlink()
+        inicio = time.perf_counter()
+        adicionados += inpe.refresh_day(DAY)
+        segundos += time.perf_counter() - inicio
+    # uma última conferência sem mudanças no arquivo
+    inicio = time.perf_counter()
+    sem_mudanca = inpe.refresh_day(DAY) if incremental else None
+    ultimo = time.perf_counter() - inicio
+
+    cache = pd.read_parquet(inpe.cache_path(DAY))
+    esperado = parse_inpe_csv(arquivo.body).drop_duplicates("id")
+    confere = len(cache) == len(esperado) and set(cache["id"]) == set(esperado["id"])
+    server.shutdown()
+    shutil.rmtree(inpe.CACHE_DIR)
+    return (
+        segundos,
+        arquivo.sent,
+        adicionados,
+        confere,
+        sem_mudanca,
+        ultimo,
+        len(arquivo.body),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=2_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--mbps", type=float, default=50, help="banda do enlace")
+    args = parser.parse_args()
+
+    print(
+        f"{args.rows} focos iniciais + {args.rounds} lotes de {args.batch} · "
+        f"enlace de {args.mbps:.0f} Mbit/s"
+    )
+    for nome, incremental in (("download completo", False), ("refresh_day", True)):
+        segundos, enviados, adicionados, confere, sem_mudanca, ultimo, total = run(
+            args, incremental
+        )
+        linha = (
+            f"{nome:>18}: {segundos / args.rounds * 1000:7.1f} ms/atualização · "
+            f"{enviados / args.rounds / 1024:8.1f} KiB/atualização · "
+            f"arquivo final {total / 2**20:.1f} MiB · cache confere: {confere}"
+        )
+        if incremental:
+            linha += (
+                f" · {adicionados} novos · sem mudança: {sem_mudanca} novos "
+                f"em {ultimo * 1000:.1f} ms"
+            )
+        print(linha)
+
+
+if __name__ == "__main__":
+    main()
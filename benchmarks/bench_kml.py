@@ -0,0 +1,125 @@
+"""Tempo e pico de memória da leitura de KMLs grandes do CAR.
+
+Compara o caminho antigo (texto inteiro + regex + árvore fastkml +
+shapely por placemark) com o leitor em fluxo de `queimadas.kml`. O pico é
+medido com tracemalloc numa segunda passada; o caminho antigo só roda se o fastkml estiver
+instalado.
+
+Uso: python benchmarks/bench_kml.py [--placemarks 500 5000] [--vertices 400]
+"""
+
+import argparse
+import re
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from queimadas.kml import read_kml_polygons  # noqa: E402
+
+
+def make_kml(placemarks, vertices):
+    rng = np.random.default_rng(0)
+    ang = np.linspace(0, 2 * np.pi, vertices)
+    partes = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<kml xmlns="http://www.opengis.net/kml/2.2"><Document><Folder>'
+    ]
+    for i in range(placemarks):
+        x, y, r = rng.uniform(-58, -55), rng.uniform(-20, -16), rng.uniform(0.01, 0.03)
+        lon = x + r * np.cos(ang)
+        lat = y + r * np.sin(ang)
+        lon[-1], lat[-1] = lon[0], lat[0]
+        coords = " ".join(f"{a:.7f},{b:.7f},0" for a, b in zip(lon, lat))
+        # o caminho antigo só entende anéis em LineString
+        partes.append(
+            f"<Placemark><name>Imóvel {i}</name>"
+            f"<LineString><coordinates>{coords}</coordinates></LineString></Placemark>"
+        )
+    partes.append("</Folder></Document></kml>")
+    return "".join(partes).encode("utf-8")
+
+
+def legacy(raw):
+    from fastkml import Placemark, kml
+    from shapely.geometry import Polygon, shape
+
+    def extract_placemarks(features):
+        pms = []
+        for fea in features:
+            if isinstance(fea, Placemark):
+                pms.append(fea)
+            elif hasattr(fea, "features"):
+                pms.extend(extract_placemarks(list(fea.features)))
+        return pms
+
+    content = raw.decode("utf-8")
+    content = re.sub(r"^\s*<\?xml[^>]+\?>\s*", "", content)
+    content = re.sub(
+        r'<kml[^>]*xmlns="[^"]+"',
+        '<kml xmlns="http://www.opengis.net/kml/2.2"',
+        content,
+        count=1,
+    )
+    k = kml.KML.from_string(content)
+    items = []
+    for pm in extract_placemarks(list(k.features)):
+        shp = shape(pm.geometry)
+        if shp.geom_type == "LineString" and shp.is_ring:
+            coords = list(shp.coords)
+            poly = Polygon([(lon, lat) for lon, lat, *_ in coords])
+            items.append((pm.name, poly, [(lat, lon) for lon, lat, *_ in coords]))
+    items.sort(key=lambda tpl: tpl[1].area, reverse=True)
+    return items
+
+
+def measure(fn, raw):
+    # tempo e memória em passadas separadas: o tracemalloc deixa tudo lento
+    inicio = time.perf_counter()
+    items = fn(raw)
+    segundos = time.perf_counter() - inicio
+    del items
+    tracemalloc.start()
+    n = len(fn(raw))
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return segundos, pico / 2**20, n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--placemarks", type=int, nargs="+", default=[500, 5_000])
+    parser.add_argument("--vertices", type=int, default=400)
+    args = parser.parse_args()
+
+    try:
+        import fastkml  # noqa: F401
+
+        casos = {"antigo (fastkml)": legacy}
+    except ImportError:
+        print(
+            "fastkml não instalado: só o leitor em fluxo será medido", file=sys.stderr
+        )
+        casos = {}
+    casos["em fluxo"] = lambda raw: read_kml_polygons(BytesIO(raw))
+
+    print(
+        f"{'placemarks':>10} {'MiB':>5} {'leitor':>18} {'tempo (s)':>10} {'pico (MiB)':>11}"
+    )
+    for n in args.placemarks:
+        raw = make_kml(n, args.vertices)
+        for nome, fn in casos.items():
+            segundos, pico, itens = measure(fn, raw)
+            assert itens == n
+            print(
+                f"{n:>10} {len(raw) / 2**20:>5.0f} {nome:>18} {segundos:>10.2f} {pico:>11.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
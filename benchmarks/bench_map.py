@@ -0,0 +1,73 @@
+"""Mede tempo de montagem e tamanho do HTML do mapa de focos.
+
+Compara um CircleMarker por linha (modo antigo) com a camada GeoJson única,
+com e sem o recorte pela margem ao redor da propriedade.
+
+Uso: python benchmarks/bench_map.py [--sizes 1000 10000 50000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import folium
+import numpy as np
+import pandas as pd
+from shapely.geometry import box
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from queimadas.render import (  # noqa: E402
+    add_hotspot_layer,
+    filter_near_polygon,
+    map_html_bytes,
+)
+
+
+def make_points(n):
+    rng = np.random.default_rng(1)
+    return pd.DataFrame(
+        {
+            "lat": rng.uniform(-33.7, 5.3, n),
+            "lon": rng.uniform(-73.9, -34.8, n),
+            "data_hora_gmt": "2024-09-01 17:30:00",
+            "risco_fogo": rng.random(n).round(2),
+        }
+    )
+
+
+def build(df, mode):
+    inicio = time.perf_counter()
+    m = folium.Map(location=[-19, -57], zoom_start=10)
+    add_hotspot_layer(m, df, mode=mode)
+    tamanho = map_html_bytes(m)
+    return time.perf_counter() - inicio, tamanho
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--margin-km", type=float, default=20)
+    args = parser.parse_args()
+
+    poly = box(-57.5, -19.5, -56.5, -18.5)
+    print(f"{'pontos':>8} {'modo':>18} {'tempo (s)':>10} {'HTML (MiB)':>11}")
+    for n in args.sizes:
+        df = make_points(n)
+        casos = [
+            ("markers", df, "markers"),
+            ("geojson", df, "geojson"),
+            (
+                "geojson+margem",
+                filter_near_polygon(df, poly, args.margin_km),
+                "geojson",
+            ),
+        ]
+        for nome, dados, mode in casos:
+            segundos, tamanho = build(dados, mode)
+            print(f"{n:>8} {nome:>18} {segundos:>10.3f} {tamanho / 2**20:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
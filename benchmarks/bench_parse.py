@@ -0,0 +1,118 @@
+"""Compara tempo e pico de memória da leitura do CSV diário do INPE.
+
+Cada caso roda num processo separado; o pico é o ``ru_maxrss`` do processo
+menos o RSS medido logo antes da leitura (com os bytes já carregados, como
+acontece depois do download).
+
+Uso: python benchmarks/bench_parse.py [--rows 100000 500000]
+"""
+
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from io import StringIO
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from queimadas.schema import parse_inpe_csv  # noqa: E402
+
+FOCOS_COLUMNS = ["lat", "lon", "municipio", "estado", "bioma", "frp"]
+CASES = {
+    "antigo (StringIO + inferência)": lambda raw: pd.read_csv(
+        StringIO(raw.decode("utf-8"))
+    ),
+    "tipado (c)": lambda raw: parse_inpe_csv(raw, engine="c"),
+    "tipado (pyarrow)": lambda raw: parse_inpe_csv(raw, engine="pyarrow"),
+    "tipado, colunas da página (c)": lambda raw: parse_inpe_csv(
+        raw, FOCOS_COLUMNS, engine="c"
+    ),
+    "tipado, colunas da página (pyarrow)": lambda raw: parse_inpe_csv(
+        raw, FOCOS_COLUMNS, engine="pyarrow"
+    ),
+}
+
+
+def make_csv(rows):
+    rng = np.random.default_rng(0)
+    municipios = [f"MUNICÍPIO {i}" for i in range(3000)]
+    estados = ["MATO GROSSO", "MATO GROSSO DO SUL", "PARÁ", "AMAZONAS", "TOCANTINS"]
+    df = pd.DataFrame(
+        {
+            "id": [f"{i:032x}" for i in range(rows)],
+            "lat": rng.uniform(-33.7, 5.3, rows).round(5),
+            "lon": rng.uniform(-73.9, -34.8, rows).round(5),
+            "data_hora_gmt": pd.Timestamp("2024-09-01")
+            + pd.to_timedelta(rng.integers(0, 86400, rows), unit="s"),
+            "satelite": rng.choice(["AQUA_M-T", "NOAA-20", "GOES-16", "NPP-375"], rows),
+            "municipio": rng.choice(municipios, rows),
+            "estado": rng.choice(estados, rows),
+            "pais": "Brasil",
+            "municipio_id": rng.integers(1_100_000, 5_300_000, rows),
+            "estado_id": rng.integers(11, 53, rows),
+            "pais_id": 33,
+            "numero_dias_sem_chuva": rng.integers(0, 60, rows),
+            "precipitacao": rng.uniform(0, 20, rows).round(1),
+            "risco_fogo": rng.random(rows).round(2),
+            "bioma": rng.choice(["Amazônia", "Cerrado", "Pantanal", "Caatinga"], rows),
+            "frp": rng.uniform(0, 500, rows).round(1),
+        }
+    )
+    return df.to_csv(index=False).encode("utf-8")
+
+
+def rss_kib():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() // 1024
+
+
+def run_case(name, path):
+    raw = Path(path).read_bytes()
+    antes = rss_kib()
+    inicio = time.perf_counter()
+    df = CASES[name](raw)
+    segundos = time.perf_counter() - inicio
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - antes
+    frame = df.memory_usage(deep=True).sum() / 2**20
+    print(f"{segundos}\t{pico / 1024}\t{frame}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 500_000])
+    parser.add_argument("--case")
+    parser.add_argument("--file")
+    args = parser.parse_args()
+
+    if args.case:
+        run_case(args.case, args.file)
+        return
+
+    for rows in args.rows:
+        with tempfile.NamedTemporaryFile(suffix=".csv") as f:
+            f.write(make_csv(rows))
+            f.flush()
+            size = Path(f.name).stat().st_size / 2**20
+            print(f"\n{rows} linhas ({size:.0f} MiB)")
+            print(
+                f"{'caso':>36} {'tempo (s)':>10} {'pico (MiB)':>11} {'frame (MiB)':>12}"
+            )
+            for name in CASES:
+                out = subprocess.run(
+                    [sys.executable, __file__, "--case", name, "--file", f.name],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                ).stdout
+                segundos, pico, frame = map(float, out.split())
+                print(f"{name:>36} {segundos:>10.3f} {pico:>11.0f} {frame:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
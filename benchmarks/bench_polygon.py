@@ -0,0 +1,69 @@
+"""Compara o teste ponto-no-polígono antigo (apply por linha) com o vetorizado.
+
+Uso: python benchmarks/bench_polygon.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from shapely.geometry import Point, Polygon
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from queimadas.geo import process_df_on_polygon  # noqa: E402
+
+
+def legacy_process_df_on_polygon(poly, df):
+    # implementação original da página de Propriedade Rural
+    df = df.copy()
+    df["dentro"] = df.apply(
+        lambda row: poly.contains(Point(row["lon"], row["lat"])), axis=1
+    )
+    return df
+
+
+def make_polygon(n_vertices=2000):
+    # contorno irregular no Pantanal, parecido com uma exportação do CAR
+    rng = np.random.default_rng(0)
+    ang = np.linspace(0, 2 * np.pi, n_vertices, endpoint=False)
+    raio = 0.5 + 0.1 * rng.random(n_vertices)
+    return Polygon(zip(-57.0 + raio * np.cos(ang), -19.0 + raio * np.sin(ang)))
+
+
+def make_points(n):
+    # focos espalhados pelo território nacional
+    rng = np.random.default_rng(1)
+    return pd.DataFrame(
+        {"lat": rng.uniform(-33.7, 5.3, n), "lon": rng.uniform(-73.9, -34.8, n)}
+    )
+
+
+def timed(fn, *args):
+    inicio = time.perf_counter()
+    out = fn(*args)
+    return time.perf_counter() - inicio, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    args = parser.parse_args()
+
+    poly = make_polygon()
+    print(f"{'pontos':>10} {'apply (s)':>11} {'vetorizado (s)':>15} {'ganho':>8}")
+    for n in args.sizes:
+        df = make_points(n)
+        t_old, old = timed(legacy_process_df_on_polygon, make_polygon(), df)
+        t_new, new = timed(process_df_on_polygon, poly, df)
+        assert (old["dentro"] == new["dentro"]).all()
+        print(f"{n:>10} {t_old:>11.3f} {t_new:>15.4f} {t_old / t_new:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
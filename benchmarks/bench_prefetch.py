@@ -0,0 +1,78 @@
+"""Mede o primeiro acesso do dia com e sem a pré-carga em segundo plano.
+
+Usa o mesmo servidor INPE local de ``bench_ingestao.py``. O "primeiro
+acesso" repete o que a página de focos faz com a data padrão (ontem):
+`fetch_days` com as colunas da página e `add_uf_columns`. Sem pré-carga
+ele paga download e parse; com pré-carga roda depois de uma rodada do
+agendador, como acontece quando o servidor já está de pé, e é comparado
+com um segundo acesso sem pré-carga (cache quente).
+
+Uso: python benchmarks/bench_prefetch.py [--rows 200000] [--latency 0.3] [--days 7]
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_ingestao import make_csv, start_server  # noqa: E402
+
+from queimadas import inpe, store  # noqa: E402
+from queimadas.scheduler import PrefetchScheduler, format_status  # noqa: E402
+from queimadas.schema import add_uf_columns  # noqa: E402
+
+COLUMNS = [
+    "lat",
+    "lon",
+    "municipio",
+    "estado",
+    "bioma",
+    "frp",
+    "numero_dias_sem_chuva",
+    "risco_fogo",
+]
+
+
+def first_load():
+    ontem = date.today() - timedelta(days=1)
+    inicio = time.perf_counter()
+    df, _ = inpe.fetch_days([ontem], COLUMNS)
+    add_uf_columns(df)
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--days", type=int, default=7)
+    args = parser.parse_args()
+
+    server = start_server(make_csv(args.rows), args.latency, missing=set())
+    inpe.BASE_URL = f"http://127.0.0.1:{server.server_port}"
+
+    for nome, prefetch in (("sem pré-carga", False), ("com pré-carga", True)):
+        inpe.CACHE_DIR = Path(tempfile.mkdtemp())
+        store._store = None  # armazenamento vazio, como num processo novo
+        if prefetch:
+            agendador = PrefetchScheduler(days=args.days)
+            agendador.run_once()
+            print(f"{'':>15}  {format_status(agendador.status())}")
+        print(f"{nome:>15}: primeiro acesso em {first_load() * 1000:7.1f} ms")
+        if not prefetch:
+            # referência: o mesmo acesso de novo, com tudo já em cache
+            print(
+                f"{'cache quente':>15}: segundo acesso em {first_load() * 1000:7.1f} ms"
+            )
+        shutil.rmtree(inpe.CACHE_DIR)
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
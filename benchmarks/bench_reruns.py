@@ -0,0 +1,117 @@
+"""Latência por interação nas páginas, antes e depois dos fragmentos.
+
+Roda as páginas com ``streamlit.testing`` sobre um cache local com um dia
+sintético e mexe nos controles só de visualização (raio do mapa de calor,
+margem do mapa da propriedade). "Página inteira" é o tempo de um rerun
+completo, que era o custo de qualquer interação antes dos fragmentos;
+"fragmento" é o tempo gasto dentro do fragmento do mapa, que é tudo o que
+roda agora quando esse controle muda.
+
+Uso: python benchmarks/bench_reruns.py [--rows 50000]
+"""
+
+import argparse
+import functools
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("INPE_CACHE_DIR", tempfile.mkdtemp())
+
+import streamlit as st  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from queimadas import inpe  # noqa: E402
+
+PAGES = {
+    "Focos de incêndio": (
+        ROOT / "pages" / "🔥 Focos de incêndio .py",
+        "Defina um raio de agregação:",
+        30,
+    ),
+    "Propriedade Rural": (
+        ROOT / "pages" / "⚠️ Queimadas em Propriedade Rural.py",
+        "Margem exibida ao redor da propriedade (km):",
+        100,
+    ),
+}
+
+tempos_fragmento = {}
+
+
+def timed_fragment(func=None, **kwargs):
+    """Substitui `st.fragment` registrando quanto tempo cada fragmento roda."""
+
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kw):
+            inicio = time.perf_counter()
+            try:
+                return f(*args, **kw)
+            finally:
+                tempos_fragmento[f.__name__] = time.perf_counter() - inicio
+
+        return original_fragment(wrapper, **kwargs)
+
+    return decorator(func) if func is not None else decorator
+
+
+original_fragment = st.fragment
+st.fragment = timed_fragment
+
+
+def seed(rows):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "lat": rng.uniform(-24, -4, rows).astype("float32"),
+            "lon": rng.uniform(-60, -45, rows).astype("float32"),
+            "data_hora_gmt": pd.Timestamp("2024-09-01 17:30"),
+            "municipio": pd.Categorical(
+                rng.choice(["CORUMBÁ", "POCONÉ", "CÁCERES"], rows)
+            ),
+            "estado": pd.Categorical(
+                rng.choice(["MATO GROSSO DO SUL", "MATO GROSSO"], rows)
+            ),
+            "bioma": pd.Categorical(rng.choice(["Pantanal", "Cerrado"], rows)),
+            "frp": rng.uniform(0, 500, rows).astype("float32"),
+            "numero_dias_sem_chuva": rng.integers(0, 60, rows).astype("float32"),
+            "risco_fogo": rng.random(rows).astype("float32"),
+        }
+    )
+    ontem = date.today() - timedelta(days=1)
+    inpe.write_cache(df, inpe.cache_path(ontem))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    seed(args.rows)
+
+    print(f"{args.rows} focos no dia")
+    print(f"{'página':>20} {'página inteira (s)':>19} {'fragmento (s)':>14}")
+    for nome, (path, label, valor) in PAGES.items():
+        at = AppTest.from_file(str(path), default_timeout=300).run()  # aquece caches
+        slider = next(s for s in at.slider if s.label == label)
+        inicio = time.perf_counter()
+        slider.set_value(valor).run()
+        inteira = time.perf_counter() - inicio
+        assert not at.exception, at.exception
+        fragmento = max(tempos_fragmento.values())
+        tempos_fragmento.clear()
+        print(f"{nome:>20} {inteira:>19.3f} {fragmento:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Séries temporais a partir do cubo contra reagrupar os focos brutos.
+
+Grava ``--days`` dias sintéticos (``--rows`` focos cada) no cache diário
+e mede: montar o cubo do zero, atualizá-lo quando um dia muda, uma
+atualização sem nada a fazer, e as séries semanais por bioma e dos cinco
+municípios com mais focos lidas do cubo, comparadas com ler os focos
+brutos do período (cache já aberto) e agrupar a cada rerun.
+
+Uso: python benchmarks/bench_rollup.py [--days 365] [--rows 20000]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from queimadas import inpe, rollup, store  # noqa: E402
+from queimadas.schema import add_uf_columns  # noqa: E402
+from queimadas.synthetic import generate_hotspots  # noqa: E402
+
+
+def timed(fn, repeat=1):
+    melhor = float("inf")
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        resultado = fn()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def raw_series(dates):
+    df, _ = inpe.fetch_days(dates, rollup.RAW_COLUMNS)
+    df = add_uf_columns(df)
+    semana = pd.Grouper(key="data", freq="W-SUN")
+    por_bioma = df.groupby([semana, "bioma"], observed=True)["frp"].agg(
+        focos="size", valor="sum"
+    )
+    maiores = df["municipio_siglaUF"].value_counts().nlargest(5).index
+    por_municipio = (
+        df[df["municipio_siglaUF"].isin(maiores)]
+        .groupby([semana, "municipio_siglaUF"], observed=True)["frp"]
+        .agg(focos="size", valor="sum")
+    )
+    return por_bioma, por_municipio
+
+
+def cube_series(dates, rollup_dir):
+    cubo, _ = rollup.load_rollup(dates, rollup_dir=rollup_dir)
+    cubo = add_uf_columns(cubo)
+    return (
+        rollup.time_series(cubo, "bioma", "W-SUN", "frp"),
+        rollup.time_series(cubo, "municipio_siglaUF", "W-SUN", "frp", top=5),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--rows", type=int, default=20_000)
+    args = parser.parse_args()
+
+    fim = date.today() - timedelta(days=1)
+    dates = [fim - timedelta(days=i) for i in range(args.days)][::-1]
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        inpe.CACHE_DIR = tmp / "cache"
+        store._store = None
+        for d in dates:
+            df = generate_hotspots(args.rows, day=d, seed=d.toordinal())
+            inpe.write_cache(df, inpe.cache_path(d))
+        cubo_dir = tmp / "cubo"
+
+        linhas = []
+        segundos, _ = timed(lambda: rollup.update_days(dates, cubo_dir))
+        linhas.append(("montar o cubo do zero", segundos))
+        segundos, _ = timed(lambda: rollup.update_days(dates, cubo_dir), 3)
+        linhas.append(("atualizar sem mudanças", segundos))
+
+        # ontem reescrito no cache (focos novos): só ele e o mês dele são refeitos
+        dia = dates[-1]
+        inpe.write_cache(
+            generate_hotspots(args.rows, day=dia, seed=1), inpe.cache_path(dia)
+        )
+        segundos, _ = timed(lambda: rollup.update_days(dates, cubo_dir))
+        linhas.append(("atualizar um dia alterado", segundos))
+
+        segundos, (bioma_b, municipio_b) = timed(lambda: raw_series(dates), 3)
+        linhas.append(("séries dos focos brutos", segundos))
+        segundos, (bioma_c, municipio_c) = timed(
+            lambda: cube_series(dates, cubo_dir), 3
+        )
+        linhas.append(("séries do cubo", segundos))
+        assert int(bioma_c["focos"].sum()) == int(bioma_b["focos"].sum())
+        assert int(municipio_c["focos"].sum()) == int(municipio_b["focos"].sum())
+
+        tamanho_cubo = sum(p.stat().st_size for p in cubo_dir.glob("*.parquet"))
+        tamanho_bruto = sum(p.stat().st_size for p in inpe.CACHE_DIR.glob("*.parquet"))
+        cubo, _ = rollup.load_rollup(dates, rollup_dir=cubo_dir)
+
+    print(
+        f"{args.days} dias × {args.rows:,} focos = {args.days * args.rows:,} "
+        f"focos brutos ({tamanho_bruto / 2**20:.0f} MiB) · cubo com "
+        f"{len(cubo):,} linhas ({tamanho_cubo / 2**20:.1f} MiB)"
+    )
+    print(f"{'etapa':<30}{'ms':>10}")
+    for rotulo, segundos in linhas:
+        print(f"{rotulo:<30}{segundos * 1000:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compara o cruzamento em lote (STRtree) com um teste por polígono.
+
+Uso: python benchmarks/bench_screening.py [--points 100000] [--polygons 100 1000 10000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from shapely.geometry import Polygon
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from queimadas.geo import points_in_polygon  # noqa: E402
+from queimadas.screening import screen_properties  # noqa: E402
+
+
+def make_properties(n):
+    # propriedades de ~2 a 5 km de lado espalhadas pelo Pantanal
+    rng = np.random.default_rng(0)
+    ang = np.linspace(0, 2 * np.pi, 60, endpoint=False)
+    polys = []
+    for x, y, r in zip(
+        rng.uniform(-58, -55, n), rng.uniform(-20, -16, n), rng.uniform(0.01, 0.025, n)
+    ):
+        polys.append(Polygon(zip(x + r * np.cos(ang), y + r * np.sin(ang))))
+    return [f"P{i}" for i in range(n)], polys
+
+
+def make_points(n):
+    rng = np.random.default_rng(1)
+    return pd.DataFrame(
+        {
+            "lat": rng.uniform(-21, -15, n),
+            "lon": rng.uniform(-59, -54, n),
+            "frp": rng.uniform(0, 500, n),
+        }
+    )
+
+
+def per_polygon(names, polys, df):
+    lon, lat = df["lon"].to_numpy(), df["lat"].to_numpy()
+    return [int(points_in_polygon(p, lon, lat).sum()) for p in polys]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, default=100_000)
+    parser.add_argument("--polygons", type=int, nargs="+", default=[100, 1_000, 10_000])
+    args = parser.parse_args()
+
+    df = make_points(args.points)
+    print(f"{args.points} focos")
+    print(f"{'polígonos':>10} {'por polígono (s)':>17} {'STRtree (s)':>12}")
+    for n in args.polygons:
+        names, polys = make_properties(n)
+        inicio = time.perf_counter()
+        esperado = per_polygon(names, polys, df)
+        t_loop = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        resultado = screen_properties(names, polys, df)
+        t_tree = time.perf_counter() - inicio
+        focos = resultado.set_index("nome").loc[names, "focos"].tolist()
+        assert focos == esperado
+        print(f"{n:>10} {t_loop:>17.3f} {t_tree:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Memória residente com N sessões lendo o mesmo dia.
+
+"cópia" reproduz o comportamento anterior (cada sessão lê o Parquet e
+mantém seu próprio DataFrame); "store" usa `queimadas.inpe.load_day`, que
+entrega visões do Arrow mapeado em memória. A primeira tabela mede N
+sessões num único processo (RSS); a segunda mede N processos e soma o PSS,
+que divide as páginas compartilhadas entre quem as usa.
+
+Uso: python benchmarks/bench_sessions.py [--rows 1000000] [--sessions 1 4 16]
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+DAY = date(2024, 9, 1)
+COLUMNS = ["lat", "lon", "bioma", "frp", "risco_fogo", "numero_dias_sem_chuva"]
+
+
+def seed(rows):
+    from queimadas import inpe
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "lat": rng.uniform(-33.7, 5.3, rows).astype("float32"),
+            "lon": rng.uniform(-73.9, -34.8, rows).astype("float32"),
+            "bioma": pd.Categorical(rng.choice(["Pantanal", "Cerrado"], rows)),
+            "frp": rng.uniform(0, 500, rows).astype("float32"),
+            "risco_fogo": rng.random(rows).astype("float32"),
+            "numero_dias_sem_chuva": rng.integers(0, 60, rows).astype("float32"),
+        }
+    )
+    inpe.write_cache(df, inpe.cache_path(DAY))
+    inpe.load_day(DAY)  # gera o .arrow uma vez, fora da medição
+
+
+def rss_kib():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() // 1024
+
+
+def pss_kib(pid):
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for linha in f:
+            if linha.startswith("Pss:"):
+                return int(linha.split()[1])
+    return 0
+
+
+def load(modo):
+    from queimadas import inpe
+
+    if modo == "copia":
+        return pd.read_parquet(inpe.cache_path(DAY), columns=COLUMNS)
+    df = inpe.load_day(DAY, COLUMNS)
+    # toca todas as colunas, como o mapa e as agregações fazem
+    df[["lat", "lon", "frp"]].sum()
+    return df
+
+
+def in_process(modo, sessions):
+    from queimadas import inpe  # noqa: F401  (importa antes da medição)
+
+    antes = rss_kib()
+    frames = [load(modo) for _ in range(sessions)]
+    for df in frames:
+        df["frp"].sum()
+    print((rss_kib() - antes) / 1024)
+
+
+def child(modo, pronto, sair):
+    df = load(modo)
+    df["frp"].sum()
+    pronto.set()
+    sair.wait()
+
+
+def across_processes(modo, processes):
+    ctx = mp.get_context("spawn")
+    sair = ctx.Event()
+    filhos = []
+    for _ in range(processes):
+        pronto = ctx.Event()
+        p = ctx.Process(target=child, args=(modo, pronto, sair))
+        p.start()
+        filhos.append((p, pronto))
+    for _, pronto in filhos:
+        pronto.wait()
+    total = sum(pss_kib(p.pid) for p, _ in filhos) / 1024
+    sair.set()
+    for p, _ in filhos:
+        p.join()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--in-process", nargs=2, metavar=("MODO", "N"))
+    args = parser.parse_args()
+
+    if args.in_process:
+        in_process(args.in_process[0], int(args.in_process[1]))
+        return
+
+    os.environ["INPE_CACHE_DIR"] = tempfile.mkdtemp()
+    seed(args.rows)
+    print(f"{args.rows} focos · colunas {', '.join(COLUMNS)}\n")
+
+    print(f"{'sessões':>8} {'RSS cópia (MiB)':>16} {'RSS store (MiB)':>16}")
+    for n in args.sessions:
+        valores = []
+        for modo in ("copia", "store"):
+            out = subprocess.run(
+                [sys.executable, __file__, "--in-process", modo, str(n)],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            valores.append(float(out))
+        print(f"{n:>8} {valores[0]:>16.0f} {valores[1]:>16.0f}")
+
+    print(f"\n{'processos':>9} {'PSS cópia (MiB)':>16} {'PSS store (MiB)':>16}")
+    for n in args.sessions:
+        copia = across_processes("copia", n)
+        store = across_processes("store", n)
+        print(f"{n:>9} {copia:>16.0f} {store:>16.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Tamanho do mapa com contornos de propriedade muito detalhados.
+
+Monta um polígono irregular (com um buraco) com ``--vertices`` vértices,
+como os de KMLs levantados em campo, e compara o HTML do mapa com o
+contorno enviado inteiro (``folium.Polygon`` com a lista de vértices) e
+com os níveis de `simplification_levels`, além do tempo de simplificação.
+
+Uso: python benchmarks/bench_simplify.py [--vertices 1000 10000 50000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import folium
+import numpy as np
+from shapely.geometry import Polygon
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from queimadas.render import (  # noqa: E402
+    add_polygon_layers,
+    map_html_bytes,
+    simplification_levels,
+)
+
+CENTRO = (-57.1, -19.1)
+
+
+def surveyed_polygon(n, raio_km=4.0, seed=0):
+    """Contorno irregular de ~`raio_km` com `n` vértices e um buraco."""
+    rng = np.random.default_rng(seed)
+    t = np.linspace(0, 2 * np.pi, n, endpoint=False)
+    # ondulações em várias escalas + ruído de GPS de ~1 m
+    r = 1 + 0.15 * np.sin(3 * t) + 0.05 * np.sin(17 * t) + 0.01 * np.sin(101 * t)
+    r = r * raio_km / 111.32 + rng.normal(0, 1e-5, n)
+    ext = np.column_stack([CENTRO[0] + r * np.cos(t), CENTRO[1] + r * np.sin(t)])
+    buraco = np.column_stack(
+        [CENTRO[0] + 0.005 * np.cos(t[::50]), CENTRO[1] + 0.005 * np.sin(t[::50])]
+    )
+    return Polygon(ext, [buraco])
+
+
+def verbatim_map(poly):
+    m = folium.Map(location=CENTRO[::-1], zoom_start=12)
+    coords = np.asarray(poly.exterior.coords)[:, ::-1].tolist()
+    folium.Polygon(locations=coords, color="green", fill=True).add_to(m)
+    return m
+
+
+def levels_map(niveis):
+    m = folium.Map(location=CENTRO[::-1], zoom_start=12)
+    add_polygon_layers(m, niveis, color="green", fill=True)
+    return m
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--vertices", type=int, nargs="+", default=[1_000, 10_000, 50_000]
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'vértices':>10}{'HTML inteiro':>14}{'HTML níveis':>13}"
+        f"{'simplificar':>13}  vértices por nível"
+    )
+    for n in args.vertices:
+        poly = surveyed_polygon(n)
+        inicio = time.perf_counter()
+        _, _, niveis = simplification_levels(poly)
+        simplificar = time.perf_counter() - inicio
+        inteiro = map_html_bytes(verbatim_map(poly))
+        simplificado = map_html_bytes(levels_map(niveis))
+        print(
+            f"{n:>10,}{inteiro / 1024:>11.0f} KiB{simplificado / 1024:>10.0f} KiB"
+            f"{simplificar * 1000:>10.0f} ms  "
+            + " / ".join(f"z{nv.zoom}:{nv.vertices}" for nv in niveis)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Carga fria de vários dias a partir de cada origem local.
+
+Gera um espelho sintético, sobe o substituto HTTP com algumas latências e
+mede `fetch_days` com o cache vazio pela origem ``mirror`` (direto do
+disco) e pela ``inpe`` apontada para o substituto. Mede também o
+``sync`` do intervalo para um segundo espelho e a repetição dele (que não
+baixa nada).
+
+Uso: python benchmarks/bench_sources.py [--days 7] [--rows 20000]
+"""
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from queimadas import inpe, store  # noqa: E402
+from queimadas.sources import HttpSource, make_server, sync_days  # noqa: E402
+from queimadas.synthetic import synthetic_csv  # noqa: E402
+
+
+def cold_fetch(dates, cache_dir):
+    inpe.CACHE_DIR = Path(cache_dir)
+    store._store = None
+    inicio = time.perf_counter()
+    df, falhas = inpe.fetch_days(dates, ["lat", "lon", "frp"])
+    assert not falhas, falhas
+    return time.perf_counter() - inicio, len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--latencies", type=float, nargs="+", default=[0.0, 0.2, 1.0])
+    args = parser.parse_args()
+
+    fim = date.today() - timedelta(days=1)
+    dates = [fim - timedelta(days=i) for i in range(args.days)][::-1]
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        espelho = tmp / "espelho"
+        espelho.mkdir()
+        for d in dates:
+            (espelho / f"focos_diario_br_{d:%Y%m%d}.csv").write_bytes(
+                synthetic_csv(args.rows, day=d, seed=d.toordinal())
+            )
+
+        linhas = []
+        inpe.SOURCE = "mirror"
+        inpe.MIRROR_DIR = espelho
+        linhas.append(("mirror", *cold_fetch(dates, tmp / "c-mirror")))
+
+        inpe.SOURCE = "inpe"
+        for latencia in args.latencies:
+            server = make_server(espelho, port=0, latency=latencia)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            inpe.BASE_URL = server.server_url
+            rotulo = f"substituto ({latencia:.1f} s)"
+            linhas.append((rotulo, *cold_fetch(dates, tmp / f"c-{latencia}")))
+            if latencia == args.latencies[-1]:
+                source = HttpSource(server.server_url, inpe.get_session())
+                for rotulo in ("sync", "sync repetido"):
+                    inicio = time.perf_counter()
+                    baixados, _, _ = sync_days(source, tmp / "copia", dates)
+                    segundos = time.perf_counter() - inicio
+                    linhas.append(
+                        (f"{rotulo} ({latencia:.1f} s)", segundos, len(baixados))
+                    )
+            server.shutdown()
+            server.server_close()
+
+    print(f"{args.days} dias × {args.rows:,} focos")
+    print(f"{'origem':<24}{'s':>8}{'linhas/dias':>14}")
+    for rotulo, segundos, n in linhas:
+        print(f"{rotulo:<24}{segundos:8.2f}{n:>14,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Suíte offline dos caminhos quentes dos painéis, em vários tamanhos.
+
+Gera os dados com `queimadas.synthetic` (sem rede) e mede, para cada
+tamanho, o melhor de ``--repeat`` execuções de cada etapa:
+
+* parse: `parse_inpe_csv` sobre os bytes de um CSV no formato do INPE;
+* siglas: `add_uf_columns` (estado_sigla e município-UF);
+* polígono: `process_df_on_polygon` com um retângulo do Pantanal;
+* agregação: `summarize` da página de focos;
+* payload do mapa de calor: `bin_points` + a lista enviada ao leafmap;
+* payload da propriedade: `filter_near_polygon` + `hotspots_geojson`.
+
+Uso: python benchmarks/bench_suite.py [--sizes 10000 100000 1000000] [--repeat 3]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from shapely.geometry import box
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from queimadas.aggregation import summarize  # noqa: E402
+from queimadas.geo import process_df_on_polygon  # noqa: E402
+from queimadas.grid import bin_points, cell_size_deg  # noqa: E402
+from queimadas.render import filter_near_polygon, hotspots_geojson  # noqa: E402
+from queimadas.schema import add_uf_columns, parse_inpe_csv  # noqa: E402
+from queimadas.synthetic import generate_hotspots  # noqa: E402
+
+PANTANAL = box(-58.5, -22.0, -54.5, -16.0)
+PROPRIEDADE = box(-57.2, -19.2, -57.0, -19.0)
+
+
+def heatmap_payload(df):
+    grade = bin_points(df, "frp", cell_size_deg(10, 4))
+    return len(json.dumps(grade[["lat", "lon", "frp"]].values.tolist()))
+
+
+def property_payload(df):
+    return len(json.dumps(hotspots_geojson(filter_near_polygon(df, PROPRIEDADE, 20))))
+
+
+def stages(df, raw):
+    enriquecido = add_uf_columns(df.copy(deep=False))
+    return {
+        "parse": lambda: parse_inpe_csv(raw),
+        "siglas": lambda: add_uf_columns(df.copy(deep=False)),
+        "polígono": lambda: process_df_on_polygon(PANTANAL, df),
+        "agregação": lambda: summarize(enriquecido, "frp"),
+        "payload mapa de calor": lambda: heatmap_payload(df),
+        "payload propriedade": lambda: property_payload(df),
+    }
+
+
+def best_of(func, repeat):
+    melhor = float("inf")
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        resultado = func()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    colunas = {}
+    payloads = {}
+    for n in args.sizes:
+        inicio = time.perf_counter()
+        df = generate_hotspots(n, seed=0)
+        gerar = time.perf_counter() - inicio
+        raw = df.to_csv(index=False, date_format="%Y-%m-%d %H:%M:%S").encode()
+        colunas[n] = {"geração": gerar}
+        for nome, func in stages(df, raw).items():
+            segundos, resultado = best_of(func, args.repeat)
+            colunas[n][nome] = segundos
+            if isinstance(resultado, int):
+                payloads.setdefault(nome, {})[n] = resultado
+
+    print(f"{'etapa (ms)':<28}" + "".join(f"{n:>12,}" for n in args.sizes))
+    for nome in colunas[args.sizes[0]]:
+        print(
+            f"{nome:<28}"
+            + "".join(f"{colunas[n][nome] * 1000:12.1f}" for n in args.sizes)
+        )
+    for nome, tamanhos in payloads.items():
+        print(
+            f"{nome + ' (KiB)':<28}"
+            + "".join(f"{tamanhos[n] / 1024:12.1f}" for n in args.sizes)
+        )
+
+
+if __name__ == "__main__":
+    main()
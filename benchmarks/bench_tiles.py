@@ -0,0 +1,139 @@
+"""Mapa de calor em tiles locais contra os focos embutidos no HTML.
+
+Para cada tamanho, compara o HTML do mapa com os focos embutidos (como
+``add_heatmap``, com e sem a grade) e com a camada de tiles, e mede o
+servidor de tiles: registrar a camada (primeira vez e reruns seguintes,
+que só calculam o hash) e buscar por HTTP todos os tiles de uma tela de
+``--viewport`` pixels sobre o Brasil em alguns zooms, com o cache de
+tiles vazio e depois cheio, somando os bytes comprimidos transferidos.
+
+Uso: INPE_TILES=1 python benchmarks/bench_tiles.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import math
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import folium
+from folium import plugins
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_heatmap import make_points  # noqa: E402
+
+from queimadas import tiles  # noqa: E402
+from queimadas.grid import bin_points, cell_size_deg  # noqa: E402
+from queimadas.render import add_hotspot_tiles, map_html_bytes  # noqa: E402
+
+CENTRO = (-51.0641, -10.91)
+ZOOMS = (4, 6, 8, 11)
+RADIUS = 10
+
+
+def embedded_html(df, grade):
+    if grade:
+        df = bin_points(df, "frp", cell_size_deg(RADIUS, 4))
+    m = folium.Map(location=CENTRO[::-1], zoom_start=4)
+    plugins.HeatMap(df[["lat", "lon", "frp"]].values.tolist(), radius=RADIUS).add_to(m)
+    return map_html_bytes(m)
+
+
+def tiles_html(url):
+    m = folium.Map(location=CENTRO[::-1], zoom_start=4)
+    add_hotspot_tiles(m, url, "calor", RADIUS)
+    return map_html_bytes(m)
+
+
+def viewport(z, largura, altura):
+    """Tiles (x, y) de uma tela de `largura` × `altura` px em CENTRO."""
+    x, y = tiles.mercator(*CENTRO)
+    cx, cy = float(x) * 2**z * 256, float(y) * 2**z * 256
+    xs = range(
+        math.floor((cx - largura / 2) / 256), math.floor((cx + largura / 2) / 256) + 1
+    )
+    ys = range(
+        math.floor((cy - altura / 2) / 256), math.floor((cy + altura / 2) / 256) + 1
+    )
+    return [(tx, ty) for tx in xs for ty in ys]
+
+
+def fetch_viewport(url, z, coords, margem):
+    def get(xy):
+        pedido = urllib.request.Request(
+            url.format(z=z, x=xy[0], y=xy[1]) + f"?b={margem}",
+            headers={"Accept-Encoding": "gzip"},
+        )
+        with urllib.request.urlopen(pedido) as resposta:
+            return len(resposta.read())
+
+    inicio = time.perf_counter()
+    # o navegador abre ~6 conexões por origem
+    with ThreadPoolExecutor(6) as executor:
+        total = sum(executor.map(get, coords))
+    return time.perf_counter() - inicio, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--viewport", type=int, nargs=2, default=[1280, 700])
+    args = parser.parse_args()
+
+    server = tiles.start_tile_server()
+    if server is None:
+        sys.exit("servidor de tiles desligado: rode com INPE_TILES=1")
+    service = server.service
+    margem = RADIUS + 15
+
+    print(
+        f"{'focos':>9}{'HTML pontos':>13}{'HTML grade':>12}{'HTML tiles':>12}"
+        f"{'registrar':>11}{'rerun':>8}"
+    )
+    medidas = []
+    for n in args.sizes:
+        df = make_points(n)
+        pontos = embedded_html(df, False)
+        grade = embedded_html(df, True)
+        inicio = time.perf_counter()
+        url = tiles.serve_layer(df, "frp")
+        registrar = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        tiles.serve_layer(df, "frp")
+        rerun = time.perf_counter() - inicio
+        print(
+            f"{n:>9,}{pontos / 2**20:>10.2f} MiB{grade / 2**20:>8.2f} MiB"
+            f"{tiles_html(url) / 2**20:>8.2f} MiB{registrar * 1000:>8.0f} ms"
+            f"{rerun * 1000:>5.0f} ms"
+        )
+        medidas.append((n, url))
+
+    largura, altura = args.viewport
+    print(
+        f"\ntela de {largura}×{altura} px: {'focos':>9}{'zoom':>6}{'tiles':>7}"
+        f"{'frio (ms)':>11}{'cache (ms)':>12}{'KiB':>8}"
+    )
+    for n, url in medidas:
+        for z in ZOOMS:
+            coords = viewport(z, largura, altura)
+            frio, total = fetch_viewport(url, z, coords, margem)
+            quente, _ = fetch_viewport(url, z, coords, margem)
+            print(
+                f"{'':>26}{n:>9,}{z:>6}{len(coords):>7}{frio * 1000:>11.0f}"
+                f"{quente * 1000:>12.0f}{total / 1024:>8.0f}"
+            )
+    estatisticas = service.stats()
+    print(
+        f"\ncache de tiles: {estatisticas['tiles']} tiles "
+        f"({estatisticas['bytes_tiles'] / 2**20:.1f} MiB), "
+        f"{estatisticas['acertos']} acertos / {estatisticas['faltas']} faltas"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import streamlit as st
 import leafmap.foliumap as leafmap
 
+from queimadas.basemaps import cached_basemap, format_stats, get_cache
+
 st.set_page_config(layout="wide")
 
 markdown = """
@@ -18,9 +20,13 @@ st.title("Split-panel Map")
 with st.expander("See source code"):
     with st.echo():
         m = leafmap.Map()
+        # as mesmas camadas do leafmap, com os tiles pelo cache em disco
         m.split_map(
-            left_layer="ESA WorldCover 2020 S2 FCC", right_layer="ESA WorldCover 2020"
+            left_layer=cached_basemap("ESA WorldCover 2020 S2 FCC"),
+            right_layer=cached_basemap("ESA WorldCover 2020"),
         )
         m.add_legend(title="ESA Land Cover", builtin_legend="ESA_WorldCover")
 
 m.to_streamlit(height=700)
+
+st.sidebar.caption(format_stats(get_cache().stats()))
@@ -1,6 +1,14 @@
 import streamlit as st
 import leafmap.foliumap as leafmap
 
+from queimadas.basemaps import (
+    format_stats,
+    get_cache,
+    proxy_xyz,
+    search_qms,
+    xyz_service,
+)
+
 st.set_page_config(layout="wide")
 
 markdown = """
@@ -38,7 +46,8 @@ with row1_col2:
     if keyword:
         options = leafmap.search_xyz_services(keyword=keyword)
         if checkbox:
-            options = options + leafmap.search_qms(keyword=keyword)
+            # buscas no QMS ficam no cache em disco, como as capacidades WMS
+            options = options + (search_qms(keyword) or [])
 
         tiles = empty.multiselect("Select XYZ tiles to add to the map:", options)
 
@@ -47,6 +56,10 @@ with row1_col2:
 
         if tiles is not None:
             for tile in tiles:
-                m.add_xyz_service(tile)
+                # tiles pelo proxy local, que guarda em disco os já vistos
+                url, attribution = xyz_service(tile)
+                m.add_tile_layer(proxy_xyz(url), name=tile[4:], attribution=attribution)
 
         m.to_streamlit(width, height)
+
+st.sidebar.caption(format_stats(get_cache().stats()))
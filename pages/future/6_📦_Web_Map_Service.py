@@ -2,6 +2,8 @@ import ast
 import streamlit as st
 import leafmap.foliumap as leafmap
 
+from queimadas.basemaps import format_stats, get_cache, proxy_wms, wms_layers
+
 st.set_page_config(layout="wide")
 
 markdown = """
@@ -17,7 +19,9 @@ st.sidebar.image(logo)
 
 @st.cache_data
 def get_layers(url):
-    options = leafmap.get_wms_layers(url)
+    # o GetCapabilities passa pelo cache em disco: outras sessões e
+    # reinícios do app não voltam ao servidor remoto
+    options = wms_layers(url)
     return options
 
 
@@ -69,11 +73,18 @@ with row1_col2:
 
         if layers is not None:
             for layer in layers:
+                # tiles pelo proxy local, que guarda em disco os já vistos
                 m.add_wms_layer(
-                    url, layers=layer, name=layer, attribution=" ", transparent=True
+                    proxy_wms(url),
+                    layers=layer,
+                    name=layer,
+                    attribution=" ",
+                    transparent=True,
                 )
         if add_legend and legend_text:
             legend_dict = ast.literal_eval(legend_text)
             m.add_legend(legend_dict=legend_dict)
 
         m.to_streamlit(width, height)
+
+st.sidebar.caption(format_stats(get_cache().stats()))
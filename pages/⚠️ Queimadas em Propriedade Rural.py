@@ -1,140 +1,105 @@
 import streamlit as st
-import leafmap.foliumap as leafmap
-import folium
-import requests
 import pandas as pd
 from datetime import datetime, timedelta
-from io import StringIO
-import altair as alt
 import json
-import re
-from shapely.geometry import Point, Polygon, LineString, shape
-import random
 
+from queimadas.archive import fetch_range
+from queimadas.inpe import TODAY_TTL, FetchError, data_version, days_between, ensure_fresh
+from queimadas.instrumentation import DEBUG, instrument_run, stage
+from queimadas.scheduler import format_status, start_scheduler
+from queimadas.schema import add_uf_columns
+from queimadas.store import cache_frames
 
-from fastkml import kml, Placemark
+# leafmap, folium, shapely e os módulos de KML/lote são importados dentro
+# das funções que os usam: cada um só carrega quando aquele caminho roda
+
+# colunas do CSV do INPE usadas nesta página
+COLUMNS = ["lat", "lon", "data_hora_gmt", "satelite", "municipio", "estado", "bioma", "frp", "risco_fogo"]
+# maior distância da propriedade que a página mostra (margem do mapa)
+MAX_MARGIN_KM = 200
 
 def generate_fake_df(poly, n=10):
     """
-    Gera um DataFrame com n pontos aleatórios dentro de `poly`,
+    Gera um DataFrame com n focos sintéticos dentro de `poly`,
     no formato exigido.
     """
-    minx, miny, maxx, maxy = poly.bounds  # lon_min, lat_min, lon_max, lat_max
-    records = []
-    for i in range(n):
-        # sortea até cair dentro do polígono
-        while True:
-            lon = random.uniform(minx, maxx)
-            lat = random.uniform(miny, maxy)
-            if poly.contains(Point(lon, lat)):
-                break
-
-        registro = {
-            'id': i + 1,
-            'lat': lat,
-            'lon': lon,
-            'data_hora_gmt': (datetime.utcnow() - timedelta(days=random.randint(0,5))
-                              ).strftime('%Y-%m-%d %H:%M:%S'),
-            'satelite': random.choice(['Aqua', 'Terra']),
-            'municipio': 'MunicípioFake',
-            'estado': 'EstadoFake',
-            'pais': 'Brasil',
-            'municipio_id': random.randint(1000, 9999),
-            'estado_id': random.randint(10, 99),
-            'pais_id': 105,
-            'numero_dias_sem_chuva': random.randint(0, 30),
-            'precipitacao': round(random.uniform(0, 100), 2),
-            'risco_fogo': random.choice([0, 1, 2, 3]),
-            'bioma': random.choice(['Cerrado', 'Pantanal']),
-            'frp': round(random.uniform(0, 500), 2),
-            'estado_sigla': 'EF',
-            'municipio_siglaUF': 'MunicípioFake-EF',
-        }
-        records.append(registro)
-
-    return pd.DataFrame.from_records(records)
-
-
-def get_data_from_inpe(date):
-    date = date.strftime('%Y%m%d')
-    
-    # Construa a URL com base na data
-    url = f'https://dataserver-coids.inpe.br/queimadas/queimadas/focos/csv/diario/Brasil/focos_diario_br_{date}.csv'
-    
-    # Tente fazer o download do arquivo
-    response = requests.get(url)
-    if response.status_code == 200:
-        # Carregue o conteúdo CSV em um DataFrame do Pandas
-        csv_data = StringIO(response.text)
-        df = pd.read_csv(csv_data)
-        if not df.empty:
-            return df
-        else:
-            return pd.DataFrame()  # Retorna um DataFrame vazio se não houver dados
-    else:
-        print("Erro ao acessar a URL:", response.status_code)
-        return pd.DataFrame()  # Retorna um DataFrame vazio em caso de falha na solicitação
+    from queimadas.synthetic import generate_hotspots
 
-def generate_map_with_polygon_and_hotspots(folium_coords, df):
-    # folium_coords já é: [(lat1, lon1), (lat2, lon2), ...]
-    lats = [pt[0] for pt in folium_coords]
-    lons = [pt[1] for pt in folium_coords]
-    centroid = [sum(lats) / len(lats), sum(lons) / len(lons)]
+    return add_uf_columns(generate_hotspots(n, poly))
 
-    st.subheader("📍 Visualização do Polígono da Propriedade e Focos de Incêndio")
-    m = leafmap.Map(center=centroid, zoom=10)
-
-    # desenha o polígono diretamente
-    folium.Polygon(
-        locations=folium_coords,
-        color="green",
-        weight=2,
-        fill=True,
-        fill_color="green",
-        fill_opacity=0.3,
-    ).add_to(m)
-
-    # plota os focos
-    for _, row in df.iterrows():
-        folium.CircleMarker(
-            location=[row['lat'], row['lon']],
-            radius=1,
-            color="red",
-            fill=True,
-            fill_color="red",
-            fill_opacity=0.3,
-            popup=f"Data: {row['data_hora_gmt']}\nRisco: {row['risco_fogo']}"
-        ).add_to(m)
 
-    m.to_streamlit(
-        height=700,
-        scrolling=False,
-        add_layer_control=False,
-    )
+@st.cache_resource(max_entries=16, show_spinner=False)
+def polygon_levels(wkb):
+    import shapely
+    from queimadas.render import simplification_levels
 
-def process_df_on_polygon(poly,df):
-    df = df.copy()
-    df['dentro'] = df.apply(
-        lambda row: poly.contains(Point(row['lon'], row['lat'])),
-        axis=1
-    )
-    return df
+    # simplificado uma vez por polígono; a chave são os bytes WKB
+    return simplification_levels(shapely.from_wkb(wkb))
 
-def extract_placemarks(features):
-    """
-    Dada uma lista de features (Document, Folder, Placemark, etc),
-    retorna uma lista plana de todos os Placemarks encontradas recursivamente.
-    """
-    pms = []
-    for fea in features:
-        if isinstance(fea, Placemark):
-            pms.append(fea)
-        # todo objeto que tenha .features() pode conter Placemarks dentro
-        elif hasattr(fea, "features"):
-            pms.extend(extract_placemarks(list(fea.features)))
-    return pms
+def generate_map_with_polygon_and_hotspots(df, poly, margin_km, rings_km=()):
+    import folium
+    import leafmap.foliumap as leafmap
+    from queimadas.proximity import ring_geometries
+    from queimadas.render import POPUP_FIELDS, add_hotspot_layer, add_hotspot_tiles, add_polygon_layers, filter_near_polygon
+    from queimadas.tiles import serve_layer
+
+    centroide = poly.centroid
+    st.subheader("📍 Visualização do Polígono da Propriedade e Focos de Incêndio")
+    m = leafmap.Map(center=[centroide.y, centroide.x], zoom=10)
+
+    # o mapa recebe o contorno simplificado para cada faixa de zoom; os
+    # testes de "dentro" continuam usando `poly` exato
+    with stage("contorno da propriedade") as etapa:
+        vertices, bytes_originais, niveis = polygon_levels(poly.wkb)
+        contorno = add_polygon_layers(
+            m, niveis, color="green", weight=2, fill=True, fillColor="green", fillOpacity=0.3
+        )
+        etapa["bytes"] = contorno["bytes"]
+
+    # anéis de alerta, medidos em metros ao redor do polígono
+    for km, anel in ring_geometries(poly, rings_km):
+        folium.GeoJson(
+            anel.__geo_interface__,
+            style_function=lambda _: dict(color="orange", weight=1.5, dashArray="6 4", fill=False),
+            tooltip=f"{km:g} km",
+        ).add_to(m)
+
+    # plota só os focos próximos da propriedade (e dos anéis), numa única camada
+    with stage("focos perto da propriedade", rows=len(df)):
+        proximos = filter_near_polygon(df, poly, max([margin_km, *rings_km]))
+    # com o servidor de tiles, os focos não entram no HTML do mapa: o
+    # navegador busca os tiles da área visível e os popups vêm com eles
+    with stage("camada de focos", rows=len(proximos)) as etapa:
+        url = serve_layer(proximos, fields=tuple(POPUP_FIELDS))
+        if url:
+            add_hotspot_tiles(m, url, "pontos", radius=3, fields=POPUP_FIELDS)
+        else:
+            stats = add_hotspot_layer(m, proximos)
+            etapa["bytes"] = stats["bytes"]
+    if url:
+        st.caption(f"{len(proximos)} de {len(df)} focos no mapa · servidos em tiles conforme a área visível")
+    else:
+        st.caption(
+            f"{stats['pontos']} de {len(df)} focos no mapa · "
+            f"{stats['bytes'] / 1024:.0f} KiB · montado em {stats['segundos'] * 1000:.0f} ms"
+        )
+    if contorno["vertices"] != [vertices]:
+        st.caption(
+            f"Contorno: {vertices} vértices ({bytes_originais / 1024:.0f} KiB) → "
+            f"{' / '.join(map(str, contorno['vertices']))} por faixa de zoom "
+            f"({contorno['bytes'] / 1024:.0f} KiB no mapa)"
+        )
+
+    with stage("enviar mapa"):
+        m.to_streamlit(
+            height=700,
+            scrolling=False,
+            add_layer_control=False,
+        )
 
 def handle_manual_input():
+    from shapely.geometry import Polygon
+
     raw = st.text_area(
         "Cole aqui a lista de coordenadas do polígono:",
         value='[[-16.40, -58.50],[-16.40, -52.10],[-23.60, -52.10],'
@@ -145,104 +110,158 @@ def handle_manual_input():
         latlon = json.loads(raw)
         # 2. Cria shapely Polygon em (lon, lat)
         poly = Polygon([(lon, lat) for lat, lon in latlon])
-        # 3. Mantém lista de (lat, lon) para o seu map
-        folium_coords = latlon
         st.success("✅ Polígono manual normalizado com sucesso")
     except Exception as e:
         st.error(f"Falha no parse do JSON: {e}")
         st.stop()
     
-    return poly,folium_coords
+    return poly
+
+@st.cache_data(max_entries=4, show_spinner="Lendo polígonos...")
+def load_polygon_file(file_id, filename, _uploaded):
+    from queimadas.kml import read_polygon_file
+
+    # a chave é o id do upload: não precisa hashear o arquivo a cada rerun
+    _uploaded.seek(0)
+    return read_polygon_file(filename, _uploaded)
 
 def handle_kml_input():
+    from queimadas.kml import PolygonFileError
+
     uploaded = st.file_uploader("Faça upload do seu KML", type="kml")
     if not uploaded:
         st.stop()
 
-    content = uploaded.read().decode("utf-8")
-    content = re.sub(r'^\s*<\?xml[^>]+\?>\s*', "", content)
-    content = re.sub(
-        r'<kml[^>]*xmlns="[^"]+"',
-        '<kml xmlns="http://www.opengis.net/kml/2.2"',
-        content,
-        count=1
-    )
-    k = kml.KML.from_string(content)
-
-    root_feats = list(k.features)
-    placemarks = extract_placemarks(root_feats)
-
-    if not placemarks:
-        st.error("Nenhuma trilha/polígono encontrada neste KML.")
+    try:
+        items = load_polygon_file(uploaded.file_id, uploaded.name, uploaded)
+    except PolygonFileError as e:
+        st.error(str(e))
         st.stop()
 
-    valid_items = []
-    for pm in placemarks:
-
-        geom = pm.geometry
-        raw = list(geom.coords)
-
-        if len(raw) <= 1:
-            continue
+    idx = st.selectbox(
+        "Selecione um polígono válido",
+        range(len(items)),
+        format_func=lambda i: items[i].name,
+    )
+    escolha = items[idx]
 
-        shp = shape(pm.geometry)  # converte para shapely
+    st.success(f"✅ Polígono `{escolha.name}` selecionado!")
+    return escolha.geometry
 
-        if shp.geom_type == "LineString" and shp.is_ring:
-            shp = shape(pm.geometry)
-            coords = list(shp.coords)
-            poly = Polygon([(lon, lat) for lon, lat, *_ in coords])
-            folium_coords = [(lat, lon) for lon, lat, *_ in coords]
-            valid_items.append((pm,poly,folium_coords))
+def handle_batch_input():
+    from queimadas.kml import PolygonFileError
 
-    if not valid_items:
-        st.error("Nenhum polígono (anel fechado) encontrado neste KML.")
+    uploaded = st.file_uploader(
+        "Faça upload de um KML ou GeoJSON com as propriedades",
+        type=["kml", "geojson", "json"],
+    )
+    if not uploaded:
         st.stop()
 
-    valid_items.sort(key=lambda tpl: tpl[1].area, reverse=True)
-    ring_pms, ring_polys, folium_coords = zip(*valid_items)
-    ring_names = [pm.name or "<sem nome>" for pm in ring_pms]
+    try:
+        items = load_polygon_file(uploaded.file_id, uploaded.name, uploaded)
+    except (PolygonFileError, ValueError, KeyError) as e:
+        st.error(f"Falha ao ler `{uploaded.name}`: {e}")
+        st.stop()
 
-    escolha = st.selectbox("Selecione um polígono válido", ring_names, index=0)
-    idx = ring_names.index(escolha)
-    poly = ring_polys[idx]
-    folium_coord = folium_coords[idx]
+    st.success(f"✅ {len(items)} propriedades carregadas")
+    return [it.name for it in items], [it.geometry for it in items]
 
-    st.success(f"✅ Polígono `{escolha}` selecionado!")
-    return poly, folium_coord
+def date_input():
+    ontem = pd.to_datetime(datetime.now().date()) - timedelta(days=1)
+    intervalo = st.checkbox("Analisar um intervalo de datas")
+    if intervalo:
+        periodo = st.date_input("Selecione o intervalo", value=(ontem - timedelta(days=6), ontem))
+        if len(periodo) < 2:
+            st.info("Selecione a data final do intervalo.")
+            st.stop()
+        return days_between(*periodo)
+    return [st.date_input("Selecione uma data", value=ontem)]
 
 def parameter_input():
     st.subheader("🔧 Definição")
-    date = st.date_input("Selecione uma data", value=pd.to_datetime(datetime.now().date()) - timedelta(days=1))
+    dates = date_input()
 
     # 1) Fonte
     fonte = st.radio("De onde vem o polígono?", ["Manual (input de texto)", "Do KML"])
 
     # depois de st.radio(…)
     poly = None
-    folium_coords = None
 
     if fonte == "Manual (input de texto)":
-        poly,folium_coords = handle_manual_input()
+        poly = handle_manual_input()
 
     else:  # fonte == "Do KML"
-        poly, folium_coords = handle_kml_input()
-
-    return date,poly,folium_coords
-
-def create_dataframe(date):
-    df = get_data_from_inpe(date)
-
-    estado_siglas = {
-        "ACRE": "AC", "ALAGOAS": "AL", "AMAPÁ": "AP", "AMAZONAS": "AM", "BAHIA": "BA", 
-        "CEARÁ": "CE", "DISTRITO FEDERAL": "DF", "ESPÍRITO SANTO": "ES", "GOIÁS": "GO", 
-        "MARANHÃO": "MA", "MATO GROSSO": "MT", "MATO GROSSO DO SUL": "MS", "MINAS GERAIS": "MG", 
-        "PARÁ": "PA", "PARAÍBA": "PB", "PARANÁ": "PR", "PERNAMBUCO": "PE", "PIAUÍ": "PI", 
-        "RIO DE JANEIRO": "RJ", "RIO GRANDE DO NORTE": "RN", "RIO GRANDE DO SUL": "RS", 
-        "RONDÔNIA": "RO", "RORAIMA": "RR", "SANTA CATARINA": "SC", "SÃO PAULO": "SP", 
-        "SERGIPE": "SE", "TOCANTINS": "TO"
-    }
-    df['estado_sigla'] = df['estado'].map(estado_siglas)
-    df['municipio_siglaUF'] = df['municipio'].str.title() + '-' + df['estado_sigla']
+        poly = handle_kml_input()
+
+    return dates,poly
+
+# cache_frames: todas as sessões recebem o mesmo frame (somente leitura)
+# em vez de cada uma desserializar sua própria cópia, num LRU limitado por
+# bytes (INPE_FRAMES_BUDGET_MB) e não por número de entradas
+# `versao` entra só na chave: muda quando chegam focos novos do dia
+@cache_frames(ttl=TODAY_TTL)
+def load_hotspots(dates, bbox=None, versao=(), dedup=None):
+    df, falhas = fetch_range(dates, COLUMNS, bbox=bbox)
+    if not df.empty:
+        if dedup:
+            from queimadas.dedup import deduplicate
+
+            # dedup = (km, horas): um evento por fogo visto por vários
+            # satélites ou passagens
+            df = deduplicate(df, *dedup)
+        df = add_uf_columns(df)
+    return df, falhas
+
+def dedup_input():
+    from queimadas.dedup import DISTANCE_KM, WINDOW_H
+
+    if not st.checkbox("Agrupar detecções repetidas do mesmo fogo"):
+        return None
+    distancia = st.number_input("Distância máxima (km):", 0.1, 10.0, DISTANCE_KM, 0.1)
+    janela = st.number_input("Janela de tempo (horas):", 0.5, 48.0, WINDOW_H, 0.5)
+    return (distancia, janela)
+
+@st.fragment(run_every=60)
+def new_data_notifier(dates, versao):
+    # confere de tempos em tempos se o INPE publicou focos novos para hoje;
+    # a atualização é incremental e só vai à rede depois do TTL
+    hoje = datetime.now().date()
+    if hoje not in dates:
+        return
+    try:
+        ensure_fresh(hoje)
+    except FetchError:
+        return
+    atual = data_version(dates)
+    if atual == versao:
+        return
+    if st.session_state.get("versao_avisada") != atual:
+        st.session_state["versao_avisada"] = atual
+        st.toast("🔥 Novos focos publicados pelo INPE para hoje")
+    if st.button("Carregar focos novos"):
+        st.rerun()
+
+def create_dataframe(dates, polys):
+    import shapely
+    from queimadas.render import expand_bounds
+
+    # só os focos ao alcance do mapa: no arquivo histórico o recorte é
+    # feito na leitura do Parquet
+    bounds = shapely.total_bounds(polys)
+    bbox = tuple(round(float(v), 4) for v in expand_bounds(bounds, MAX_MARGIN_KM))
+    versao = data_version(dates)
+    dedup = dedup_input()
+    with stage("carregar focos") as etapa:
+        df, falhas = load_hotspots(tuple(dates), bbox, versao, dedup)
+        etapa["linhas"] = len(df)
+    new_data_notifier(tuple(dates), versao)
+    for dia, erro in falhas.items():
+        st.warning(f"Focos de {dia:%d/%m/%Y} indisponíveis: {erro}")
+    if df.empty:
+        st.stop()
+    if dedup:
+        st.caption(f"{int(df['deteccoes'].sum())} detecções agrupadas em {len(df)} eventos de fogo")
 
     return df
 
@@ -257,24 +276,118 @@ def page_layout_base():
     st.sidebar.info(markdown)
     logo = "https://www.ufms.br/wp-content/uploads/2015/11/ufms_logo_assinatura_vertical_positiva.png"
     st.sidebar.image(logo)
+    st.sidebar.caption(format_status(start_scheduler().status()))
 
     st.title("⚠️ Queimadas em Propriedade Rural")
 
 def metrics(df,poly):
-    df = process_df_on_polygon(poly, df)
+    from queimadas.geo import process_df_on_polygon
+
+    with stage("focos no polígono", rows=len(df)):
+        df = process_df_on_polygon(poly, df)
     count = int(df['dentro'].sum())
     st.subheader("📊 Incêndios ativos na área")
-    st.metric(label="Número de focos detectados", value=count)
+    if 'deteccoes' in df:
+        # com o agrupamento, cada linha é um evento de fogo
+        deteccoes = int(df.loc[df['dentro'], 'deteccoes'].sum())
+        st.metric(label="Eventos de fogo na área", value=count, delta=f"{deteccoes} detecções", delta_color="off")
+    else:
+        st.metric(label="Número de focos detectados", value=count)
+
+# no rerun só do fragmento, o mapa abre a própria execução medida;
+# dentro da página, entra na execução dela
+@st.fragment
+@instrument_run("Propriedade Rural · mapa")
+def map_section(df, poly):
+    # fragmento: mudar a margem reconstrói só o mapa
+    margin_km = st.slider("Margem exibida ao redor da propriedade (km):", 0, MAX_MARGIN_KM, 20)
+    rings_km = st.multiselect(
+        "Anéis de alerta (km):", [1, 2, 5, 10, 20, 50], default=[1, 5, 10]
+    )
+    generate_map_with_polygon_and_hotspots(df, poly, margin_km, rings_km)
+    if rings_km:
+        proximity_section(df, poly, rings_km)
+
+def proximity_section(df, poly, rings_km):
+    from queimadas.proximity import proximity_rings
+
+    with stage("anéis de alerta", rows=len(df)):
+        aneis = proximity_rings(poly, df, rings_km)
+    st.subheader("🚨 Focos se aproximando da propriedade")
+    fora = aneis.iloc[1:]
+    if fora['focos'].any():
+        st.warning(
+            f"{int(fora['focos'].sum())} focos a até {max(rings_km):g} km da propriedade; "
+            f"o mais próximo a {fora['mais_proximo_km'].min():.1f} km"
+        )
+    st.dataframe(
+        aneis.drop(columns=["de_km", "ate_km"]),
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "mais_proximo_km": st.column_config.NumberColumn("mais próximo (km)", format="%.2f"),
+            "frp_total": st.column_config.NumberColumn("FRP total", format="%.1f"),
+        },
+    )
+
+def batch_content():
+    from queimadas.screening import screen_properties
+
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        st.subheader("🔧 Definição")
+        dates = date_input()
+        names, polys = handle_batch_input()
+        df = create_dataframe(dates, polys)
+    with col2:
+        with stage("triagem do lote", rows=len(df)):
+            resultado = screen_properties(names, polys, df)
+        st.subheader("📊 Focos por propriedade")
+        c1, c2 = st.columns(2)
+        c1.metric(label="Propriedades com focos", value=int((resultado['focos'] > 0).sum()))
+        c2.metric(label="Focos em propriedades", value=int(resultado['focos'].sum()))
+        st.dataframe(resultado, use_container_width=True, hide_index=True)
+        st.download_button(
+            "Baixar tabela (CSV)",
+            resultado.to_csv(index=False),
+            file_name="focos_por_propriedade.csv",
+            mime="text/csv",
+        )
+
+def debug_panel(run):
+    # painel opcional: INPE_DEBUG=1 ou ?debug=1 na URL
+    if not (DEBUG or "debug" in st.query_params):
+        return
+    with st.sidebar.expander("🛠️ Tempos por etapa", expanded=True):
+        st.dataframe(run.frame(), hide_index=True, use_container_width=True)
+        st.caption(f"Execução completa em {run.total * 1000:.0f} ms")
+        if run.profile_text:
+            st.caption(f"Perfil salvo em `{run.profile_path}`")
+            st.code(run.profile_text)
 
 def main_content():
+    modo = st.radio("Modo de análise", ["Uma propriedade", "Lote de propriedades"], horizontal=True)
+    if modo == "Lote de propriedades":
+        batch_content()
+        return
+
     col1, col2 = st.columns([1, 3])
     with col1:
-        date,poly,folium_coords = parameter_input()
-        df = create_dataframe(date)
+        dates,poly = parameter_input()
+        df = create_dataframe(dates, [poly])
         #df = generate_fake_df(poly,100)
     with col2:
-        generate_map_with_polygon_and_hotspots(folium_coords, df)
+        map_section(df, poly)
     metrics(df,poly)
 
 page_layout_base()
-main_content()
\ No newline at end of file
+
+# ?profile=1 perfila só esta execução (com INPE_PROFILE definido)
+perfilar = "profile" in st.query_params
+if perfilar:
+    del st.query_params["profile"]
+try:
+    with instrument_run("Propriedade Rural", profile=perfilar) as run:
+        main_content()
+finally:
+    debug_panel(run)
\ No newline at end of file
@@ -1,30 +1,296 @@
 import streamlit as st
-import leafmap.foliumap as leafmap
-import requests
 import pandas as pd
 from datetime import datetime, timedelta
-from io import StringIO
-import altair as alt
-
-def get_data_from_inpe(date):
-    date = date.strftime('%Y%m%d')
-    
-    # Construa a URL com base na data
-    url = f'https://dataserver-coids.inpe.br/queimadas/queimadas/focos/csv/diario/Brasil/focos_diario_br_{date}.csv'
-    
-    # Tente fazer o download do arquivo
-    response = requests.get(url)
-    if response.status_code == 200:
-        # Carregue o conteúdo CSV em um DataFrame do Pandas
-        csv_data = StringIO(response.text)
-        df = pd.read_csv(csv_data)
-        if not df.empty:
-            return df
-        else:
-            return pd.DataFrame()  # Retorna um DataFrame vazio se não houver dados
-    else:
-        print("Erro ao acessar a URL:", response.status_code)
-        return pd.DataFrame()  # Retorna um DataFrame vazio em caso de falha na solicitação
+
+from queimadas.aggregation import summarize
+from queimadas.archive import fetch_range
+from queimadas.dedup import DISTANCE_KM, WINDOW_H, deduplicate
+from queimadas.grid import bin_points, cell_size_deg
+from queimadas.inpe import TODAY_TTL, FetchError, data_version, days_between, ensure_fresh
+from queimadas.instrumentation import DEBUG, instrument_run, stage
+from queimadas.rollup import FREQUENCIES, RETRY_AFTER, load_rollup, pending_days, time_series, update_days
+from queimadas.scheduler import format_status, start_scheduler
+from queimadas.schema import add_uf_columns
+from queimadas.store import cache_frames
+
+# colunas do CSV do INPE usadas nesta página
+COLUMNS = ["lat", "lon", "data_hora_gmt", "satelite", "municipio", "estado", "bioma", "frp", "numero_dias_sem_chuva", "risco_fogo"]
+
+# cache_frames: todas as sessões recebem o mesmo frame (somente leitura)
+# em vez de cada uma desserializar sua própria cópia, num LRU limitado por
+# bytes (INPE_FRAMES_BUDGET_MB) e não por número de entradas
+# `versao` entra só na chave: muda quando chegam focos novos do dia
+@cache_frames(ttl=TODAY_TTL)
+def load_hotspots(dates, biomes, metric, versao=(), dedup=None):
+    # meses arquivados vêm do Parquet histórico, já filtrados por bioma na
+    # leitura; os demais dias, dos arquivos diários
+    df, falhas = fetch_range(dates, COLUMNS, biomas=biomes)
+    if df.empty:
+        return df, falhas
+    df = df.dropna(subset=[metric])
+    if dedup:
+        # dedup = (km, horas): um evento por fogo visto por vários
+        # satélites ou passagens
+        df = deduplicate(df, *dedup)
+    return add_uf_columns(df), falhas
+
+def metric_column(metric, dedup):
+    # com as detecções agrupadas, cada linha é um evento: a intensidade é o
+    # FRP somado das suas detecções, não só o da detecção representante
+    return "frp_total" if dedup and metric == "frp" else metric
+
+@st.cache_data(ttl=TODAY_TTL, show_spinner=False)
+def load_summary(dates, biomes, metric, versao=(), dedup=None):
+    # memoizado por (datas, biomas, métrica): cartões, tabela e gráficos
+    # leem todos do mesmo resultado
+    df, _ = load_hotspots(dates, biomes, metric, versao, dedup)
+    return summarize(df, metric_column(metric, dedup))
+
+# a série temporal lê o cubo pré-agregado (dia × município × bioma ×
+# satélite), mantido de forma incremental, e não os focos brutos
+@st.cache_data(ttl=TODAY_TTL, show_spinner=False)
+def load_cube(dates, biomes, versao=()):
+    cubo, falhas = load_rollup(dates, biomas=biomes)
+    if cubo.empty:
+        return cubo, falhas
+    return add_uf_columns(cubo), falhas
+
+MAP_ZOOM = 4
+
+SERIES_PERIODS = {"Período selecionado": None, "Últimos 30 dias": 30, "Últimos 90 dias": 90, "Últimos 365 dias": 365}
+SERIES_STATS = {"Soma": "soma", "Média": "media", "Máximo": "maximo"}
+# acima de tantos dias fora do cubo, a série mostra o progresso da montagem
+COLD_DAYS = 7
+
+@st.fragment(run_every=60)
+def new_data_notifier(dates, versao):
+    # confere de tempos em tempos se o INPE publicou focos novos para hoje;
+    # a atualização é incremental e só vai à rede depois do TTL
+    hoje = datetime.now().date()
+    if hoje not in dates:
+        return
+    try:
+        ensure_fresh(hoje)
+    except FetchError:
+        return
+    atual = data_version(dates)
+    if atual == versao:
+        return
+    if st.session_state.get("versao_avisada") != atual:
+        st.session_state["versao_avisada"] = atual
+        st.toast("🔥 Novos focos publicados pelo INPE para hoje")
+    if st.button("Carregar focos novos"):
+        st.rerun()
+
+# no rerun só do fragmento, o mapa abre a própria execução medida;
+# dentro da página, entra na execução dela
+@st.fragment
+@instrument_run("Focos de incêndio · mapa")
+def heatmap_section(df, option, metric):
+    # fragmento: mexer no raio ou na grade reconstrói só o mapa
+    # leafmap leva segundos para importar: só quando há mapa para desenhar
+    import leafmap.foliumap as leafmap
+    from queimadas import tiles
+    from queimadas.render import add_hotspot_tiles
+
+    st.subheader(f"Mapa de calor ({option}):")
+    radius = st.slider("Defina um raio de agregação:", 5, 50, 10)
+    # os tiles só existem com o servidor ligado (INPE_TILES/INPE_TILES_URL):
+    # o navegador precisa alcançá-lo, o que não vale para qualquer instalação
+    url = None
+    if tiles.ENABLED and st.checkbox("Servir os focos em tiles conforme a área visível do mapa", value=True):
+        # o navegador busca só os focos da área visível, no detalhe do zoom,
+        # e o HTML do mapa não cresce com eles
+        with stage("registrar tiles", rows=len(df)):
+            url = tiles.serve_layer(df, metric)
+    if url:
+        st.caption(f"{len(df)} focos servidos em tiles conforme a área visível do mapa")
+        with stage("montar mapa"):
+            m = leafmap.Map(center=[-10.91, -51.0641], zoom=MAP_ZOOM)
+            add_hotspot_tiles(m, url, "calor", radius)
+        with stage("enviar mapa"):
+            m.to_streamlit(height=700, scrolling=False, add_layer_control=False)
+        return
+
+    agregar_em_grade = st.checkbox("Pré-agregar os focos em grade antes de enviar ao mapa", value=True)
+    heat_df = df
+    if agregar_em_grade:
+        # o mapa não devolve o zoom à página: a grade é feita para um zoom
+        # escolhido, e aproximar além dele mostra células graúdas
+        zoom_grade = st.select_slider("Detalhe da grade (zoom do mapa):", options=list(range(MAP_ZOOM, MAP_ZOOM + 5)), value=MAP_ZOOM)
+        # uma célula por meio raio do kernel no zoom escolhido
+        cell_deg = cell_size_deg(radius, zoom_grade)
+        with stage("grade", rows=len(df)):
+            heat_df = bin_points(df, metric, cell_deg)
+        st.caption(
+            f"{len(df)} focos agregados em {len(heat_df)} células de {cell_deg:.2f}°, "
+            f"no detalhe do zoom {zoom_grade}; acima dele o mapa mostra células maiores que o raio — "
+            "aumente o detalhe ou desmarque a grade"
+        )
+    with stage("montar mapa", rows=len(heat_df)):
+        m = leafmap.Map(center=[-10.91, -51.0641], zoom=MAP_ZOOM)
+        m.add_heatmap(
+            data=heat_df,
+            latitude="lat",
+            longitude="lon",
+            value=metric,
+            name=option,
+            radius=radius,
+        )
+    with stage("enviar mapa"):
+        m.to_streamlit(height=700, scrolling=False, add_layer_control=False)
+
+def statistics_section(filtros, option):
+    import altair as alt
+
+    metric = filtros[2]
+    with stage("resumo"):
+        resumo = load_summary(*filtros)
+    por_municipio = resumo.por_municipio
+    por_bioma = resumo.por_bioma
+
+    quantidade_total_focos = resumo.total
+
+    municipio_mais_focos = por_municipio['quantidade_focos'].idxmax()
+    quantidade_focos_municipio = por_municipio['quantidade_focos'].max()
+
+    municipio_maior_metrica = por_municipio['metrica'].idxmax()
+    metrica_municipio = por_municipio['metrica'].max()
+
+    bioma_maior_metrica = por_bioma['metrica'].idxmax()
+    metrica_bioma = por_bioma['metrica'].max()
+
+    bioma_mais_focos = por_bioma['quantidade_focos'].idxmax()
+    quantidade_focos_bioma = por_bioma['quantidade_focos'].max()
+
+    focos_por_bioma = por_bioma['quantidade_focos'].rename('Quantidade de Focos').reset_index()
+
+    st.metric(label=f"Focos de incêndios totais", value=quantidade_total_focos)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric(label=f"Município com mais focos de incêndio", value=municipio_mais_focos, delta=str(quantidade_focos_municipio), delta_color="off")
+        st.metric(label=f"Município com maior {option.lower()}", value=municipio_maior_metrica, delta=str(metrica_municipio), delta_color="off")
+    with col2:
+        st.metric(label=f"Bioma com mais focos de incêndio", value=bioma_mais_focos, delta=str(quantidade_focos_bioma), delta_color="off")
+        st.metric(label=f"Bioma com maior {option.lower()}", value=bioma_maior_metrica, delta=str(metrica_bioma), delta_color="off")
+
+    st.table(focos_por_bioma.to_dict(orient='records'))
+
+    df_agrupado = por_municipio.reset_index()
+
+    # Selecionar os 5 maiores municípios por quantidade de focos
+    top_5_focos = df_agrupado.nlargest(5, 'quantidade_focos')
+
+    # Selecionar os 5 maiores municípios por intensidade FRP
+    top_5_metrica = df_agrupado.nlargest(5, 'metrica')
+
+    # Gráfico de barras para os 5 maiores municípios por quantidade de focos
+    chart_focos = alt.Chart(top_5_focos).mark_bar().encode(
+        x=alt.X('municipio_siglaUF', sort='-y', title='Município-UF'),
+        y=alt.Y('quantidade_focos', title='Quantidade de Focos'),
+        color='municipio_siglaUF'
+    ).properties(
+        title='Top 5 Municípios por Quantidade de Focos'
+    )
+
+    # Gráfico de barras para os 5 maiores municípios por intensidade FRP
+    chart_metrica = alt.Chart(top_5_metrica).mark_bar().encode(
+        x=alt.X('municipio_siglaUF', sort='-y', title='Município-UF'),
+        y=alt.Y('metrica', title=f'{metric}'),
+        color='municipio_siglaUF'
+    ).properties(
+        title=f'Top 5 Municípios por {option}'
+    )
+
+    # Exibir os gráficos no Streamlit
+    with stage("gráficos"):
+        st.altair_chart(chart_focos, use_container_width=True)
+        st.altair_chart(chart_metrica, use_container_width=True)
+
+@st.fragment
+@instrument_run("Focos de incêndio · séries")
+def time_series_section(dates, biomes, metric, option):
+    # fragmento: trocar período ou granularidade relê só o cubo
+    import altair as alt
+
+    st.subheader("Evolução no tempo:")
+    col1, col2, col3 = st.columns(3)
+    periodo = col1.selectbox("Período da série:", list(SERIES_PERIODS))
+    if SERIES_PERIODS[periodo]:
+        fim = max(dates)
+        dates = days_between(fim - timedelta(days=SERIES_PERIODS[periodo] - 1), fim)
+    if len(dates) < 2:
+        st.caption("Analise um intervalo de datas ou escolha um período maior para ver a evolução.")
+        return
+    # dia até dois meses, semana até um ano, mês daí em diante
+    padrao = 0 if len(dates) <= 62 else 1 if len(dates) <= 366 else 2
+    granularidade = col2.selectbox("Agrupar por:", list(FREQUENCIES), index=padrao)
+    estatistica = col3.selectbox(f"{option}:", list(SERIES_STATS))
+
+    faltando = pending_days(dates)
+    if len(faltando) > COLD_DAYS:
+        # cubo ainda vazio para o período: mostra o andamento dos downloads,
+        # gravados mês a mês (recarregar a página continua de onde parou)
+        barra = st.progress(0.0, text=f"Montando a série: baixando {len(faltando)} dias...")
+        with stage("montar cubo", rows=len(faltando)):
+            update_days(dates, progress=lambda feitos, total: barra.progress(feitos / total, text=f"Montando a série: {feitos} de {total} dias"))
+        barra.empty()
+    with stage("carregar cubo") as etapa:
+        cubo, falhas = load_cube(tuple(dates), biomes, data_version(dates))
+        etapa["linhas"] = len(cubo)
+    if falhas:
+        # os dias que falharam só são baixados de novo depois de RETRY_AFTER
+        st.caption(f"{len(falhas)} dias indisponíveis ficaram fora da série (nova tentativa em até {RETRY_AFTER // 60} min)")
+    if cubo.empty:
+        st.info("Nenhum foco no período da série.")
+        return
+
+    freq = FREQUENCIES[granularidade]
+    stat = SERIES_STATS[estatistica]
+    with stage("séries", rows=len(cubo)):
+        por_bioma = time_series(cubo, "bioma", freq, metric, stat)
+        por_municipio = time_series(cubo, "municipio_siglaUF", freq, metric, stat, top=5)
+
+    eixo_x = alt.X('data:T', title=granularidade)
+    chart_biomas = alt.Chart(por_bioma).mark_line(point=True).encode(
+        x=eixo_x,
+        y=alt.Y('focos:Q', title='Quantidade de Focos'),
+        color=alt.Color('bioma:N', title='Bioma'),
+        tooltip=['data:T', 'bioma:N', 'focos:Q']
+    ).properties(
+        title='Focos por bioma'
+    )
+    chart_municipios = alt.Chart(por_municipio).mark_line(point=True).encode(
+        x=eixo_x,
+        y=alt.Y('focos:Q', title='Quantidade de Focos'),
+        color=alt.Color('municipio_siglaUF:N', title='Município-UF'),
+        tooltip=['data:T', 'municipio_siglaUF:N', 'focos:Q']
+    ).properties(
+        title='Top 5 Municípios por Quantidade de Focos'
+    )
+    chart_metrica = alt.Chart(por_bioma).mark_line(point=True).encode(
+        x=eixo_x,
+        y=alt.Y('valor:Q', title=f'{option} ({estatistica.lower()})'),
+        color=alt.Color('bioma:N', title='Bioma'),
+        tooltip=['data:T', 'bioma:N', alt.Tooltip('valor:Q', format='.2f')]
+    ).properties(
+        title=f'{option} por bioma ({estatistica.lower()})'
+    )
+    with stage("gráficos das séries"):
+        st.altair_chart(chart_biomas, use_container_width=True)
+        st.altair_chart(chart_municipios, use_container_width=True)
+        st.altair_chart(chart_metrica, use_container_width=True)
+
+def debug_panel(run):
+    # painel opcional: INPE_DEBUG=1 ou ?debug=1 na URL
+    if not (DEBUG or "debug" in st.query_params):
+        return
+    with st.sidebar.expander("🛠️ Tempos por etapa", expanded=True):
+        st.dataframe(run.frame(), hide_index=True, use_container_width=True)
+        st.caption(f"Execução completa em {run.total * 1000:.0f} ms")
+        if run.profile_text:
+            st.caption(f"Perfil salvo em `{run.profile_path}`")
+            st.code(run.profile_text)
 
 st.set_page_config(layout="wide")
 
@@ -36,118 +302,72 @@ st.sidebar.title("Sobre nós")
 st.sidebar.info(markdown)
 logo = "https://www.ufms.br/wp-content/uploads/2015/11/ufms_logo_assinatura_vertical_positiva.png"
 st.sidebar.image(logo)
+st.sidebar.caption(format_status(start_scheduler().status()))
 
 st.title("🔥 Focos de incêndio - INPE")
 
-date = st.date_input("Selecione uma data", value=pd.to_datetime(datetime.now().date()) - timedelta(days=1))
-
-option = st.selectbox(
-    "Qual métrica você deseja analisar?",
-    ("Intensidade do incêndio", "Quantidade de dias sem chuva", "Risco de fogo"),
-)
-
-biome_options = st.multiselect(
-    "Quais biomas você deseja analisar?",
-    ["Amazônia", "Caatinga", "Cerrado", "Mata Atlântica", "Pantanal"],
-    ["Pantanal"]
-)
-
-if biome_options == []:
-    biome_options = ["Amazônia", "Caatinga", "Cerrado", "Mata Atlântica", "Pantanal"]
-
-radius = st.slider("Defina um raio de agregação:", 5, 50, 10)
-
-
-options_map = {
-    "Intensidade do incêndio": "frp",
-    "Quantidade de dias sem chuva": "numero_dias_sem_chuva",
-    "Risco de fogo": "risco_fogo"
-}
-
-df = get_data_from_inpe(date)
-df = df[df['bioma'].isin(biome_options)]
-df = df.dropna(subset=[options_map[option]])
-
-estado_siglas = {
-    "ACRE": "AC", "ALAGOAS": "AL", "AMAPÁ": "AP", "AMAZONAS": "AM", "BAHIA": "BA", 
-    "CEARÁ": "CE", "DISTRITO FEDERAL": "DF", "ESPÍRITO SANTO": "ES", "GOIÁS": "GO", 
-    "MARANHÃO": "MA", "MATO GROSSO": "MT", "MATO GROSSO DO SUL": "MS", "MINAS GERAIS": "MG", 
-    "PARÁ": "PA", "PARAÍBA": "PB", "PARANÁ": "PR", "PERNAMBUCO": "PE", "PIAUÍ": "PI", 
-    "RIO DE JANEIRO": "RJ", "RIO GRANDE DO NORTE": "RN", "RIO GRANDE DO SUL": "RS", 
-    "RONDÔNIA": "RO", "RORAIMA": "RR", "SANTA CATARINA": "SC", "SÃO PAULO": "SP", 
-    "SERGIPE": "SE", "TOCANTINS": "TO"
-}
-df['estado_sigla'] = df['estado'].map(estado_siglas)
-df['municipio_siglaUF'] = df['municipio'].str.title() + '-' + df['estado_sigla']
-
-st.subheader(f"Mapa de calor ({option}):")
-m = leafmap.Map(center=[-10.91, -51.0641], zoom=4)
-m.add_heatmap(
-data=df,
-latitude="lat",
-longitude="lon",
-value=options_map[option],
-name=option,
-radius=radius,
-)
-m.to_streamlit(height=700, scrolling=False, add_layer_control=False)
-
-quantidade_total_focos = df.shape[0]
-
-municipio_mais_focos = df['municipio_siglaUF'].value_counts().idxmax()
-quantidade_focos_municipio = df['municipio_siglaUF'].value_counts().max()
-
-municipio_maior_metrica = df.groupby('municipio_siglaUF')[options_map[option]].sum().idxmax()
-metrica_municipio = df.groupby('municipio_siglaUF')[options_map[option]].sum().max()
-
-bioma_maior_metrica = df.groupby('bioma')[options_map[option]].sum().idxmax()
-metrica_bioma = df.groupby('bioma')[options_map[option]].sum().max()
-
-bioma_mais_focos = df['bioma'].value_counts().idxmax()
-quantidade_focos_bioma = df['bioma'].value_counts().max()
-
-focos_por_bioma = df.groupby('bioma').size().reset_index(name='Quantidade de Focos')
-
-st.metric(label=f"Focos de incêndios totais", value=quantidade_total_focos)
-col1, col2 = st.columns(2)
-with col1:
-    st.metric(label=f"Município com mais focos de incêndio", value=municipio_mais_focos, delta=str(quantidade_focos_municipio), delta_color="off")
-    st.metric(label=f"Município com maior {option.lower()}", value=municipio_maior_metrica, delta=str(metrica_municipio), delta_color="off")
-with col2:
-    st.metric(label=f"Bioma com mais focos de incêndio", value=bioma_mais_focos, delta=str(quantidade_focos_bioma), delta_color="off")
-    st.metric(label=f"Bioma com maior {option.lower()}", value=bioma_maior_metrica, delta=str(metrica_bioma), delta_color="off")
-
-st.table(focos_por_bioma.to_dict(orient='records'))
-
-df_agrupado = df.groupby('municipio_siglaUF').agg(
-    quantidade_focos=('municipio_siglaUF', 'size'),
-    metrica=(options_map[option], 'sum')
-).reset_index()
-
-# Selecionar os 5 maiores municípios por quantidade de focos
-top_5_focos = df_agrupado.nlargest(5, 'quantidade_focos')
-
-# Selecionar os 5 maiores municípios por intensidade FRP
-top_5_metrica = df_agrupado.nlargest(5, 'metrica')
-
-# Gráfico de barras para os 5 maiores municípios por quantidade de focos
-chart_focos = alt.Chart(top_5_focos).mark_bar().encode(
-    x=alt.X('municipio_siglaUF', sort='-y', title='Município-UF'),
-    y=alt.Y('quantidade_focos', title='Quantidade de Focos'),
-    color='municipio_siglaUF'
-).properties(
-    title='Top 5 Municípios por Quantidade de Focos'
-)
-
-# Gráfico de barras para os 5 maiores municípios por intensidade FRP
-chart_metrica = alt.Chart(top_5_metrica).mark_bar().encode(
-    x=alt.X('municipio_siglaUF', sort='-y', title='Município-UF'),
-    y=alt.Y('metrica', title=f'{options_map[option]}'),
-    color='municipio_siglaUF'
-).properties(
-    title=f'Top 5 Municípios por {option}'
-)
-
-# Exibir os gráficos no Streamlit
-st.altair_chart(chart_focos, use_container_width=True)
-st.altair_chart(chart_metrica, use_container_width=True)
\ No newline at end of file
+def main_content():
+    ontem = pd.to_datetime(datetime.now().date()) - timedelta(days=1)
+    intervalo = st.checkbox("Analisar um intervalo de datas")
+    if intervalo:
+        periodo = st.date_input("Selecione o intervalo", value=(ontem - timedelta(days=6), ontem))
+        if len(periodo) < 2:
+            st.info("Selecione a data final do intervalo.")
+            st.stop()
+        dates = days_between(*periodo)
+    else:
+        dates = [st.date_input("Selecione uma data", value=ontem)]
+
+    option = st.selectbox(
+        "Qual métrica você deseja analisar?",
+        ("Intensidade do incêndio", "Quantidade de dias sem chuva", "Risco de fogo"),
+    )
+
+    biome_options = st.multiselect(
+        "Quais biomas você deseja analisar?",
+        ["Amazônia", "Caatinga", "Cerrado", "Mata Atlântica", "Pantanal"],
+        ["Pantanal"]
+    )
+
+    if biome_options == []:
+        biome_options = ["Amazônia", "Caatinga", "Cerrado", "Mata Atlântica", "Pantanal"]
+
+    dedup = None
+    if st.checkbox("Agrupar detecções repetidas do mesmo fogo (satélites e passagens)"):
+        col1, col2 = st.columns(2)
+        distancia = col1.number_input("Distância máxima (km):", 0.1, 10.0, DISTANCE_KM, 0.1)
+        janela = col2.number_input("Janela de tempo (horas):", 0.5, 48.0, WINDOW_H, 0.5)
+        dedup = (distancia, janela)
+
+    options_map = {
+        "Intensidade do incêndio": "frp",
+        "Quantidade de dias sem chuva": "numero_dias_sem_chuva",
+        "Risco de fogo": "risco_fogo"
+    }
+
+    filtros = (tuple(dates), tuple(sorted(biome_options)), options_map[option], data_version(dates), dedup)
+    with stage("carregar focos") as etapa:
+        df, falhas = load_hotspots(*filtros)
+        etapa["linhas"] = len(df)
+    if dedup and not df.empty:
+        st.caption(f"{int(df['deteccoes'].sum())} detecções agrupadas em {len(df)} eventos de fogo")
+    for dia, erro in falhas.items():
+        st.warning(f"Focos de {dia:%d/%m/%Y} indisponíveis: {erro}")
+    if df.empty:
+        st.info("Nenhum foco encontrado para os filtros selecionados.")
+        st.stop()
+
+    new_data_notifier(filtros[0], filtros[3])
+    heatmap_section(df, option, metric_column(options_map[option], dedup))
+    statistics_section(filtros, option)
+    time_series_section(filtros[0], filtros[1], options_map[option], option)
+
+# ?profile=1 perfila só esta execução (com INPE_PROFILE definido)
+perfilar = "profile" in st.query_params
+if perfilar:
+    del st.query_params["profile"]
+try:
+    with instrument_run("Focos de incêndio", profile=perfilar) as run:
+        main_content()
+finally:
+    debug_panel(run)
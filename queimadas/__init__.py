@@ -0,0 +1 @@
+"""Camada compartilhada de dados de focos de incêndio usada pelas páginas."""
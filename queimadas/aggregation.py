@@ -0,0 +1,33 @@
+"""Agregações por município e bioma usadas na página de Focos de incêndio."""
+
+from dataclasses import dataclass
+
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class Summary:
+    """Contagens e somas da métrica por município e por bioma.
+
+    `por_municipio` é indexado por ``municipio_siglaUF`` e `por_bioma` por
+    ``bioma``; ambos têm as colunas ``quantidade_focos`` e ``metrica``.
+    """
+
+    total: int
+    por_municipio: pd.DataFrame
+    por_bioma: pd.DataFrame
+
+
+def summarize(df, metric):
+    """Calcula todas as agregações da página numa única passada agrupada.
+
+    O agrupamento é feito uma vez por (município, bioma); os totais por
+    município e por bioma saem desse resultado, que tem no máximo alguns
+    milhares de linhas, em vez de reagrupar o frame inteiro.
+    """
+    base = df.groupby(["municipio_siglaUF", "bioma"], observed=True, dropna=False)[
+        metric
+    ].agg(quantidade_focos="size", metrica="sum")
+    por_municipio = base.groupby(level="municipio_siglaUF", observed=True).sum()
+    por_bioma = base.groupby(level="bioma", observed=True).sum()
+    return Summary(total=len(df), por_municipio=por_municipio, por_bioma=por_bioma)
@@ -0,0 +1,447 @@
+"""Arquivo histórico de focos em Parquet particionado.
+
+Os arquivos mensais (ou anuais) do INPE são lidos em fluxo, em blocos de
+``BLOCK_SIZE`` bytes, e gravados num dataset Parquet particionado por
+``ano=/mes=/bioma=`` em ``INPE_ARCHIVE_DIR``; a memória usada depende do
+bloco, não do tamanho do arquivo. Dentro de cada bloco as linhas são
+ordenadas pela curva Z (Morton) de uma grade de ``GRID_DEG`` graus, para
+que cada grupo de linhas cubra uma região compacta e as estatísticas
+(mín./máx.) de lat, lon e estado fiquem estreitas.
+
+`query` traduz os filtros (período, biomas, estados e retângulo) numa
+expressão do ``pyarrow.dataset``: período e bioma descartam diretórios
+inteiros pelas partições, e estado, horário e coordenadas descartam
+grupos de linhas pelas estatísticas do Parquet, sem lê-los.
+
+`fetch_range` é o que as páginas usam: responde pelo arquivo os meses já
+fechados quando foram arquivados, e pelos arquivos diários
+(`fetch_days`) o resto.
+
+Para montar o arquivo::
+
+    python -m queimadas archive --months 2022-01 2024-12
+    python -m queimadas archive focos_br_todos-sats_2023.zip
+"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pcsv
+import pyarrow.dataset as ds
+
+from .geo import spread_bits
+from .schema import DATE_COLUMNS, INPE_DTYPES, coerce_schema, concat_frames
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = Path(
+    os.environ.get(
+        "INPE_ARCHIVE_DIR",
+        Path(__file__).resolve().parent.parent / ".cache" / "arquivo",
+    )
+)
+MONTHLY_URL = os.environ.get(
+    "INPE_MONTHLY_URL",
+    "https://dataserver-coids.inpe.br/queimadas/queimadas/focos/csv/mensal/Brasil",
+)
+BLOCK_SIZE = 64 * 2**20
+# grupos pequenos o bastante para que as estatísticas descartem boa parte
+ROWS_PER_GROUP = 16 * 1024
+MANIFEST = "_manifesto.json"
+COVERAGE_SHARE = 0.01
+
+ARROW_TYPES = {
+    "string": pa.string(),
+    "category": pa.string(),
+    "float32": pa.float32(),
+    "Int32": pa.int32(),
+    "Int16": pa.int16(),
+}
+SCHEMA = pa.schema(
+    [(c, ARROW_TYPES[t]) for c, t in INPE_DTYPES.items()]
+    + [(c, pa.timestamp("s")) for c in DATE_COLUMNS]
+)
+CATEGORY_COLUMNS = [c for c, t in INPE_DTYPES.items() if t == "category"]
+PARTITIONING = ds.partitioning(
+    pa.schema([("ano", pa.int16()), ("mes", pa.int8()), ("bioma", pa.string())]),
+    flavor="hive",
+)
+GRID_DEG = 0.25
+# nomes usados em exportações mais antigas do INPE
+RENAME = {"latitude": "lat", "longitude": "lon", "data_pas": "data_hora_gmt"}
+
+_datasets = {}
+_datasets_lock = threading.Lock()
+
+
+def monthly_url(year, month):
+    return f"{MONTHLY_URL}/focos_mensal_br_{year}{month:02d}.csv"
+
+
+def _open_csv(path):
+    """Leitor em fluxo do CSV (ou do primeiro CSV dentro de um .zip)."""
+    path = Path(path)
+    if path.suffix.lower() == ".zip":
+        z = zipfile.ZipFile(path)
+        fonte = z.open(next(n for n in z.namelist() if n.lower().endswith(".csv")))
+    else:
+        fonte = open(path, "rb")
+    tipos = {f.name: f.type for f in SCHEMA}
+    tipos.update({antigo: tipos[novo] for antigo, novo in RENAME.items()})
+    return pcsv.open_csv(
+        fonte,
+        read_options=pcsv.ReadOptions(block_size=BLOCK_SIZE),
+        convert_options=pcsv.ConvertOptions(
+            column_types=tipos,
+            timestamp_parsers=[pcsv.ISO8601, "%Y/%m/%d %H:%M:%S"],
+        ),
+    )
+
+
+def morton_key(lon, lat, grid_deg=GRID_DEG):
+    """Posição de cada ponto na curva Z da grade de `grid_deg` graus."""
+    x = np.floor((np.nan_to_num(lon) + 180) / grid_deg)
+    y = np.floor((np.nan_to_num(lat) + 90) / grid_deg)
+    return spread_bits(x) | (spread_bits(y) << 1)
+
+
+def _conform(batch):
+    """Ajusta um bloco ao `SCHEMA`, com as colunas de partição, ordenado."""
+    tabela = pa.Table.from_batches([batch])
+    tabela = tabela.rename_columns([RENAME.get(c, c) for c in tabela.column_names])
+    colunas = [
+        (
+            tabela[f.name].cast(f.type)
+            if f.name in tabela.column_names
+            else pa.nulls(len(tabela), f.type)
+        )
+        for f in SCHEMA
+    ]
+    tabela = pa.Table.from_arrays(colunas, schema=SCHEMA)
+    tabela = tabela.filter(pc.is_valid(tabela["data_hora_gmt"]))
+    horario = tabela["data_hora_gmt"]
+    tabela = tabela.append_column("ano", pc.year(horario).cast(pa.int16()))
+    tabela = tabela.append_column("mes", pc.month(horario).cast(pa.int8()))
+    ordem = np.argsort(
+        morton_key(
+            tabela["lon"].to_numpy(zero_copy_only=False),
+            tabela["lat"].to_numpy(zero_copy_only=False),
+        ),
+        kind="stable",
+    )
+    return tabela.take(ordem)
+
+
+def ingest(path, archive_dir=ARCHIVE_DIR):
+    """Grava o CSV/ZIP de focos em `path` no arquivo particionado.
+
+    Cada partição recebe arquivos com o nome da fonte; reprocessar a mesma
+    fonte substitui os dela sem duplicar focos nem mexer no que veio de
+    outras fontes (não misture, para os mesmos meses, os arquivos mensais
+    e o anual). Retorna ``{"AAAA-MM": linhas}`` com os meses gravados.
+    """
+    archive_dir = Path(archive_dir)
+    fonte = Path(path).stem
+    preparo = archive_dir / "_preparo" / fonte
+    shutil.rmtree(preparo, ignore_errors=True)
+    contagem = {}
+
+    def blocos():
+        for batch in _open_csv(path):
+            tabela = _conform(batch)
+            chave = pc.add(
+                pc.multiply(tabela["ano"].cast(pa.int32()), 100),
+                tabela["mes"].cast(pa.int32()),
+            )
+            for item in pc.value_counts(chave).to_pylist():
+                mes = f"{item['values'] // 100}-{item['values'] % 100:02d}"
+                contagem[mes] = contagem.get(mes, 0) + item["counts"]
+            yield from tabela.to_batches()
+
+    ds.write_dataset(
+        blocos(),
+        preparo,
+        schema=SCHEMA.append(pa.field("ano", pa.int16())).append(
+            pa.field("mes", pa.int8())
+        ),
+        format="parquet",
+        partitioning=PARTITIONING,
+        basename_template=f"{fonte}-{{i}}.parquet",
+        preserve_order=True,
+        min_rows_per_group=ROWS_PER_GROUP,
+        max_rows_per_group=ROWS_PER_GROUP,
+    )
+
+    # troca, partição por partição, os arquivos anteriores desta fonte
+    with _datasets_lock:
+        for particao in {p.parent for p in preparo.rglob("*.parquet")}:
+            destino = archive_dir / particao.relative_to(preparo)
+            destino.mkdir(parents=True, exist_ok=True)
+            for antigo in destino.glob(f"{fonte}-*.parquet"):
+                antigo.unlink()
+            for novo in particao.glob("*.parquet"):
+                os.replace(novo, destino / novo.name)
+        shutil.rmtree(preparo, ignore_errors=True)
+        try:
+            preparo.parent.rmdir()
+        except OSError:
+            pass  # outra ingestão em andamento
+
+        manifesto = read_manifest(archive_dir)
+        manifesto["fontes"][Path(path).name] = {
+            "arquivado_em": datetime.now().isoformat(timespec="seconds"),
+            "meses": dict(sorted(contagem.items())),
+        }
+        _write_manifest(archive_dir, manifesto)
+    return dict(sorted(contagem.items()))
+
+
+def download_month(year, month, directory, session=None):
+    """Baixa o arquivo mensal do INPE para `directory`; devolve o caminho."""
+    from .inpe import FetchError, get_session
+
+    url = monthly_url(year, month)
+    destino = Path(directory) / url.rsplit("/", 1)[-1]
+    session = session or get_session()
+    try:
+        with session.get(url, stream=True, timeout=300) as response:
+            if response.status_code != 200:
+                raise FetchError(f"{url}: resposta {response.status_code}")
+            with open(destino, "wb") as f:
+                for pedaco in response.iter_content(1 << 20):
+                    f.write(pedaco)
+    except OSError as e:  # inclui requests.RequestException
+        raise FetchError(f"{url}: {e}") from e
+    return destino
+
+
+def read_manifest(archive_dir=ARCHIVE_DIR):
+    try:
+        return json.loads((Path(archive_dir) / MANIFEST).read_text())
+    except (FileNotFoundError, ValueError):
+        return {"fontes": {}}
+
+
+def _write_manifest(archive_dir, manifest):
+    path = Path(archive_dir) / MANIFEST
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def complete_months(archive_dir=ARCHIVE_DIR):
+    """Meses que o arquivo responde por completo: ``{"AAAA-MM": arquivado_em}``.
+
+    Um mês conta como completo se alguma fonte foi arquivada depois de ele
+    terminar e traz para ele pelo menos ``COVERAGE_SHARE`` dos focos do seu
+    mês mais cheio; assim as poucas linhas de borda de um arquivo mensal
+    (horário GMT do dia seguinte) não fazem o mês vizinho parecer arquivado.
+    `arquivado_em` é o da fonte mais recente do mês e muda quando ele é
+    arquivado de novo.
+    """
+    completos = {}
+    for info in read_manifest(archive_dir)["fontes"].values():
+        arquivado = datetime.fromisoformat(info["arquivado_em"])
+        maior = max(info["meses"].values(), default=0)
+        for mes, linhas in info["meses"].items():
+            inicio = datetime.strptime(mes, "%Y-%m").date()
+            fim = (inicio + timedelta(days=32)).replace(day=1)
+            if arquivado.date() >= fim and linhas >= COVERAGE_SHARE * maior:
+                completos[mes] = max(completos.get(mes, ""), info["arquivado_em"])
+    return completos
+
+
+def covered_days(dates, archive_dir=ARCHIVE_DIR):
+    """Dias de `dates` em meses completos no arquivo (`complete_months`)."""
+    completos = complete_months(archive_dir)
+    return {d for d in dates if f"{d:%Y-%m}" in completos}
+
+
+def dataset(archive_dir=ARCHIVE_DIR):
+    """`pyarrow.dataset` do arquivo, reaberto só quando o manifesto muda."""
+    archive_dir = Path(archive_dir)
+    try:
+        versao = (archive_dir / MANIFEST).stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    with _datasets_lock:
+        em_cache = _datasets.get(archive_dir)
+        if em_cache is None or em_cache[0] != versao:
+            em_cache = (
+                versao,
+                ds.dataset(
+                    archive_dir,
+                    # colunas categóricas já saem do Parquet como dicionário,
+                    # sem converter strings no pandas
+                    format=ds.ParquetFileFormat(
+                        read_options={"dictionary_columns": CATEGORY_COLUMNS}
+                    ),
+                    partitioning=PARTITIONING,
+                    exclude_invalid_files=False,
+                    ignore_prefixes=[".", "_"],
+                ),
+            )
+            _datasets[archive_dir] = em_cache
+        return em_cache[1]
+
+
+def _period_filter(start, end):
+    """Período como partições: meses inteiros só pela partição; nos meses
+    das pontas, também pelo horário (que as estatísticas ainda recortam)."""
+    inteiros = {}
+    partes = []
+    mes = start.replace(day=1)
+    while mes <= end:
+        proximo = (mes + timedelta(days=32)).replace(day=1)
+        if start <= mes and proximo - timedelta(days=1) <= end:
+            inteiros.setdefault(mes.year, []).append(mes.month)
+        else:
+            de = pd.Timestamp(max(start, mes))
+            ate = pd.Timestamp(min(end, proximo - timedelta(days=1)))
+            partes.append(
+                (ds.field("ano") == mes.year)
+                & (ds.field("mes") == mes.month)
+                & (ds.field("data_hora_gmt") >= de)
+                & (ds.field("data_hora_gmt") < ate + pd.Timedelta(days=1))
+            )
+        mes = proximo
+    partes += [
+        (ds.field("ano") == ano) & ds.field("mes").isin(meses)
+        for ano, meses in inteiros.items()
+    ]
+    return _combine(partes, "|")
+
+
+def _combine(exprs, op):
+    expr = exprs[0]
+    for e in exprs[1:]:
+        expr = (expr | e) if op == "|" else (expr & e)
+    return expr
+
+
+def build_filter(start=None, end=None, biomas=None, estados=None, bbox=None):
+    """Expressão do ``pyarrow.dataset`` para os filtros de `query`."""
+    filtros = []
+    if start is not None and end is not None:
+        # meses fora do período nem são abertos
+        filtros.append(_period_filter(start, end))
+    elif start is not None:
+        filtros.append(ds.field("data_hora_gmt") >= pd.Timestamp(start))
+    elif end is not None:
+        filtros.append(
+            ds.field("data_hora_gmt") < pd.Timestamp(end) + pd.Timedelta(days=1)
+        )
+    if biomas:
+        filtros.append(ds.field("bioma").isin(list(biomas)))
+    if estados:
+        filtros.append(ds.field("estado").isin(list(estados)))
+    if bbox is not None:
+        minx, miny, maxx, maxy = bbox
+        filtros += [
+            ds.field("lon") >= minx,
+            ds.field("lon") <= maxx,
+            ds.field("lat") >= miny,
+            ds.field("lat") <= maxy,
+        ]
+    return _combine(filtros, "&") if filtros else None
+
+
+def query(
+    start=None,
+    end=None,
+    biomas=None,
+    estados=None,
+    bbox=None,
+    columns=None,
+    archive_dir=ARCHIVE_DIR,
+):
+    """Focos arquivados que passam pelos filtros, como DataFrame tipado.
+
+    `start`/`end` são datas (inclusive), `bbox` é ``(lon_min, lat_min,
+    lon_max, lat_max)`` e `columns` limita as colunas lidas. Inclui a
+    coluna ``data`` (o dia do foco), como `fetch_days`.
+    """
+    dados = dataset(archive_dir)
+    if dados is None:
+        return pd.DataFrame()
+    filtro = build_filter(start, end, biomas, estados, bbox)
+    colunas = None
+    if columns is not None:
+        colunas = list(dict.fromkeys([*columns, "data_hora_gmt"]))
+    tabela = dados.to_table(columns=colunas, filter=filtro)
+    if "bioma" in tabela.column_names:
+        # partição: vem como string; o dicionário sai mais barato no Arrow
+        i = tabela.column_names.index("bioma")
+        tabela = tabela.set_column(i, "bioma", pc.dictionary_encode(tabela["bioma"]))
+    df = coerce_schema(tabela.to_pandas())
+    df = df.drop(columns=["ano", "mes"], errors="ignore")
+    df.insert(0, "data", df["data_hora_gmt"].dt.normalize())
+    if columns is not None and "data_hora_gmt" not in columns:
+        df = df.drop(columns="data_hora_gmt")
+    return df
+
+
+def _filter_frame(df, biomas=None, estados=None, bbox=None):
+    mask = pd.Series(True, index=df.index)
+    if biomas:
+        mask &= df["bioma"].isin(biomas)
+    if estados:
+        mask &= df["estado"].isin(estados)
+    if bbox is not None:
+        minx, miny, maxx, maxy = bbox
+        mask &= df["lon"].between(minx, maxx) & df["lat"].between(miny, maxy)
+    return df[mask]
+
+
+def fetch_range(
+    dates, columns=None, biomas=None, estados=None, bbox=None, archive_dir=ARCHIVE_DIR
+):
+    """Como `fetch_days`, com filtros, usando o arquivo onde ele cobre.
+
+    Os dias em meses arquivados vêm de `query` (com os filtros aplicados na
+    leitura); os demais vêm dos arquivos diários e são filtrados aqui.
+    Retorna ``(df, falhas)``.
+    """
+    from .inpe import fetch_days
+
+    dates = sorted(set(dates))
+    cobertos = covered_days(dates, archive_dir)
+    partes = []
+    falhas = {}
+    if cobertos:
+        partes.append(
+            query(
+                min(cobertos),
+                max(cobertos),
+                biomas,
+                estados,
+                bbox,
+                columns,
+                archive_dir,
+            )
+        )
+        if len(cobertos) < (max(cobertos) - min(cobertos)).days + 1:
+            # período com buracos: só os dias pedidos
+            dias = pd.to_datetime(sorted(cobertos))
+            partes[-1] = partes[-1][partes[-1]["data"].isin(dias)]
+    restantes = [d for d in dates if d not in cobertos]
+    if restantes:
+        diario, falhas = fetch_days(restantes, columns)
+        if not diario.empty:
+            partes.append(_filter_frame(diario, biomas, estados, bbox))
+    partes = [p for p in partes if not p.empty]
+    if not partes:
+        return pd.DataFrame(), falhas
+    return concat_frames(partes), falhas
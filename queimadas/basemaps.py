@@ -0,0 +1,773 @@
+"""Cache em disco dos mapas de fundo: tiles XYZ/WMS e GetCapabilities.
+
+As páginas de mapa dividido, de busca de mapas de fundo e de WMS buscavam
+cada tile e cada documento de capacidades nos servidores remotos a cada
+visita. Aqui um proxy HTTP local, iniciado uma vez por processo ao lado do
+Streamlit (`start_proxy`), responde pelos servidores remotos e guarda as
+respostas em ``INPE_BASEMAPS_DIR``:
+
+* `proxy_xyz` e `proxy_wms` trocam a URL de uma camada pela URL do proxy,
+  que busca no servidor remoto só o que não está no disco;
+* `wms_layers` e `search_qms` leem capacidades e buscas do QMS pelo mesmo
+  cache, sem passar pelo HTTP local;
+* `prefetch` (``python -m queimadas basemaps prefetch``) baixa antes os
+  tiles do Brasil e do Pantanal nos zooms mais usados (`EXTENTS`).
+
+O cache é um LRU em disco limitado por ``INPE_BASEMAPS_MB``: cada acerto
+atualiza a data do arquivo, e os mais antigos saem quando o limite é
+ultrapassado. Tiles valem ``INPE_BASEMAPS_TTL_DAYS`` dias e capacidades
+``INPE_CAPABILITIES_TTL_H`` horas; vencidos, são buscados de novo, mas
+continuam servindo se o servidor remoto falhar. A chave de cada resposta é
+a URL normalizada: parâmetros em qualquer ordem e caixa, e o ``BBOX`` dos
+pedidos WMS arredondado a uma fração de pixel, para que os tiles pedidos
+pelo Leaflet e pela pré-carga caiam no mesmo arquivo.
+
+O navegador precisa alcançar o proxy, e ``127.0.0.1`` só vale para um
+navegador na mesma máquina. Por isso as páginas só passam os tiles pelo
+proxy com ``INPE_BASEMAPS_URL`` apontando para o caminho público que leva
+a ele, ou com ``INPE_BASEMAPS_PROXY=1`` numa instalação local; sem isso,
+`proxy_xyz`, `proxy_wms` e `cached_basemap` devolvem as camadas remotas
+como antes (capacidades e buscas do QMS continuam no cache).
+
+Para testar sem rede, `make_standin_server` (``python -m queimadas
+basemaps standin``) faz as vezes de um servidor XYZ e WMS.
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import math
+import os
+import struct
+import tempfile
+import threading
+import time
+import xml.etree.ElementTree as ET
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit, urlunsplit
+
+from .sources import SourceResponse
+
+logger = logging.getLogger(__name__)
+
+BASEMAPS_DIR = Path(
+    os.environ.get(
+        "INPE_BASEMAPS_DIR",
+        Path(__file__).resolve().parent.parent / ".cache" / "basemaps",
+    )
+)
+BUDGET_BYTES = int(os.environ.get("INPE_BASEMAPS_MB", 512)) * 2**20
+TILE_TTL = float(os.environ.get("INPE_BASEMAPS_TTL_DAYS", 30)) * 86400
+CAPABILITIES_TTL = float(os.environ.get("INPE_CAPABILITIES_TTL_H", 24)) * 3600
+HOST = os.environ.get("INPE_BASEMAPS_HOST", "127.0.0.1")
+PORT = int(os.environ.get("INPE_BASEMAPS_PORT", 8767))
+PUBLIC_URL = os.environ.get("INPE_BASEMAPS_URL")
+# 127.0.0.1 só é alcançável por um navegador na mesma máquina
+ENABLED = os.environ.get("INPE_BASEMAPS_PROXY", "1" if PUBLIC_URL else "0") != "0"
+TIMEOUT = 30
+USER_AGENT = "queimadas-basemaps/1.0"
+
+QMS_API = "https://qms.nextgis.com/api/v1/geoservices"
+
+# (minx, miny, maxx, maxy) e zooms baixados por `prefetch`
+EXTENTS = {
+    "brasil": ((-74.0, -34.0, -34.5, 5.5), range(3, 8)),
+    "pantanal": ((-58.5, -22.0, -54.5, -16.0), range(3, 11)),
+}
+
+# metade do equador em EPSG:3857 (metros)
+_ORIGEM = 20037508.342789244
+
+
+def _format_number(v):
+    # como o JavaScript escreve números: 0 e não 0.0
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+def _quantize_bbox(valor, largura):
+    try:
+        numeros = [float(v) for v in valor.split(",")]
+        passo = (numeros[2] - numeros[0]) / (float(largura) * 64)
+    except (ValueError, IndexError, ZeroDivisionError):
+        return valor
+    if not passo:
+        return valor
+    return ",".join(str(round(v / passo)) for v in numeros) + f"@{passo:.6g}"
+
+
+def cache_key(url):
+    """Chave da resposta de `url` no cache (veja a normalização acima)."""
+    partes = urlsplit(url)
+    parametros = [(k.lower(), v) for k, v in parse_qsl(partes.query, True)]
+    largura = dict(parametros).get("width", 256)
+    parametros = sorted(
+        (k, _quantize_bbox(v, largura) if k == "bbox" else v) for k, v in parametros
+    )
+    texto = urlunsplit(
+        (partes.scheme, partes.netloc.lower(), partes.path, urlencode(parametros), "")
+    )
+    return hashlib.sha256(texto.encode()).hexdigest()
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Sessão HTTP dos mapas de fundo, com um pool por servidor de tiles
+    (a do INPE guarda conexões de um servidor só)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(
+                total=2,
+                backoff_factor=0.2,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=("GET",),
+            )
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8, max_retries=retry)
+            session = requests.Session()
+            session.headers["User-Agent"] = USER_AGENT
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+COUNTERS_FILE = "_contadores.json"
+COUNTERS = ("acertos", "faltas", "vencidos", "removidos")
+FLUSH_EVERY = 100
+FLUSH_SECONDS = 30
+_counters_lock = threading.Lock()
+
+
+class DiskCache:
+    """Respostas HTTP em arquivos, num LRU limitado por bytes.
+
+    Cada arquivo começa por uma linha com o instante do download e o
+    ``Content-Type``; a data de modificação marca o último acesso, então
+    a ordem do LRU sobrevive a reinícios.
+
+    Acertos, faltas, cópias vencidas e remoções são somados em
+    `COUNTERS_FILE` no diretório (a cada `FLUSH_EVERY` pedidos, a cada
+    `FLUSH_SECONDS` e na saída do processo), para que ``python -m queimadas
+    basemaps stats`` mostre a taxa de acertos de todos os processos que
+    usaram o cache, não só a do próprio comando.
+    """
+
+    def __init__(self, directory=BASEMAPS_DIR, budget_bytes=BUDGET_BYTES):
+        self.directory = Path(directory)
+        self.budget_bytes = budget_bytes
+        self._index = (
+            OrderedDict()
+        )  # chave -> bytes, do acesso mais antigo ao mais novo
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # contagens ainda não somadas ao arquivo de contadores
+        self._pending = dict.fromkeys(COUNTERS, 0)
+        self._flushed_at = time.monotonic()
+        self._load()
+
+    def _path(self, chave):
+        return self.directory / chave[:2] / chave
+
+    def _count(self, campo):
+        with self._lock:
+            self._pending[campo] += 1
+            gravar = (
+                sum(self._pending.values()) >= FLUSH_EVERY
+                or time.monotonic() - self._flushed_at > FLUSH_SECONDS
+            )
+        if gravar:
+            self.flush()
+
+    def _read_counters(self):
+        try:
+            salvos = json.loads((self.directory / COUNTERS_FILE).read_text())
+        except (FileNotFoundError, ValueError):
+            salvos = {}
+        return {c: int(salvos.get(c, 0)) for c in COUNTERS}
+
+    def flush(self):
+        """Soma as contagens pendentes ao arquivo de contadores."""
+        with self._lock:
+            pendentes, self._pending = self._pending, dict.fromkeys(COUNTERS, 0)
+            self._flushed_at = time.monotonic()
+        if not any(pendentes.values()):
+            return
+        with _counters_lock:
+            # outro processo pode gravar entre a leitura e a troca: no pior
+            # caso perde-se um lote de contagens, nunca o arquivo inteiro
+            totais = self._read_counters()
+            for c, n in pendentes.items():
+                totais[c] += n
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(totais, f)
+                os.replace(tmp, self.directory / COUNTERS_FILE)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+
+    def _load(self):
+        arquivos = []
+        if self.directory.exists():
+            for path in self.directory.glob("??/*"):
+                if path.suffix == ".tmp":
+                    continue
+                info = path.stat()
+                arquivos.append((info.st_mtime, path.name, info.st_size))
+        for _, chave, tamanho in sorted(arquivos):
+            self._index[chave] = tamanho
+            self._bytes += tamanho
+
+    def _read(self, chave):
+        try:
+            with open(self._path(chave), "rb") as f:
+                cabecalho, corpo = f.read().split(b"\n", 1)
+        except (FileNotFoundError, ValueError):
+            return None
+        baixado, _, tipo = cabecalho.decode().partition(" ")
+        return float(baixado), tipo, corpo
+
+    def _write(self, chave, tipo, corpo):
+        path = self._path(chave)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conteudo = f"{time.time()} {tipo}\n".encode() + corpo
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(conteudo)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        with self._lock:
+            self._bytes += len(conteudo) - self._index.pop(chave, 0)
+            self._index[chave] = len(conteudo)
+            while len(self._index) > 1 and self._bytes > self.budget_bytes:
+                antiga, tamanho = self._index.popitem(last=False)
+                self._bytes -= tamanho
+                self._pending["removidos"] += 1
+                try:
+                    os.unlink(self._path(antiga))
+                except FileNotFoundError:
+                    pass
+
+    def _touch(self, chave):
+        with self._lock:
+            if chave in self._index:
+                self._index.move_to_end(chave)
+        try:
+            os.utime(self._path(chave))
+        except FileNotFoundError:
+            pass
+
+    def get(self, url, ttl=TILE_TTL):
+        """Resposta de `url`, do disco se houver uma cópia com menos de
+        `ttl` segundos. ``X-Cache`` diz de onde veio: ``HIT``, ``MISS`` ou
+        ``STALE`` (cópia vencida servida porque o servidor remoto falhou)."""
+        chave = cache_key(url)
+        guardado = self._read(chave)
+        if guardado is not None and time.time() - guardado[0] <= ttl:
+            self._touch(chave)
+            self._count("acertos")
+            return SourceResponse(
+                200, guardado[2], {"Content-Type": guardado[1], "X-Cache": "HIT"}
+            )
+
+        self._count("faltas")
+        try:
+            resposta = get_session().get(url, timeout=TIMEOUT)
+            erro = None if resposta.status_code == 200 else resposta.status_code
+        except OSError as e:  # inclui requests.RequestException
+            resposta, erro = None, e
+        if erro is None:
+            tipo = resposta.headers.get("Content-Type", "application/octet-stream")
+            self._write(chave, tipo, resposta.content)
+            return SourceResponse(
+                200, resposta.content, {"Content-Type": tipo, "X-Cache": "MISS"}
+            )
+        if guardado is not None:
+            logger.warning("servindo cópia vencida de %s: %s", url, erro)
+            self._touch(chave)
+            self._count("vencidos")
+            return SourceResponse(
+                200, guardado[2], {"Content-Type": guardado[1], "X-Cache": "STALE"}
+            )
+        if resposta is None:
+            return SourceResponse(
+                502, str(erro).encode(), {"Content-Type": "text/plain"}
+            )
+        return SourceResponse(
+            resposta.status_code,
+            resposta.content,
+            {"Content-Type": resposta.headers.get("Content-Type", "text/plain")},
+        )
+
+    def stats(self):
+        """Tamanho do cache e contadores somados de todos os processos."""
+        totais = self._read_counters()
+        with self._lock:
+            for c, n in self._pending.items():
+                totais[c] += n
+            pedidos = totais["acertos"] + totais["faltas"]
+            return {
+                "arquivos": len(self._index),
+                "bytes": self._bytes,
+                **totais,
+                "taxa": totais["acertos"] / pedidos if pedidos else None,
+            }
+
+
+def format_stats(stats):
+    """Resumo do cache para a barra lateral das páginas de mapa."""
+    texto = (
+        f"Cache de mapas de fundo: {stats['arquivos']} arquivos · "
+        f"{stats['bytes'] / 2**20:.0f} MiB"
+    )
+    if stats["taxa"] is not None:
+        texto += (
+            f" · {stats['taxa']:.0%} de acertos "
+            f"({stats['acertos']} de {stats['acertos'] + stats['faltas']})"
+        )
+    return texto
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Cache em disco compartilhado pelo processo."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DiskCache()
+            # as contagens ainda não gravadas entram no arquivo na saída
+            atexit.register(_cache.flush)
+        return _cache
+
+
+def _is_capabilities(parametros):
+    return any(
+        k.lower() == "request" and v.lower() == "getcapabilities" for k, v in parametros
+    )
+
+
+def xyz_url(template, z, x, y):
+    """URL do tile (z, x, y) num modelo XYZ (``{z}``, ``{x}``, ``{y}``,
+    ``{-y}`` para TMS e ``{r}`` para retina, que fica vazio)."""
+    return (
+        template.replace("{z}", str(z))
+        .replace("{x}", str(x))
+        .replace("{-y}", str(2**z - 1 - y))
+        .replace("{y}", str(y))
+        .replace("{r}", "")
+    )
+
+
+def wms_params(layers, z, x, y, fmt="image/png", transparent=True, version="1.1.1"):
+    """Parâmetros do GetMap do tile (z, x, y) como o Leaflet os envia."""
+    lado = 2 * _ORIGEM / 2**z
+    bbox = [-_ORIGEM + x * lado, _ORIGEM - (y + 1) * lado]
+    bbox += [bbox[0] + lado, bbox[1] + lado]
+    return {
+        "service": "WMS",
+        "request": "GetMap",
+        "layers": layers,
+        "styles": "",
+        "format": fmt,
+        "transparent": "true" if transparent else "false",
+        "version": version,
+        "width": 256,
+        "height": 256,
+        "crs" if version == "1.3.0" else "srs": "EPSG:3857",
+        "bbox": ",".join(map(_format_number, bbox)),
+    }
+
+
+def _join_query(url, parametros):
+    return f"{url}{'&' if '?' in url else '?'}{urlencode(parametros)}"
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        partes = urlsplit(self.path)
+        parametros = parse_qsl(partes.query, keep_blank_values=True)
+        upstream = dict(parametros).get("u", "")
+        resto = [(k, v) for k, v in parametros if k != "u"]
+        ttl = TILE_TTL
+        if partes.path == "/stats":
+            corpo = json.dumps(self.server.cache.stats()).encode()
+            return self._send(
+                SourceResponse(200, corpo, {"Content-Type": "application/json"})
+            )
+        if partes.path.startswith("/xyz/"):
+            try:
+                z, x, y = map(int, partes.path.split("/")[2:5])
+            except ValueError:
+                return self._send(SourceResponse(404))
+            url = xyz_url(upstream, z, x, y)
+        elif partes.path == "/wms":
+            url = _join_query(upstream, resto)
+            if _is_capabilities(resto):
+                ttl = CAPABILITIES_TTL
+        else:
+            return self._send(SourceResponse(404))
+        # só repassa para servidores registrados pelas páginas: o proxy não
+        # é uma porta aberta para qualquer endereço
+        if urlsplit(url).netloc.lower() not in self.server.allowed:
+            return self._send(SourceResponse(403))
+        self._send(self.server.cache.get(url, ttl))
+
+    def _send(self, response):
+        self.send_response(response.status_code)
+        # o mapa roda num iframe de outra origem
+        self.send_header("Access-Control-Allow-Origin", "*")
+        if response.status_code == 200:
+            self.send_header("Cache-Control", "public, max-age=86400")
+        for chave, valor in response.headers.items():
+            self.send_header(chave, valor)
+        self.send_header("Content-Length", str(len(response.content)))
+        self.end_headers()
+        self.wfile.write(response.content)
+
+    def log_message(self, format, *args):
+        logger.debug("%s %s", self.address_string(), format % args)
+
+
+def make_proxy_server(cache=None, host=HOST, port=PORT):
+    """Proxy HTTP dos mapas de fundo sobre `cache`; use ``serve_forever()``.
+
+    ``allowed`` é o conjunto de servidores (``host:porta``) que ele repassa.
+    """
+    server = ThreadingHTTPServer((host, port), _ProxyHandler)
+    server.daemon_threads = True
+    server.cache = cache or get_cache()
+    server.allowed = set()
+    server.server_url = f"http://{host}:{server.server_port}"
+    return server
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_proxy():
+    """Inicia o proxy uma única vez por processo; devolve-o, ou None se está
+    desligado ou não pôde subir (as páginas usam então as URLs remotas)."""
+    global _server
+    if not ENABLED:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                server = make_proxy_server()
+            except OSError:
+                if PUBLIC_URL:
+                    # o caminho público leva a uma porta fixa
+                    logger.exception("porta do proxy ocupada (%s:%s)", HOST, PORT)
+                    _server = False
+                    return None
+                server = make_proxy_server(port=0)
+            threading.Thread(
+                target=server.serve_forever, name="basemaps", daemon=True
+            ).start()
+            _server = server
+        return _server or None
+
+
+def _proxied(url, caminho):
+    server = start_proxy()
+    if server is None:
+        return None
+    server.allowed.add(urlsplit(url).netloc.lower())
+    base = (PUBLIC_URL or server.server_url).rstrip("/")
+    return f"{base}/{caminho}?u={quote(url, safe='')}"
+
+
+def _one_subdomain(url, subdomains):
+    # ``{s}`` vira sempre o primeiro subdomínio: cada tile com uma só chave
+    return url.replace("{s}", subdomains[0] if subdomains else "")
+
+
+def proxy_xyz(url, subdomains="abc"):
+    """Modelo XYZ que passa pelo cache (ou `url`, sem o proxy)."""
+    return _proxied(_one_subdomain(url, subdomains), "xyz/{z}/{x}/{y}") or url
+
+
+def proxy_wms(url):
+    """URL de um serviço WMS que passa pelo cache (ou `url`, sem o proxy)."""
+    return _proxied(url, "wms") or url
+
+
+def wms_layers(url, cache=None):
+    """Nomes das camadas do serviço WMS em `url`, em ordem alfabética,
+    lidos do GetCapabilities (como ``leafmap.get_wms_layers``)."""
+    cache = cache or get_cache()
+    resposta = cache.get(
+        _join_query(url, {"service": "WMS", "request": "GetCapabilities"}),
+        CAPABILITIES_TTL,
+    )
+    if resposta.status_code != 200:
+        raise OSError(f"GetCapabilities de {url}: HTTP {resposta.status_code}")
+    raiz = ET.fromstring(resposta.content)
+    nomes = {
+        nome.text.strip()
+        for camada in raiz.iter()
+        if camada.tag.rsplit("}", 1)[-1] == "Layer"
+        for nome in camada
+        if nome.tag.rsplit("}", 1)[-1] == "Name" and nome.text
+    }
+    return sorted(nomes)
+
+
+def _qms_json(url, cache):
+    resposta = cache.get(url, CAPABILITIES_TTL)
+    if resposta.status_code != 200:
+        raise OSError(f"QMS: HTTP {resposta.status_code}")
+    return json.loads(resposta.content)
+
+
+def search_qms(keyword, limit=10, cache=None):
+    """Serviços do Quick Map Services para `keyword`, com o prefixo
+    ``qms.`` (como ``leafmap.search_qms``), ou None se não houver."""
+    cache = cache or get_cache()
+    servicos = _qms_json(
+        f"{QMS_API}/?search={quote(keyword)}&type=tms&epsg=3857&limit={limit}", cache
+    )
+    return ["qms." + s["name"] for s in servicos["results"]] or None
+
+
+def xyz_service(provider, cache=None):
+    """``(url, atribuição)`` de um serviço ``xyz.*`` (xyzservices) ou
+    ``qms.*`` (Quick Map Services), como ``Map.add_xyz_service``."""
+    if provider.startswith("xyz."):
+        import xyzservices.providers as xyz
+
+        servico = xyz.flatten()[provider[4:]]
+        return servico.build_url(), servico.get("attribution", " ") or " "
+    if provider.startswith("qms."):
+        cache = cache or get_cache()
+        nome = provider[4:]
+        servicos = _qms_json(f"{QMS_API}/?search={quote(nome)}&type=tms", cache)
+        for servico in servicos:
+            if servico["name"] == nome:
+                break
+        else:
+            raise ValueError(f"serviço {nome!r} não encontrado no QMS")
+        detalhes = _qms_json(f"{QMS_API}/{servico['id']}/", cache)
+        return detalhes["url"], detalhes.get("copyright_text") or " "
+    raise ValueError(f"{provider!r} não começa com xyz. nem qms.")
+
+
+def cached_basemap(name):
+    """Cópia da camada `name` de ``leafmap.basemaps`` com os tiles pelo
+    cache (ou a própria camada, sem o proxy), para usar onde o leafmap
+    aceita uma camada folium."""
+    import folium
+    from leafmap.foliumap import basemaps
+
+    camada = basemaps[name]
+    if start_proxy() is None:
+        return camada
+    opcoes = dict(camada.options)
+    atribuicao = opcoes.pop("attribution", " ") or " "
+    if hasattr(camada, "tiles"):
+        subdominios = opcoes.pop("subdomains", "abc")
+        return folium.TileLayer(
+            tiles=proxy_xyz(camada.tiles, subdominios),
+            name=camada.layer_name,
+            attr=atribuicao,
+            overlay=True,
+            **opcoes,
+        )
+    return folium.WmsTileLayer(
+        url=proxy_wms(camada.url),
+        layers=opcoes.pop("layers"),
+        fmt=opcoes.pop("format", "image/png"),
+        name=camada.layer_name,
+        attr=atribuicao,
+        overlay=True,
+        **opcoes,
+    )
+
+
+def tiles_in_bbox(bbox, zoom):
+    """Tiles ``(x, y)`` do `zoom` que cobrem ``(minx, miny, maxx, maxy)``."""
+    from .tiles import mercator
+
+    minx, miny, maxx, maxy = bbox
+    (x0, x1), (y1, y0) = mercator([minx, maxx], [miny, maxy])
+    lado = 2**zoom
+    return [
+        (x, y)
+        for x in range(math.floor(x0 * lado), math.floor(x1 * lado) + 1)
+        for y in range(math.floor(y0 * lado), math.floor(y1 * lado) + 1)
+    ]
+
+
+def extent_tiles(extents=tuple(EXTENTS)):
+    """Tiles ``(z, x, y)`` de `EXTENTS` escolhidos, sem repetição."""
+    tiles = set()
+    for nome in extents:
+        bbox, zooms = EXTENTS[nome]
+        tiles.update((z, x, y) for z in zooms for x, y in tiles_in_bbox(bbox, z))
+    return sorted(tiles)
+
+
+def basemap_tile_urls(name, tiles):
+    """URLs remotas dos `tiles` (``(z, x, y)``) da camada `name` de
+    ``leafmap.basemaps``, iguais às pedidas pela cópia de `cached_basemap`."""
+    from leafmap.foliumap import basemaps
+
+    camada = basemaps[name]
+    opcoes = camada.options
+    if hasattr(camada, "tiles"):
+        modelo = _one_subdomain(camada.tiles, opcoes.get("subdomains", "abc"))
+        return [xyz_url(modelo, z, x, y) for z, x, y in tiles]
+    return wms_tile_urls(
+        camada.url,
+        opcoes["layers"],
+        tiles,
+        opcoes.get("format", "image/png"),
+        opcoes.get("transparent", True),
+        opcoes.get("version", "1.1.1"),
+    )
+
+
+def xyz_tile_urls(template, tiles, subdomains="abc"):
+    """URLs remotas dos `tiles` (``(z, x, y)``) de um modelo XYZ."""
+    modelo = _one_subdomain(template, subdomains)
+    return [xyz_url(modelo, z, x, y) for z, x, y in tiles]
+
+
+def wms_tile_urls(
+    url, layers, tiles, fmt="image/png", transparent=True, version="1.1.1"
+):
+    """URLs GetMap dos `tiles` (``(z, x, y)``) de uma camada WMS."""
+    return [
+        _join_query(url, wms_params(layers, z, x, y, fmt, transparent, version))
+        for z, x, y in tiles
+    ]
+
+
+def prefetch(urls, max_workers=4, cache=None):
+    """Baixa `urls` para o cache; devolve ``(baixadas, em_cache, falhas)``."""
+    cache = cache or get_cache()
+    contagem = {"MISS": 0, "HIT": 0}
+    falhas = {}
+
+    def worker(url):
+        resposta = cache.get(url)
+        if resposta.status_code == 200:
+            return url, resposta.headers["X-Cache"]
+        return url, resposta.status_code
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for url, resultado in executor.map(worker, urls):
+            if resultado in contagem:
+                contagem[resultado] += 1
+            elif resultado != "STALE":
+                falhas[url] = resultado
+    return contagem["MISS"], contagem["HIT"], falhas
+
+
+def _png(cor, tamanho=256):
+    """PNG de uma cor só, sem depender de bibliotecas de imagem."""
+
+    def bloco(tipo, dados):
+        return (
+            struct.pack(">I", len(dados))
+            + tipo
+            + dados
+            + struct.pack(">I", zlib.crc32(tipo + dados))
+        )
+
+    linha = b"\x00" + bytes(cor) * tamanho
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + bloco(b"IHDR", struct.pack(">IIBBBBB", tamanho, tamanho, 8, 2, 0, 0, 0))
+        + bloco(b"IDAT", zlib.compress(linha * tamanho))
+        + bloco(b"IEND", b"")
+    )
+
+
+_CAPABILITIES = """<?xml version="1.0" encoding="UTF-8"?>
+<WMS_Capabilities version="1.3.0" xmlns="http://www.opengis.net/wms">
+  <Service><Name>WMS</Name><Title>Substituto local</Title></Service>
+  <Capability><Layer><Title>Camadas</Title>{}</Layer></Capability>
+</WMS_Capabilities>
+"""
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        config = self.server.config
+        with config["lock"]:
+            config["pedidos"] += 1
+        if config["latency"]:
+            time.sleep(config["latency"])
+        partes = urlsplit(self.path)
+        parametros = {k.lower(): v for k, v in parse_qsl(partes.query, True)}
+        tipo = "image/png"
+        if partes.path.startswith("/xyz/"):
+            cor = zlib.crc32(partes.path.encode()).to_bytes(4, "big")[:3]
+            corpo = _png(cor)
+        elif partes.path == "/wms" and _is_capabilities(parametros.items()):
+            camadas = "".join(
+                f"<Layer><Name>{c}</Name><Title>{c}</Title></Layer>"
+                for c in config["layers"]
+            )
+            corpo = _CAPABILITIES.format(camadas).encode()
+            tipo = "text/xml"
+        elif partes.path == "/wms" and parametros.get("request") == "GetMap":
+            cor = zlib.crc32(parametros.get("bbox", "").encode()).to_bytes(4, "big")[:3]
+            corpo = _png(cor)
+        else:
+            corpo, tipo = b"", "text/plain"
+        self.send_response(200 if corpo else 404)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, format, *args):
+        logger.debug("%s %s", self.address_string(), format % args)
+
+
+def make_standin_server(
+    host="127.0.0.1", port=8768, latency=0.1, layers=("FOCOS", "RELEVO")
+):
+    """Servidor que faz as vezes de um servidor de tiles remoto.
+
+    Responde tiles XYZ em ``/xyz/{z}/{x}/{y}.png`` e WMS em ``/wms``
+    (GetCapabilities com as camadas `layers` e GetMap), cada pedido depois
+    de `latency` segundos. ``config["pedidos"]`` conta os pedidos recebidos.
+    """
+    server = ThreadingHTTPServer((host, port), _StandInHandler)
+    server.daemon_threads = True
+    server.config = {
+        "latency": latency,
+        "layers": list(layers),
+        "pedidos": 0,
+        "lock": threading.Lock(),
+    }
+    server.server_url = f"http://{host}:{server.server_port}"
+    return server
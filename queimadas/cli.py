@@ -0,0 +1,466 @@
+"""Linha de comando para gerar relatórios sem abrir o navegador.
+
+Exemplo, para um alerta noturno::
+
+    python -m queimadas report propriedades/ --start 2024-09-01 \\
+        --end 2024-09-07 --output relatorio.parquet --workers 8
+
+Lê todos os KML/GeoJSON do diretório e escreve, por dia e propriedade, o
+número de focos e o FRP total e máximo (CSV ou Parquet, pela extensão).
+Os dias são baixados antes, em threads; depois o cruzamento é dividido em
+tarefas (dia × fatia das propriedades) entre processos, que leem os dias
+do cache em disco compartilhado.
+
+Para operar sem acesso ao INPE::
+
+    python -m queimadas sync espelho/ --start 2024-09-01 --end 2024-09-30
+    INPE_SOURCE=mirror INPE_MIRROR_DIR=espelho/ streamlit run Home.py
+
+ou, passando pelo HTTP como em produção::
+
+    python -m queimadas serve espelho/ --latency 0.3 &
+    INPE_BASE_URL=http://127.0.0.1:8765 streamlit run Home.py
+
+Para montar o arquivo histórico em Parquet (veja `queimadas.archive`)::
+
+    python -m queimadas archive --months 2022-01 2024-12
+
+O cubo das séries temporais (`queimadas.rollup`) é atualizado ao
+arquivar e pela pré-carga; para adiantar um intervalo::
+
+    python -m queimadas rollup --start 2024-01-01 --end 2024-12-31
+
+Os tiles dos mapas de fundo (`queimadas.basemaps`) podem ser baixados
+antes para o cache em disco, no Brasil e no Pantanal::
+
+    python -m queimadas basemaps prefetch --basemap "ESA WorldCover 2020"
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import archive, basemaps, inpe, rollup
+from .inpe import MAX_WORKERS, FetchError, days_between, ensure_fresh, load_day
+from .kml import PolygonFileError, read_polygon_file
+from .screening import screen_properties_by_day
+from .sources import HttpSource, make_server, sync_days
+
+POLYGON_SUFFIXES = (".kml", ".geojson", ".json")
+COLUMNS = ["lat", "lon", "frp"]
+
+
+def load_properties(directory):
+    """Lê os polígonos de todos os arquivos de `directory`.
+
+    Retorna ``(arquivos, nomes, geometrias)``, alinhados. Levanta
+    `PolygonFileError` se algum arquivo for inválido ou se não houver
+    nenhum polígono.
+    """
+    arquivos, nomes, geometrias = [], [], []
+    caminhos = sorted(
+        p for p in Path(directory).iterdir() if p.suffix.lower() in POLYGON_SUFFIXES
+    )
+    for caminho in caminhos:
+        with open(caminho, "rb") as f:
+            try:
+                items = read_polygon_file(caminho.name, f)
+            except (ValueError, KeyError) as e:
+                raise PolygonFileError(f"{caminho.name}: {e}") from e
+        for item in items:
+            arquivos.append(caminho.name)
+            nomes.append(item.name)
+            geometrias.append(item.geometry)
+    if not geometrias:
+        raise PolygonFileError(f"Nenhum KML/GeoJSON com polígonos em {directory}")
+    return arquivos, nomes, geometrias
+
+
+def prefetch_days(dates, max_workers=MAX_WORKERS):
+    """Deixa os dias no cache em disco; devolve as falhas por dia."""
+    falhas = {}
+
+    def worker(day):
+        try:
+            ensure_fresh(day)
+        except FetchError as e:
+            falhas[day] = str(e)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(dates))) as pool:
+        list(pool.map(worker, dates))
+    return falhas
+
+
+# propriedades de cada processo do pool, lidas uma vez no initializer
+_propriedades = None
+
+
+def _init_worker(directory):
+    global _propriedades
+    _propriedades = load_properties(directory)
+
+
+def _screen_task(tarefa):
+    day, inicio, fim = tarefa
+    arquivos, nomes, geometrias = _propriedades
+    df = load_day(day, COLUMNS)
+    df["data"] = pd.Timestamp(day)
+    resultado = screen_properties_by_day(nomes[inicio:fim], geometrias[inicio:fim], df)
+    resultado.insert(1, "arquivo", arquivos[inicio:fim])
+    return resultado
+
+
+def run_report(directory, dates, workers=None):
+    """Relatório de focos por dia e propriedade; devolve ``(df, falhas)``."""
+    workers = workers or os.cpu_count() or 1
+    n = len(load_properties(directory)[0])  # valida os arquivos antes do pool
+    falhas = prefetch_days(dates)
+    dias = [d for d in dates if d not in falhas]
+    if not dias:
+        return pd.DataFrame(), falhas
+
+    # com poucos dias, as propriedades são fatiadas para ocupar os processos
+    fatias = min(n, -(-workers // len(dias)))
+    limites = np.linspace(0, n, fatias + 1).astype(int)
+    tarefas = [
+        (day, int(a), int(b)) for day in dias for a, b in zip(limites, limites[1:])
+    ]
+    if workers == 1:
+        _init_worker(directory)
+        partes = list(map(_screen_task, tarefas))
+    else:
+        with ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(directory,)
+        ) as pool:
+            partes = list(pool.map(_screen_task, tarefas))
+
+    relatorio = pd.concat(partes, ignore_index=True)
+    relatorio = relatorio.sort_values(
+        ["data", "focos", "frp_total"],
+        ascending=[True, False, False],
+        ignore_index=True,
+    )
+    return relatorio, falhas
+
+
+def write_report(df, output):
+    output = Path(output)
+    if output.suffix.lower() == ".parquet":
+        df.to_parquet(output, index=False)
+    else:
+        df.to_csv(output, index=False)
+
+
+def report_command(args):
+    dates = days_between(args.start, args.end or args.start)
+    inicio = time.perf_counter()
+    try:
+        df, falhas = run_report(args.directory, dates, args.workers)
+    except PolygonFileError as e:
+        print(f"erro: {e}", file=sys.stderr)
+        return 2
+    for day, erro in falhas.items():
+        print(f"aviso: focos de {day:%d/%m/%Y} indisponíveis: {erro}", file=sys.stderr)
+    if df.empty:
+        print("erro: nenhum dia pôde ser obtido", file=sys.stderr)
+        return 1
+    write_report(df, args.output)
+    print(
+        f"{df['nome'].size // df['data'].nunique()} propriedades × "
+        f"{df['data'].nunique()} dias · {int(df['focos'].sum())} focos em "
+        f"propriedades · {time.perf_counter() - inicio:.1f} s · {args.output}",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def sync_command(args):
+    dates = days_between(args.start, args.end or args.start)
+    source = HttpSource(args.url or inpe.BASE_URL, inpe.get_session(), inpe.TIMEOUT)
+    inicio = time.perf_counter()
+    baixados, pulados, falhas = sync_days(
+        source, args.directory, dates, args.workers, args.force
+    )
+    for day, erro in falhas.items():
+        print(f"aviso: {day:%d/%m/%Y} não copiado: {erro}", file=sys.stderr)
+    print(
+        f"{len(baixados)} baixados · {len(pulados)} já no espelho · "
+        f"{len(falhas)} falhas · {time.perf_counter() - inicio:.1f} s · "
+        f"{args.directory}",
+        file=sys.stderr,
+    )
+    return 1 if falhas and not (baixados or pulados) else 0
+
+
+def serve_command(args):
+    server = make_server(
+        args.directory,
+        args.host,
+        args.port,
+        latency=args.latency,
+        bandwidth=args.bandwidth * 1024 if args.bandwidth else None,
+        synthetic=args.synthetic,
+    )
+    print(
+        f"servindo {args.directory} em {server.server_url} "
+        f"(use INPE_BASE_URL={server.server_url})",
+        file=sys.stderr,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+def _month(valor):
+    return date.fromisoformat(f"{valor}-01")
+
+
+def _month_days(inicio):
+    return days_between(
+        inicio, (inicio + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    )
+
+
+def rollup_command(args):
+    dates = days_between(args.start, args.end or args.start)
+    inicio = time.perf_counter()
+    falhas = rollup.update_days(dates)
+    for day, erro in falhas.items():
+        print(f"aviso: {day:%d/%m/%Y} fora do cubo: {erro}", file=sys.stderr)
+    print(
+        f"{len(dates) - len(falhas)} dias no cubo · "
+        f"{time.perf_counter() - inicio:.1f} s · {rollup.ROLLUP_DIR}",
+        file=sys.stderr,
+    )
+    return 1 if len(falhas) == len(dates) else 0
+
+
+def archive_command(args):
+    if not args.files and not args.months:
+        print("erro: informe arquivos ou --months", file=sys.stderr)
+        return 2
+    inicio = time.perf_counter()
+    total = 0
+    falhas = 0
+    meses = set()
+
+    def arquivar(caminho):
+        nonlocal total
+        t = time.perf_counter()
+        gravados = archive.ingest(caminho, args.dir)
+        meses.update(gravados)
+        total += sum(gravados.values())
+        print(
+            f"{Path(caminho).name}: {sum(gravados.values())} focos em "
+            f"{len(gravados)} meses · {time.perf_counter() - t:.1f} s",
+            file=sys.stderr,
+        )
+
+    for caminho in args.files:
+        arquivar(caminho)
+    if args.months:
+        mes, fim = map(_month, args.months)
+        with tempfile.TemporaryDirectory() as tmp:
+            while mes <= fim:
+                try:
+                    caminho = archive.download_month(mes.year, mes.month, tmp)
+                except FetchError as e:
+                    print(f"aviso: {mes:%m/%Y} não arquivado: {e}", file=sys.stderr)
+                    falhas += 1
+                else:
+                    arquivar(caminho)
+                    os.unlink(caminho)
+                mes = (mes + timedelta(days=32)).replace(day=1)
+    if args.dir == archive.ARCHIVE_DIR:
+        # o cubo das séries passa a ler estes meses do arquivo
+        dias = [
+            d
+            for m in sorted(meses & set(archive.complete_months()))
+            for d in _month_days(_month(m))
+        ]
+        rollup.update_days(dias)
+    print(
+        f"{total} focos arquivados em {args.dir} · "
+        f"{time.perf_counter() - inicio:.1f} s",
+        file=sys.stderr,
+    )
+    return 1 if falhas and not total else 0
+
+
+def basemaps_prefetch_command(args):
+    tiles = basemaps.extent_tiles(args.extent)
+    if args.basemap:
+        urls = basemaps.basemap_tile_urls(args.basemap, tiles)
+    elif args.wms:
+        if not args.layers:
+            print("erro: --wms pede --layers", file=sys.stderr)
+            return 2
+        urls = basemaps.wms_tile_urls(args.wms, args.layers, tiles)
+    elif args.xyz:
+        urls = basemaps.xyz_tile_urls(args.xyz, tiles)
+    else:
+        print("erro: informe --basemap, --xyz ou --wms", file=sys.stderr)
+        return 2
+    inicio = time.perf_counter()
+    baixados, em_cache, falhas = basemaps.prefetch(urls, args.workers)
+    for url, erro in list(falhas.items())[:5]:
+        print(f"aviso: {url} não baixado: {erro}", file=sys.stderr)
+    print(
+        f"{baixados} tiles baixados · {em_cache} já no cache · "
+        f"{len(falhas)} falhas · {time.perf_counter() - inicio:.1f} s · "
+        f"{basemaps.BASEMAPS_DIR}",
+        file=sys.stderr,
+    )
+    return 1 if falhas and not (baixados or em_cache) else 0
+
+
+def basemaps_stats_command(args):
+    print(basemaps.format_stats(basemaps.get_cache().stats()), file=sys.stderr)
+    return 0
+
+
+def basemaps_standin_command(args):
+    server = basemaps.make_standin_server(args.host, args.port, args.latency)
+    print(
+        f"tiles em {server.server_url}/xyz/{{z}}/{{x}}/{{y}}.png e WMS em "
+        f"{server.server_url}/wms",
+        file=sys.stderr,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m queimadas")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    report = comandos.add_parser("report", help="focos e FRP por propriedade e por dia")
+    report.add_argument("directory", type=Path, help="diretório com KML/GeoJSON")
+    report.add_argument(
+        "--start", type=date.fromisoformat, required=True, help="AAAA-MM-DD"
+    )
+    report.add_argument(
+        "--end", type=date.fromisoformat, help="AAAA-MM-DD (padrão: --start)"
+    )
+    report.add_argument("--output", default="relatorio.csv", help=".csv ou .parquet")
+    report.add_argument("--workers", type=int, help="processos (padrão: um por núcleo)")
+    report.set_defaults(func=report_command)
+
+    sync = comandos.add_parser(
+        "sync", help="copia um intervalo de dias para um espelho"
+    )
+    sync.add_argument("directory", type=Path, help="diretório do espelho")
+    sync.add_argument(
+        "--start", type=date.fromisoformat, required=True, help="AAAA-MM-DD"
+    )
+    sync.add_argument(
+        "--end", type=date.fromisoformat, help="AAAA-MM-DD (padrão: --start)"
+    )
+    sync.add_argument("--url", help="origem HTTP (padrão: INPE_BASE_URL)")
+    sync.add_argument("--workers", type=int, default=4, help="downloads simultâneos")
+    sync.add_argument(
+        "--force", action="store_true", help="baixa de novo dias já no espelho"
+    )
+    sync.set_defaults(func=sync_command)
+
+    serve = comandos.add_parser("serve", help="serve um espelho por HTTP, como o INPE")
+    serve.add_argument("directory", type=Path, help="diretório do espelho")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument(
+        "--latency", type=float, default=0.2, help="segundos por resposta (±50%%)"
+    )
+    serve.add_argument("--bandwidth", type=int, help="KiB/s por resposta")
+    serve.add_argument(
+        "--synthetic",
+        type=int,
+        default=0,
+        metavar="N",
+        help="gera dias ausentes com N focos sintéticos",
+    )
+    serve.set_defaults(func=serve_command)
+
+    arq = comandos.add_parser(
+        "archive", help="grava arquivos mensais/anuais no arquivo histórico"
+    )
+    arq.add_argument("files", nargs="*", type=Path, help="CSV ou ZIP do INPE")
+    arq.add_argument(
+        "--months",
+        nargs=2,
+        metavar=("AAAA-MM", "AAAA-MM"),
+        help="baixa e arquiva os arquivos mensais do intervalo",
+    )
+    arq.add_argument(
+        "--dir",
+        type=Path,
+        default=archive.ARCHIVE_DIR,
+        help="destino (padrão: INPE_ARCHIVE_DIR)",
+    )
+    arq.set_defaults(func=archive_command)
+
+    cubo = comandos.add_parser(
+        "rollup", help="atualiza o cubo das séries temporais para um intervalo"
+    )
+    cubo.add_argument(
+        "--start", type=date.fromisoformat, required=True, help="AAAA-MM-DD"
+    )
+    cubo.add_argument(
+        "--end", type=date.fromisoformat, help="AAAA-MM-DD (padrão: --start)"
+    )
+    cubo.set_defaults(func=rollup_command)
+
+    mapas = comandos.add_parser(
+        "basemaps", help="cache em disco dos mapas de fundo (XYZ/WMS)"
+    )
+    acoes = mapas.add_subparsers(dest="acao", required=True)
+    pre = acoes.add_parser("prefetch", help="baixa os tiles do Brasil e do Pantanal")
+    pre.add_argument("--basemap", help='camada do leafmap, ex.: "ESA WorldCover 2020"')
+    pre.add_argument("--xyz", help="modelo XYZ, ex.: https://.../{z}/{x}/{y}.png")
+    pre.add_argument("--wms", help="URL do serviço WMS")
+    pre.add_argument("--layers", help="camadas WMS (com --wms)")
+    pre.add_argument(
+        "--extent",
+        nargs="+",
+        choices=list(basemaps.EXTENTS),
+        default=list(basemaps.EXTENTS),
+    )
+    pre.add_argument("--workers", type=int, default=4, help="downloads simultâneos")
+    pre.set_defaults(func=basemaps_prefetch_command)
+    stats = acoes.add_parser(
+        "stats", help="tamanho do cache e acertos somados de todos os processos"
+    )
+    stats.set_defaults(func=basemaps_stats_command)
+    standin = acoes.add_parser(
+        "standin", help="servidor XYZ/WMS local, para testar sem rede"
+    )
+    standin.add_argument("--host", default="127.0.0.1")
+    standin.add_argument("--port", type=int, default=8768)
+    standin.add_argument(
+        "--latency", type=float, default=0.1, help="segundos por resposta"
+    )
+    standin.set_defaults(func=basemaps_standin_command)
+    return parser
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(message)s")
+    args = build_parser().parse_args(argv)
+    return args.func(args)
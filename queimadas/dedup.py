@@ -0,0 +1,184 @@
+"""Agrupamento de detecções repetidas do mesmo fogo em eventos.
+
+O mesmo fogo aparece várias vezes nos arquivos do INPE: cada satélite
+(coluna ``satelite``) e cada passagem gera a sua detecção, e o GOES-16
+repete o mesmo pixel a cada dez minutos. `deduplicate` junta detecções a
+até ``distance_km`` e ``window_h`` horas umas das outras num único
+evento, representado pela detecção de maior FRP, com o FRP somado e o
+número de detecções e de satélites.
+
+Em vez de comparar todos os pares, os pontos vão para uma grade de
+lat/lon/tempo com células do tamanho dos limites: só pares na mesma
+célula ou em células vizinhas podem estar perto o bastante, e só esses
+são medidos. Os eventos são as componentes conexas desses pares
+(ligação simples: uma frente de fogo que avança em passos menores que os
+limites vira um evento só), achadas com uma união-busca vetorizada.
+O custo cresce com o número de focos e de pares próximos, não com o
+quadrado dos focos.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from .geo import KM_POR_GRAU
+
+DISTANCE_KM = 1.0
+WINDOW_H = 3.0
+
+# linhas (dy, dt) vizinhas "à frente"; com a célula seguinte na mesma
+# linha, cobrem cada par de células vizinhas uma única vez
+_LINHAS = [(1, 0), (-1, 1), (0, 1), (1, 1)]
+
+
+def _cell_pairs(inicio, contagem, a, b):
+    """Todos os pares (i, j) de posições entre as células `a` e `b`."""
+    ca, cb = contagem[a], contagem[b]
+    total = ca * cb
+    bloco = np.repeat(np.arange(len(a)), total)
+    k = np.arange(total.sum()) - np.repeat(np.cumsum(total) - total, total)
+    i = inicio[a][bloco] + k // cb[bloco]
+    j = inicio[b][bloco] + k % cb[bloco]
+    return i, j
+
+
+def _components(n, u, v):
+    """Rótulo (0..k-1) da componente conexa de cada nó do grafo (u, v)."""
+    rotulo = np.arange(n)
+    while len(u):
+        # pendura a raiz maior de cada aresta na menor...
+        ru, rv = rotulo[u], rotulo[v]
+        np.minimum.at(rotulo, np.maximum(ru, rv), np.minimum(ru, rv))
+        # ...e comprime os caminhos até cada nó apontar para a raiz
+        while True:
+            proximo = rotulo[rotulo]
+            if np.array_equal(proximo, rotulo):
+                break
+            rotulo = proximo
+        pendentes = rotulo[u] != rotulo[v]
+        u, v = u[pendentes], v[pendentes]
+    return np.unique(rotulo, return_inverse=True)[1]
+
+
+def cluster_labels(lon, lat, hours=None, distance_km=DISTANCE_KM, window_h=WINDOW_H):
+    """Evento de cada detecção: rótulos 0..k-1 alinhados com `lon`/`lat`.
+
+    Duas detecções ficam no mesmo evento se estão a até `distance_km` e,
+    com `hours` (horário em horas, em qualquer origem), a até `window_h`
+    horas uma da outra, ou se estão ligadas por uma cadeia dessas.
+    Detecções sem coordenadas ficam sozinhas.
+    """
+    lon = np.asarray(lon, dtype="float64")
+    lat = np.asarray(lat, dtype="float64")
+    n = len(lon)
+    validos = ~(np.isnan(lon) | np.isnan(lat))
+    if hours is not None:
+        hours = np.asarray(hours, dtype="float64")
+        validos &= ~np.isnan(hours)
+    idx = np.flatnonzero(validos)
+    if not idx.size:
+        return np.arange(n)
+    x, y = lon[idx], lat[idx]
+    t = hours[idx] if hours is not None else np.zeros(idx.size)
+
+    # células conservadoras: o grau de longitude mais curto do conjunto
+    lat_ref = min(float(np.abs(y).max()), 89.0)
+    cel_lat = distance_km / KM_POR_GRAU
+    cel_lon = distance_km / (KM_POR_GRAU * math.cos(math.radians(lat_ref)))
+    cx = np.floor(x / cel_lon).astype("int64")
+    cy = np.floor(y / cel_lat).astype("int64")
+    ct = np.floor(t / window_h).astype("int64") if window_h else np.zeros_like(cx)
+    # margem de uma célula em cada ponta: vizinhos nunca dão a volta
+    cx, cy, ct = cx - cx.min() + 1, cy - cy.min() + 1, ct - ct.min() + 1
+    wx, wy = int(cx.max()) + 2, int(cy.max()) + 2
+    chave = (ct * wy + cy) * wx + cx
+
+    ordem = np.argsort(chave)
+    ordenada = chave[ordem]
+    inicio = np.flatnonzero(np.r_[True, ordenada[1:] != ordenada[:-1]])
+    celulas = ordenada[inicio]
+    contagem = np.diff(np.r_[inicio, len(ordenada)])
+    coslat = np.cos(np.radians(y))
+    limite = distance_km**2
+
+    def perto(i, j):
+        p, q = ordem[i], ordem[j]
+        dx = (x[p] - x[q]) * KM_POR_GRAU * (coslat[p] + coslat[q]) / 2
+        dy = (y[p] - y[q]) * KM_POR_GRAU
+        ok = dx * dx + dy * dy <= limite
+        if hours is not None:
+            ok &= np.abs(t[p] - t[q]) <= window_h
+        return p[ok], q[ok]
+
+    arestas = []
+    # pares dentro da mesma célula (i < j)
+    cheias = np.flatnonzero(contagem > 1)
+    i, j = _cell_pairs(inicio, contagem, cheias, cheias)
+    manter = i < j
+    arestas.append(perto(i[manter], j[manter]))
+    # célula seguinte na mesma linha: é a próxima na ordem das chaves
+    a = np.flatnonzero(celulas[1:] == celulas[:-1] + 1)
+    arestas.append(perto(*_cell_pairs(inicio, contagem, a, a + 1)))
+    # linhas vizinhas: as até três células de dx = -1, 0 e 1 também são
+    # consecutivas, e uma busca por linha acha a primeira delas
+    for dy, dt in _LINHAS:
+        centro = celulas + (dt * wy + dy) * wx
+        pos = np.searchsorted(celulas, centro - 1)
+        for k in range(3):
+            b = pos + k
+            achou = b < len(celulas)
+            achou[achou] = celulas[b[achou]] <= centro[achou] + 1
+            a = np.flatnonzero(achou)
+            if a.size:
+                arestas.append(perto(*_cell_pairs(inicio, contagem, a, b[a])))
+
+    u = np.concatenate([e[0] for e in arestas])
+    v = np.concatenate([e[1] for e in arestas])
+    rotulos = np.empty(n, dtype="int64")
+    rotulos[idx] = _components(idx.size, u, v)
+    # sem coordenadas: um evento para cada
+    sozinhos = np.flatnonzero(~validos)
+    rotulos[sozinhos] = rotulos[idx].max() + 1 + np.arange(sozinhos.size)
+    return rotulos
+
+
+def deduplicate(df, distance_km=DISTANCE_KM, window_h=WINDOW_H):
+    """Um evento por grupo de detecções do mesmo fogo.
+
+    Cada linha do resultado é a detecção de maior FRP do evento, com as
+    colunas de `df`, mais ``frp_total`` (FRP somado das detecções),
+    ``deteccoes`` e, se houver a coluna ``satelite``, ``satelites``
+    (quantos satélites diferentes o viram). Sem ``data_hora_gmt``, só a
+    distância é considerada.
+    """
+    if df.empty:
+        return df.assign(frp_total=pd.Series(dtype="float64"), deteccoes=0)
+    horas = None
+    if "data_hora_gmt" in df:
+        segundos = df["data_hora_gmt"].to_numpy("datetime64[s]").astype("int64")
+        horas = np.where(df["data_hora_gmt"].isna(), np.nan, segundos / 3600)
+    rotulos = cluster_labels(
+        df["lon"].to_numpy(), df["lat"].to_numpy(), horas, distance_km, window_h
+    )
+    frp = df["frp"].to_numpy(dtype="float64", na_value=np.nan)
+    n = int(rotulos.max()) + 1
+
+    # representante: a primeira detecção com o maior FRP de cada evento
+    valor = np.nan_to_num(frp, nan=-np.inf)
+    maior = np.full(n, -np.inf)
+    np.maximum.at(maior, rotulos, valor)
+    candidatos = np.flatnonzero(valor == maior[rotulos])
+    representante = np.full(n, len(df))
+    np.minimum.at(representante, rotulos[candidatos], candidatos)
+
+    eventos = df.iloc[representante].reset_index(drop=True)
+    eventos["frp_total"] = np.bincount(rotulos, weights=np.nan_to_num(frp))
+    eventos["deteccoes"] = np.bincount(rotulos).astype("int32")
+    if "satelite" in df:
+        codigos = df["satelite"].astype("category").cat.codes.to_numpy("int64")
+        # evento × satélite (a coluna 0 é "sem satélite"): uma marca por par
+        visto = np.zeros((n, codigos.max() + 2), dtype=bool)
+        visto[rotulos, codigos + 1] = True
+        eventos["satelites"] = visto.sum(axis=1).astype("int32")
+    return eventos
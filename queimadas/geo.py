@@ -0,0 +1,48 @@
+"""Testes espaciais vetorizados sobre os focos do INPE."""
+
+import numpy as np
+import shapely
+
+# km por grau de latitude (e de longitude no equador)
+KM_POR_GRAU = 111.32
+# menor comprimento de um grau no WGS84 (latitude no equador, ~110,57 km):
+# margens em graus calculadas com ele nunca ficam curtas
+KM_POR_GRAU_MIN = 110.5
+
+
+def spread_bits(v):
+    """Intercala zeros entre os 16 bits de `v` (0b1011 -> 0b1000101), para
+    chaves da curva Z."""
+    v = v.astype("uint32") & 0xFFFF
+    v = (v | (v << 8)) & 0x00FF00FF
+    v = (v | (v << 4)) & 0x0F0F0F0F
+    v = (v | (v << 2)) & 0x33333333
+    return (v | (v << 1)) & 0x55555555
+
+
+def points_in_polygon(poly, lon, lat):
+    """Retorna um array booleano dizendo quais pontos caem dentro de `poly`.
+
+    Os pontos fora do retângulo envolvente do polígono são descartados com
+    uma comparação barata em numpy; só os candidatos restantes são testados
+    contra a geometria preparada.
+    """
+    lon = np.asarray(lon, dtype="float64")
+    lat = np.asarray(lat, dtype="float64")
+    minx, miny, maxx, maxy = poly.bounds
+
+    dentro = np.zeros(lon.shape, dtype=bool)
+    candidatos = np.flatnonzero(
+        (lon >= minx) & (lon <= maxx) & (lat >= miny) & (lat <= maxy)
+    )
+    if candidatos.size:
+        shapely.prepare(poly)
+        dentro[candidatos] = shapely.contains_xy(poly, lon[candidatos], lat[candidatos])
+    return dentro
+
+
+def process_df_on_polygon(poly, df):
+    # assign não altera `df`, que pode ser o frame compartilhado entre sessões
+    return df.assign(
+        dentro=points_in_polygon(poly, df["lon"].to_numpy(), df["lat"].to_numpy())
+    )
@@ -0,0 +1,60 @@
+"""Pré-agregação dos focos numa grade regular para o mapa de calor.
+
+Em vez de mandar cada foco para o Leaflet.heat no navegador, os pontos são
+agrupados em células de lat/lon e só o centróide de cada célula segue para
+o mapa, com a métrica agregada como peso. O número de células é limitado
+pela área coberta e pelo tamanho da célula, não pela quantidade de focos.
+"""
+
+import numpy as np
+import pandas as pd
+
+# como cada métrica de options_map é combinada dentro de uma célula
+METRIC_AGG = {
+    "frp": "sum",
+    "numero_dias_sem_chuva": "mean",
+    "risco_fogo": "mean",
+}
+
+TILE_SIZE = 256
+
+
+def cell_size_deg(radius_px, zoom):
+    """Tamanho da célula, em graus, para um raio de agregação em pixels.
+
+    Usa meio raio por célula: células menores que o kernel do mapa de calor
+    não mudam a imagem, só aumentam o volume enviado.
+    """
+    graus_por_pixel = 360 / (TILE_SIZE * 2**zoom)
+    return max(radius_px, 1) / 2 * graus_por_pixel
+
+
+def bin_points(df, value, cell_deg, how=None):
+    """Agrega `df` numa grade de `cell_deg` graus.
+
+    Retorna um DataFrame com ``lat``/``lon`` (centróide dos focos de cada
+    célula), `value` agregado segundo `how` (``"sum"`` ou ``"mean"``; por
+    padrão o de `METRIC_AGG`) e ``quantidade_focos``.
+    """
+    how = how or METRIC_AGG.get(value, "sum")
+    lat = df["lat"].to_numpy(dtype="float64")
+    lon = df["lon"].to_numpy(dtype="float64")
+    val = df[value].to_numpy(dtype="float64")
+
+    ix = np.floor(lon / cell_deg).astype(np.int64)
+    iy = np.floor(lat / cell_deg).astype(np.int64)
+    codes, uniques = pd.factorize(ix * (1 << 32) + iy)
+
+    n = len(uniques)
+    quantidade = np.bincount(codes, minlength=n)
+    soma = np.bincount(codes, weights=val, minlength=n)
+    agregado = soma if how == "sum" else soma / quantidade
+
+    return pd.DataFrame(
+        {
+            "lat": np.bincount(codes, weights=lat, minlength=n) / quantidade,
+            "lon": np.bincount(codes, weights=lon, minlength=n) / quantidade,
+            value: agregado,
+            "quantidade_focos": quantidade,
+        }
+    )
@@ -0,0 +1,380 @@
+"""Acesso aos arquivos diários de focos de incêndio do INPE.
+
+Cada dia baixado é guardado em disco em Parquet. Dias passados são
+imutáveis e servidos direto do cache; o dia corrente expira depois de
+``INPE_TODAY_TTL`` segundos, já que o INPE continua publicando focos ao
+longo do dia.
+
+O dia corrente é atualizado de forma incremental: ao lado do Parquet fica
+um ``.json`` com o tamanho já lido do CSV, o ETag/Last-Modified e um
+contador de versão. A atualização pede só o final do arquivo (``Range``)
+com requisição condicional, confere que o trecho já conhecido não mudou e
+acrescenta apenas os focos novos, sem duplicatas. `data_version` permite
+às páginas perceber que chegaram focos novos.
+
+Intervalos de datas são baixados em paralelo por `fetch_days`, com um
+pool limitado de threads compartilhando uma única sessão HTTP (keep-alive
+e novas tentativas com backoff). Falhas são devolvidas por dia em vez de
+virarem um DataFrame vazio silencioso.
+
+Os arquivos vêm da origem de `get_source` (``INPE_SOURCE``): o INPE por
+HTTP ou um espelho local; veja `queimadas.sources`.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date as date_type
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .instrumentation import stage
+from .schema import (
+    coerce_schema,
+    concat_frames,
+    drop_duplicate_hotspots,
+    only_new_rows,
+    parse_inpe_csv,
+)
+from .sources import HttpSource, MirrorSource, file_name
+from .store import get_store
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = os.environ.get(
+    "INPE_BASE_URL",
+    "https://dataserver-coids.inpe.br/queimadas/queimadas/focos/csv/diario/Brasil",
+)
+# "inpe" (HTTP em BASE_URL) ou "mirror" (CSVs em MIRROR_DIR)
+SOURCE = os.environ.get("INPE_SOURCE", "inpe")
+MIRROR_DIR = Path(
+    os.environ.get(
+        "INPE_MIRROR_DIR", Path(__file__).resolve().parent.parent / ".cache" / "mirror"
+    )
+)
+
+CACHE_DIR = Path(
+    os.environ.get(
+        "INPE_CACHE_DIR", Path(__file__).resolve().parent.parent / ".cache" / "inpe"
+    )
+)
+TODAY_TTL = int(os.environ.get("INPE_TODAY_TTL", 600))
+MAX_WORKERS = int(os.environ.get("INPE_MAX_WORKERS", 8))
+TIMEOUT = 60
+# bytes já conhecidos pedidos de novo para confirmar que o arquivo só cresceu
+OVERLAP = 1024
+
+_session = None
+_session_lock = threading.Lock()
+_day_locks = {}
+
+
+class FetchError(Exception):
+    """Falha ao obter o arquivo de um dia."""
+
+
+def get_session():
+    """Sessão HTTP única do processo, reaproveitando conexões entre dias."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=("GET",),
+            )
+            adapter = HTTPAdapter(
+                pool_connections=1, pool_maxsize=MAX_WORKERS, max_retries=retry
+            )
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+def days_between(start, end):
+    """Lista de datas de `start` até `end`, inclusive."""
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def get_source():
+    """Origem configurada dos arquivos diários."""
+    if SOURCE == "mirror":
+        return MirrorSource(MIRROR_DIR)
+    if SOURCE != "inpe":
+        raise ValueError(f"INPE_SOURCE desconhecida: {SOURCE!r}")
+    return HttpSource(BASE_URL, get_session(), TIMEOUT)
+
+
+def build_url(date):
+    return f"{BASE_URL}/{file_name(date)}"
+
+
+def cache_path(date):
+    return CACHE_DIR / f"focos_diario_br_{date.strftime('%Y%m%d')}.parquet"
+
+
+def meta_path(date):
+    return cache_path(date).with_suffix(".json")
+
+
+def read_meta(date):
+    try:
+        return json.loads(meta_path(date).read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def write_meta(date, meta):
+    path = meta_path(date)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp, path)
+
+
+def is_fresh(path, date):
+    """Diz se o arquivo em cache ainda pode ser usado para `date`."""
+    if not path.exists():
+        return False
+    meta = read_meta(date)
+    conferido = meta["conferido_em"] if meta else path.stat().st_mtime
+    if date < date_type.fromtimestamp(conferido):
+        return True  # conferido depois que o dia fechou: não muda mais
+    return time.time() - conferido < TODAY_TTL
+
+
+def write_cache(df, path):
+    # escreve num temporário e troca de uma vez, para que outra sessão
+    # nunca leia um Parquet pela metade
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def download_day(date, headers=None):
+    """GET do arquivo de `date`; devolve a resposta ou levanta `FetchError`."""
+    source = get_source()
+    try:
+        with stage(f"download {date:%d/%m}") as etapa:
+            response = source.get(date, headers)
+            etapa["bytes"] = len(response.content)
+    except OSError as e:  # inclui requests.RequestException
+        raise FetchError(f"erro de conexão: {e}") from e
+    if response.status_code == 404:
+        if isinstance(source, MirrorSource):
+            raise FetchError(f"arquivo ausente do espelho {source.directory}")
+        raise FetchError("arquivo ainda não publicado pelo INPE (404)")
+    if response.status_code not in (200, 206, 304, 416):
+        raise FetchError(f"erro ao acessar a URL ({response.status_code})")
+    return response
+
+
+def day_lock(date):
+    with _session_lock:
+        return _day_locks.setdefault(date, threading.RLock())
+
+
+def refresh_day(date):
+    """Atualiza o cache de `date` e devolve quantos focos novos entraram.
+
+    Sem cache, baixa o arquivo inteiro. Com cache, pede a partir de
+    ``OVERLAP`` bytes antes do fim já lido: 304 significa que nada mudou,
+    e um 206 cujo começo bate com o trecho conhecido traz só as linhas
+    novas. Qualquer outra coisa (arquivo reescrito ou encolhido, servidor
+    sem suporte a ``Range``) cai para o download completo.
+    """
+    path = cache_path(date)
+    with day_lock(date):
+        meta = read_meta(date) if path.exists() else None
+        if meta is None:
+            return _replace_day(date, download_day(date), None)
+
+        inicio = max(meta["tamanho"] - OVERLAP, 0)
+        conhecido = bytes.fromhex(meta["cauda"])
+        headers = {"Range": f"bytes={inicio}-"}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        elif meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        response = download_day(date, headers)
+
+        if response.status_code == 304:
+            meta["conferido_em"] = time.time()
+            write_meta(date, meta)
+            return 0
+        if response.status_code != 206 or not response.content.startswith(conhecido):
+            # 200 (sem suporte a Range), 416 (arquivo encolheu) ou trecho já
+            # lido diferente: o arquivo foi reescrito
+            if response.status_code != 200:
+                response = download_day(date)
+            return _replace_day(date, response, meta)
+
+        novo = response.content[len(conhecido) :]
+        # só linhas completas: o resto pode estar sendo escrito agora e vem
+        # de novo na próxima atualização
+        completo = novo[: novo.rfind(b"\n") + 1]
+        validadores = _validators(response)
+        if len(completo) < len(novo):
+            # o ETag vale para o arquivo com a linha incompleta
+            validadores = {"etag": None, "last_modified": None}
+        novo = completo
+        meta.update(
+            validadores,
+            tamanho=meta["tamanho"] + len(novo),
+            cauda=(conhecido + novo)[-OVERLAP:].hex(),
+            conferido_em=time.time(),
+        )
+        adicionados = 0
+        if novo.strip():
+            # o cabeçalho guardado torna o pedaço um CSV completo
+            with stage("parse CSV (incremental)") as etapa:
+                chegada = parse_inpe_csv(meta["cabecalho"].encode() + b"\n" + novo)
+                etapa["linhas"] = len(chegada)
+            atual = coerce_schema(get_store().frame(path))
+            chegada = only_new_rows(atual, chegada)
+            adicionados = len(chegada)
+            if adicionados:
+                write_cache(concat_frames([atual, chegada]), path)
+                meta["linhas"] += adicionados
+                meta["versao"] += 1
+        write_meta(date, meta)
+        return adicionados
+
+
+def _validators(response):
+    return {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+
+
+def _replace_day(date, response, meta):
+    if response.status_code != 200:
+        raise FetchError(f"resposta inesperada ({response.status_code})")
+    conteudo = response.content
+    # lê direto dos bytes, sem decodificar o corpo inteiro para str
+    with stage("parse CSV", nbytes=len(conteudo)) as etapa:
+        df = drop_duplicate_hotspots(parse_inpe_csv(conteudo))
+        etapa["linhas"] = len(df)
+    if df.empty:
+        raise FetchError("arquivo sem focos")
+    write_cache(df, cache_path(date))
+    anterior = meta["linhas"] if meta else 0
+    write_meta(
+        date,
+        {
+            **_validators(response),
+            "tamanho": len(conteudo),
+            "cauda": conteudo[-OVERLAP:].hex(),
+            "cabecalho": conteudo[: conteudo.find(b"\n")].decode("utf-8").strip(),
+            "linhas": len(df),
+            "versao": (meta["versao"] if meta else 0) + 1,
+            "conferido_em": time.time(),
+        },
+    )
+    return max(len(df) - anterior, 0)
+
+
+def ensure_fresh(date):
+    """Atualiza `date` se o cache tiver expirado; devolve os focos novos."""
+    with day_lock(date):
+        if is_fresh(cache_path(date), date):
+            return 0
+        return refresh_day(date)
+
+
+def data_version(dates):
+    """Versão dos dias que ainda podem mudar; muda quando chegam focos novos."""
+    recentes = date_type.today() - timedelta(days=1)
+    return tuple(
+        (d, (read_meta(d) or {}).get("versao", 0)) for d in dates if d >= recentes
+    )
+
+
+def load_day(date, columns=None):
+    """Retorna os focos de `date`, lendo do cache em disco quando possível.
+
+    O cache guarda sempre o arquivo completo e é lido pelo armazenamento
+    compartilhado do processo (`queimadas.store`), de modo que sessões
+    diferentes recebem visões do mesmo dia em vez de cópias; `columns`
+    limita as colunas. O dia corrente é atualizado por `refresh_day`.
+    Levanta `FetchError` se o dia não puder ser obtido;
+    falhas e dias sem dados não vão para o cache, para que a próxima
+    chamada tente de novo.
+    """
+    if isinstance(date, datetime):
+        date = date.date()
+    ensure_fresh(date)
+    with stage(f"leitura do cache {date:%d/%m}") as etapa:
+        df = coerce_schema(get_store().frame(cache_path(date), columns))
+        etapa["linhas"] = len(df)
+    return df
+
+
+def fetch_days(dates, columns=None, max_workers=MAX_WORKERS):
+    """Baixa vários dias em paralelo.
+
+    Retorna ``(df, falhas)``: `df` junta todos os dias obtidos, com a coluna
+    ``data`` indicando o arquivo de origem, e `falhas` mapeia cada dia que
+    não pôde ser obtido para a mensagem de erro correspondente. `columns`
+    restringe as colunas carregadas.
+    """
+    dates = sorted(set(dates))
+    falhas = {}
+    frames = []
+    if not dates:
+        return pd.DataFrame(), falhas
+
+    def worker(date):
+        try:
+            return date, load_day(date, columns), None
+        except FetchError as e:
+            return date, None, str(e)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(dates))) as pool:
+        # cada tarefa leva uma cópia do contexto: as etapas medidas nas
+        # threads entram na execução da página que pediu os dias
+        tarefas = [
+            pool.submit(contextvars.copy_context().run, worker, date) for date in dates
+        ]
+        for tarefa in tarefas:
+            date, df, erro = tarefa.result()
+            if erro is not None:
+                logger.warning("Focos de %s indisponíveis: %s", date, erro)
+                falhas[date] = erro
+                continue
+            df.insert(0, "data", pd.Timestamp(date))
+            frames.append(df)
+
+    if not frames:
+        return pd.DataFrame(), falhas
+    # uma única concatenação no fim, em vez de ir acumulando cópias
+    with stage("concatenação", rows=sum(map(len, frames))):
+        df = concat_frames(frames)
+    return df, falhas
+
+
+def get_data_from_inpe(date, columns=None):
+    """Retorna os focos de um único dia (DataFrame vazio se indisponível)."""
+    df, _ = fetch_days([date], columns)
+    return df
@@ -0,0 +1,197 @@
+"""Medição por etapa das execuções das páginas.
+
+Uma execução (`instrument_run`) junta as etapas medidas com `stage`, de
+qualquer módulo: cada etapa registra duração e, quando fizer sentido,
+linhas e bytes. Fora de uma execução `stage` só mede e descarta, então os
+módulos de dados podem ser instrumentados sem depender das páginas. A
+execução ativa vive numa ``ContextVar``; pools de threads precisam copiar
+o contexto (veja `fetch_days`).
+
+Ao fim de cada execução, as etapas vão para o logger
+``queimadas.instrumentation`` e, se ``INPE_TIMINGS_LOG`` apontar para um
+arquivo, são acrescentadas a ele como uma linha JSON.
+
+Com ``INPE_PROFILE=cprofile`` ou ``INPE_PROFILE=sample``, uma execução
+pedida com ``profile=True`` é perfilada inteira; o resultado vai para
+``INPE_PROFILE_DIR`` (``.prof`` do cProfile ou pilhas colapsadas da
+amostragem, no formato do flamegraph.pl) e um resumo fica em
+`Run.profile_text`.
+"""
+
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEBUG = os.environ.get("INPE_DEBUG", "0") == "1"
+TIMINGS_LOG = os.environ.get("INPE_TIMINGS_LOG")
+PROFILE = os.environ.get("INPE_PROFILE")  # "cprofile" ou "sample"
+PROFILE_DIR = Path(
+    os.environ.get(
+        "INPE_PROFILE_DIR",
+        Path(__file__).resolve().parent.parent / ".cache" / "profiles",
+    )
+)
+SAMPLE_INTERVAL = 0.005
+
+_current = ContextVar("instrumentation_run", default=None)
+
+
+class Run:
+    """Etapas medidas numa execução de uma página."""
+
+    def __init__(self, page):
+        self.page = page
+        self.started_at = datetime.now()
+        self.records = []
+        self.total = None
+        self.profile_path = None
+        self.profile_text = None
+        self._inicio = time.perf_counter()
+
+    def frame(self):
+        df = pd.DataFrame(self.records, columns=["etapa", "ms", "linhas", "bytes"])
+        return df.astype({"linhas": "Int64", "bytes": "Int64"})
+
+    def as_dict(self):
+        return {
+            "pagina": self.page,
+            "inicio": self.started_at.isoformat(timespec="seconds"),
+            "total_ms": round(self.total * 1000, 1) if self.total else None,
+            "etapas": self.records,
+        }
+
+
+@contextmanager
+def stage(name, rows=None, nbytes=None):
+    """Mede o bloco como uma etapa.
+
+    O dicionário devolvido pode receber ``linhas`` e ``bytes`` depois que o
+    bloco souber quanto processou.
+    """
+    registro = {"etapa": name, "ms": None, "linhas": rows, "bytes": nbytes}
+    inicio = time.perf_counter()
+    try:
+        yield registro
+    finally:
+        registro["ms"] = round((time.perf_counter() - inicio) * 1000, 2)
+        run = _current.get()
+        if run is not None:
+            run.records.append(registro)
+
+
+def current_run():
+    return _current.get()
+
+
+@contextmanager
+def instrument_run(page, profile=False):
+    """Abre uma execução; dentro de outra execução, reaproveita a externa."""
+    externa = _current.get()
+    if externa is not None:
+        yield externa
+        return
+
+    run = Run(page)
+    token = _current.set(run)
+    profiler = _start_profiler() if profile and PROFILE else None
+    try:
+        yield run
+    finally:
+        if profiler is not None:
+            _stop_profiler(profiler, run)
+        _current.reset(token)
+        run.total = time.perf_counter() - run._inicio
+        log_run(run)
+
+
+def log_run(run):
+    linha = json.dumps(run.as_dict(), ensure_ascii=False, default=str)
+    logger.info(linha)
+    if TIMINGS_LOG:
+        # uma linha por write: linhas de processos diferentes não se misturam
+        with open(TIMINGS_LOG, "a", encoding="utf-8") as f:
+            f.write(linha + "\n")
+
+
+class StackSampler:
+    """Amostra a pilha de uma thread em intervalos fixos.
+
+    Sem dependências e com custo baixo o bastante para uma execução
+    inteira; conta pilhas colapsadas (``mod:func;mod:func``).
+    """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            pilha = []
+            while frame is not None:
+                codigo = frame.f_code
+                pilha.append(f"{Path(codigo.co_filename).stem}:{codigo.co_name}")
+                frame = frame.f_back
+            if pilha:
+                self.stacks[";".join(reversed(pilha))] += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def _start_profiler():
+    if PROFILE == "sample":
+        return StackSampler(threading.get_ident()).start()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def _stop_profiler(profiler, run):
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    nome = f"{run.page}-{run.started_at:%Y%m%d-%H%M%S}".replace(" ", "_")
+    if isinstance(profiler, StackSampler):
+        profiler.stop()
+        run.profile_path = PROFILE_DIR / f"{nome}.folded"
+        run.profile_path.write_text(
+            "".join(f"{pilha} {n}\n" for pilha, n in profiler.stacks.items())
+        )
+        # custo inclusivo por função, em amostras
+        inclusivo = Counter()
+        for pilha, n in profiler.stacks.items():
+            for funcao in set(pilha.split(";")):
+                inclusivo[funcao] += n
+        total = sum(profiler.stacks.values()) or 1
+        run.profile_text = "\n".join(
+            f"{n / total:6.1%}  {funcao}" for funcao, n in inclusivo.most_common(25)
+        )
+        return
+    profiler.disable()
+    run.profile_path = PROFILE_DIR / f"{nome}.prof"
+    profiler.dump_stats(run.profile_path)
+    saida = io.StringIO()
+    pstats.Stats(profiler, stream=saida).sort_stats("cumulative").print_stats(25)
+    run.profile_text = saida.getvalue()
@@ -0,0 +1,194 @@
+"""Leitura dos polígonos de propriedades enviados em KML ou GeoJSON.
+
+O KML é lido em fluxo com ``iterparse``: cada Placemark é convertido assim
+que termina e descartado da árvore, então arquivos grandes do CAR não
+precisam caber inteiros na memória como texto nem como árvore de objetos.
+As coordenadas ficam em arrays numpy; a geometria shapely só é montada
+quando alguém pede por ela (o seletor só precisa de nome e área).
+"""
+
+import json
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from functools import cached_property
+from io import BytesIO
+
+import numpy as np
+from shapely.geometry import MultiPolygon, Polygon, shape
+
+
+class PolygonFileError(ValueError):
+    """Arquivo sem nenhum polígono utilizável."""
+
+
+@dataclass
+class PropertyPolygon:
+    """Polígono de uma propriedade, com anéis em arrays (lon, lat).
+
+    `parts` é uma lista de ``(exterior, [buracos])``; `area` é calculada em
+    graus² pela fórmula do laço e serve só para ordenar as opções.
+    """
+
+    name: str
+    parts: list = field(repr=False)
+    area: float
+
+    @cached_property
+    def geometry(self):
+        polys = [Polygon(ext, holes) for ext, holes in self.parts]
+        return polys[0] if len(polys) == 1 else MultiPolygon(polys)
+
+    @property
+    def folium_coords(self):
+        """Anel externo da maior parte, em (lat, lon) como o folium espera."""
+        ext = max(self.parts, key=lambda p: ring_area(p[0]))[0]
+        return ext[:, ::-1].tolist()
+
+
+def ring_area(ring):
+    x, y = ring[:, 0], ring[:, 1]
+    return 0.5 * abs(float(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))))
+
+
+def parts_area(parts):
+    return sum(
+        ring_area(ext) - sum(ring_area(h) for h in holes) for ext, holes in parts
+    )
+
+
+def local_name(tag):
+    # ignora o namespace: há KMLs 2.1, 2.2 e exportações sem xmlns
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_coordinates(text):
+    """Converte ``"lon,lat[,alt] lon,lat[,alt] ..."`` num array (n, 2)."""
+    tuplas = (text or "").split()
+    if not tuplas:
+        return np.empty((0, 2))
+    dims = tuplas[0].count(",") + 1
+    valores = ",".join(tuplas).split(",")
+    if len(valores) == dims * len(tuplas):
+        return np.array(valores, dtype="float64").reshape(-1, dims)[:, :2]
+    # tuplas com e sem altitude misturadas
+    return np.array([t.split(",")[:2] for t in tuplas], dtype="float64")
+
+
+def ring_coordinates(elem):
+    for child in elem.iter():
+        if local_name(child.tag) == "coordinates":
+            return parse_coordinates(child.text)
+    return np.empty((0, 2))
+
+
+def is_closed(ring):
+    return len(ring) >= 4 and np.array_equal(ring[0], ring[-1])
+
+
+def geometry_parts(elem):
+    """Gera ``(exterior, [buracos])`` para cada polígono dentro de `elem`."""
+    tag = local_name(elem.tag)
+    if tag == "Polygon":
+        exterior, holes = None, []
+        for child in elem:
+            nome = local_name(child.tag)
+            if nome == "outerBoundaryIs":
+                exterior = ring_coordinates(child)
+            elif nome == "innerBoundaryIs":
+                holes.append(ring_coordinates(child))
+        if exterior is not None and len(exterior) >= 3:
+            yield exterior, [h for h in holes if len(h) >= 3]
+    elif tag in ("LinearRing", "LineString"):
+        ring = ring_coordinates(elem)
+        if is_closed(ring):
+            yield ring, []
+    elif tag == "MultiGeometry":
+        for child in elem:
+            yield from geometry_parts(child)
+
+
+# elementos que só agrupam outros: o que termina dentro deles já foi lido
+CONTAINERS = {"kml", "Document", "Folder"}
+
+
+def iter_kml_polygons(source):
+    """Percorre o KML em fluxo, gerando um `PropertyPolygon` por Placemark."""
+    if isinstance(source, (bytes, bytearray)):
+        source = BytesIO(source)
+    pais = []
+    for evento, elem in ET.iterparse(source, events=("start", "end")):
+        if evento == "start":
+            pais.append(elem)
+            continue
+        pais.pop()
+        if local_name(elem.tag) == "Placemark":
+            name = None
+            parts = []
+            for child in elem:
+                tag = local_name(child.tag)
+                if tag == "name":
+                    name = (child.text or "").strip() or None
+                else:
+                    parts.extend(geometry_parts(child))
+            if parts:
+                yield PropertyPolygon(name or "<sem nome>", parts, parts_area(parts))
+            elem.clear()
+        # clear() esvazia o elemento, mas ele continua pendurado no
+        # Document/Folder: sem tirá-lo de lá a árvore cresce com o arquivo
+        if pais and local_name(pais[-1].tag) in CONTAINERS:
+            pais[-1].remove(elem)
+
+
+def read_kml_polygons(source):
+    """Lista os polígonos do KML (bytes ou arquivo), do maior para o menor."""
+    try:
+        items = list(iter_kml_polygons(source))
+    except ET.ParseError as e:
+        raise PolygonFileError(f"KML inválido: {e}") from e
+    if not items:
+        raise PolygonFileError("Nenhum polígono (anel fechado) encontrado neste KML.")
+    items.sort(key=lambda it: it.area, reverse=True)
+    return items
+
+
+def read_geojson_polygons(source):
+    """Mesmo formato de `read_kml_polygons` para um GeoJSON de propriedades.
+
+    O nome vem da propriedade ``nome``, ``name`` ou ``cod_imovel`` (campo do
+    CAR), nessa ordem.
+    """
+    data = json.loads(source) if isinstance(source, (bytes, str)) else json.load(source)
+    features = data["features"] if data.get("type") == "FeatureCollection" else [data]
+
+    items = []
+    for i, feature in enumerate(features):
+        geometry = feature.get("geometry")
+        if not geometry or geometry["type"] not in ("Polygon", "MultiPolygon"):
+            continue
+        geom = shape(geometry)
+        parts = [
+            (
+                np.asarray(p.exterior.coords)[:, :2],
+                [np.asarray(h.coords)[:, :2] for h in p.interiors],
+            )
+            for p in getattr(geom, "geoms", [geom])
+        ]
+        props = feature.get("properties") or {}
+        nome = next(
+            (str(props[k]) for k in ("nome", "name", "cod_imovel") if props.get(k)),
+            f"Propriedade {i + 1}",
+        )
+        items.append(PropertyPolygon(nome, parts, parts_area(parts)))
+
+    if not items:
+        raise PolygonFileError("Nenhum polígono encontrado neste GeoJSON.")
+
+    items.sort(key=lambda it: it.area, reverse=True)
+    return items
+
+
+def read_polygon_file(filename, source):
+    """Escolhe o leitor pela extensão do arquivo enviado."""
+    if filename.lower().endswith(".kml"):
+        return read_kml_polygons(source)
+    return read_geojson_polygons(source)
@@ -0,0 +1,369 @@
+"""Montagem das camadas de focos de incêndio nos mapas folium/leafmap."""
+
+import json
+import math
+import time
+from dataclasses import dataclass
+
+import folium
+import numpy as np
+import shapely
+from folium.elements import MacroElement
+from folium.template import Template
+
+from .geo import KM_POR_GRAU_MIN
+
+POPUP_FIELDS = {"data_hora_gmt": "Data", "risco_fogo": "Risco"}
+
+# zooms a partir dos quais cada nível do contorno passa a ser exibido
+SIMPLIFY_ZOOMS = (6, 9, 12, 15, 18)
+
+
+def expand_bounds(bounds, margin_km):
+    """Retângulo ``(minx, miny, maxx, maxy)`` expandido em `margin_km`."""
+    minx, miny, maxx, maxy = bounds
+    dlat = margin_km / KM_POR_GRAU_MIN
+    lat_ref = min(max(abs(miny - dlat), abs(maxy + dlat)), 89.0)
+    dlon = margin_km / (KM_POR_GRAU_MIN * math.cos(math.radians(lat_ref)))
+    return minx - dlon, miny - dlat, maxx + dlon, maxy + dlat
+
+
+def filter_near_polygon(df, poly, margin_km):
+    """Mantém só os focos dentro do retângulo de `poly` expandido em `margin_km`."""
+    minx, miny, maxx, maxy = expand_bounds(poly.bounds, margin_km)
+    lon = df["lon"].to_numpy()
+    lat = df["lat"].to_numpy()
+    mask = (lon >= minx) & (lon <= maxx) & (lat >= miny) & (lat <= maxy)
+    return df[mask]
+
+
+def hotspots_geojson(df, fields=tuple(POPUP_FIELDS)):
+    """Converte os focos numa FeatureCollection de pontos.
+
+    As coordenadas são arredondadas em 5 casas (~1 m), o que basta para o
+    mapa e encurta bastante o JSON embutido no HTML.
+    """
+    coords = np.column_stack(
+        [df["lon"].to_numpy(dtype="float64"), df["lat"].to_numpy(dtype="float64")]
+    ).round(5)
+    props = df[list(fields)].astype(str).where(df[list(fields)].notna(), None)
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": c},
+            "properties": p,
+        }
+        for c, p in zip(coords.tolist(), props.to_dict("records"))
+    ]
+    return {"type": "FeatureCollection", "features": features}
+
+
+def map_html_bytes(m):
+    """Tamanho em bytes do HTML completo que será enviado ao navegador."""
+    return len(m.get_root().render().encode("utf-8"))
+
+
+def add_hotspot_layer(m, df, mode="geojson"):
+    """Adiciona os focos de `df` ao mapa `m` e retorna estatísticas da montagem.
+
+    `mode="geojson"` emite todos os pontos numa única camada GeoJson cujos
+    popups são montados no navegador a partir das propriedades; `"markers"`
+    mantém o comportamento antigo de um CircleMarker por linha.
+    """
+    inicio = time.perf_counter()
+    style = dict(radius=1, color="red", fill=True, fill_color="red", fill_opacity=0.3)
+
+    if mode == "markers":
+        payload = None  # espalhado em um objeto JS por marcador
+        for _, row in df.iterrows():
+            folium.CircleMarker(
+                location=[row["lat"], row["lon"]],
+                popup=f"Data: {row['data_hora_gmt']}\nRisco: {row['risco_fogo']}",
+                **style,
+            ).add_to(m)
+    else:
+        geojson = hotspots_geojson(df)
+        payload = len(json.dumps(geojson))
+        folium.GeoJson(
+            geojson,
+            name="Focos de incêndio",
+            marker=folium.CircleMarker(**style),
+            popup=folium.GeoJsonPopup(
+                fields=list(POPUP_FIELDS), aliases=list(POPUP_FIELDS.values())
+            ),
+        ).add_to(m)
+
+    return {
+        "pontos": len(df),
+        "bytes": payload,
+        "segundos": time.perf_counter() - inicio,
+    }
+
+
+def pixel_degrees(zoom):
+    """Largura de um pixel, em graus de longitude, no `zoom` (tiles de 256 px)."""
+    return 360 / (256 * 2**zoom)
+
+
+def _round_coords(geom, decimals=6):
+    # 6 casas (~0,1 m) ficam abaixo da tolerância do nível mais fino
+    return shapely.transform(geom, lambda xy: xy.round(decimals))
+
+
+@dataclass
+class PolygonLevel:
+    """Contorno simplificado para exibição a partir de `zoom`."""
+
+    zoom: int
+    geojson: str
+    vertices: int
+
+
+def simplification_levels(geom, zooms=SIMPLIFY_ZOOMS):
+    """Versões de `geom` para exibir em cada faixa de zoom.
+
+    Cada nível é simplificado com tolerância de um pixel do seu zoom e
+    ``preserve_topology``, então nenhum anel se cruza nem some um buraco.
+    Os níveis saem em cascata, do mais fino para o mais grosso, cada um
+    simplificando o anterior. Um nível que não reduz os vértices pelo menos
+    à metade do seguinte não compensa a camada extra: o seguinte passa a
+    valer também para o zoom dele. Retorna ``(vertices_originais,
+    bytes_originais, níveis)``; o GeoJSON de cada nível já sai pronto para
+    o mapa.
+    """
+    originais = int(shapely.get_num_coordinates(geom))
+    bytes_originais = len(shapely.to_geojson(geom))
+    niveis = []
+    simples = geom
+    for zoom in sorted(zooms, reverse=True):
+        simples = shapely.simplify(simples, pixel_degrees(zoom), preserve_topology=True)
+        vertices = int(shapely.get_num_coordinates(simples))
+        if niveis and vertices > niveis[-1].vertices / 2:
+            niveis[-1].zoom = zoom
+            continue
+        niveis.append(
+            PolygonLevel(zoom, shapely.to_geojson(_round_coords(simples)), vertices)
+        )
+    return originais, bytes_originais, niveis[::-1]
+
+
+class ZoomSwitch(MacroElement):
+    """Mostra só uma das camadas de `levels` (pares ``(zoom, camada)``): a do
+    maior zoom já alcançado pelo mapa, trocando a cada ``zoomend``."""
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function () {
+            var map = {{ this._parent.get_name() }};
+            var niveis = [
+                {% for zoom, layer in this.levels %}
+                [{{ zoom }}, {{ layer.get_name() }}],
+                {% endfor %}
+            ];
+            function atualiza() {
+                var z = map.getZoom(), escolhida = niveis[0][1];
+                niveis.forEach(function (n) { if (z >= n[0]) escolhida = n[1]; });
+                niveis.forEach(function (n) {
+                    if (n[1] === escolhida) {
+                        if (!map.hasLayer(n[1])) map.addLayer(n[1]);
+                    } else if (map.hasLayer(n[1])) {
+                        map.removeLayer(n[1]);
+                    }
+                });
+            }
+            map.on("zoomend", atualiza);
+            atualiza();
+        })();
+        {% endmacro %}
+        """)
+
+    def __init__(self, levels):
+        super().__init__()
+        self._name = "ZoomSwitch"
+        self.levels = levels
+
+
+def add_polygon_layers(m, levels, **style):
+    """Adiciona os níveis de `simplification_levels` ao mapa `m`, um por vez
+    visível conforme o zoom, e retorna os bytes e vértices enviados."""
+    camadas = []
+    for nivel in levels:
+        camada = folium.GeoJson(
+            nivel.geojson, style_function=lambda _: style, control=False
+        )
+        camada.add_to(m)
+        camadas.append((nivel.zoom, camada))
+    ZoomSwitch(camadas).add_to(m)
+    return {
+        "bytes": sum(len(n.geojson) for n in levels),
+        "vertices": [n.vertices for n in levels],
+    }
+
+
+# gradiente padrão do Leaflet.heat (o mesmo de add_heatmap)
+HEAT_GRADIENT = {0.4: "blue", 0.6: "cyan", 0.7: "lime", 0.8: "yellow", 1.0: "red"}
+
+
+class HotspotTiles(MacroElement):
+    """Camada do Leaflet que desenha num canvas os tiles de focos servidos
+    por `queimadas.tiles`: mapa de calor (``"calor"``) ou pontos
+    (``"pontos"``, com popups dos campos quando o tile traz os pontos)."""
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        var {{ this.get_name() }} = (function () {
+            var map = {{ this._parent.get_name() }};
+            var opcoes = {{ this.options|tojson }};
+            var r = opcoes.raio + opcoes.borrao;
+
+            // paleta: alfa acumulado (0-255) -> cor, como no simpleheat
+            var paleta = (function () {
+                var c = document.createElement("canvas");
+                c.width = 1;
+                c.height = 256;
+                var ctx = c.getContext("2d"), g = ctx.createLinearGradient(0, 0, 0, 256);
+                Object.keys(opcoes.gradiente).forEach(function (k) {
+                    g.addColorStop(+k, opcoes.gradiente[k]);
+                });
+                ctx.fillStyle = g;
+                ctx.fillRect(0, 0, 1, 256);
+                return ctx.getImageData(0, 0, 1, 256).data;
+            })();
+
+            // carimbo borrado de um foco, desenhado uma vez
+            var carimbo = (function () {
+                var c = document.createElement("canvas");
+                c.width = c.height = 2 * r;
+                var ctx = c.getContext("2d");
+                ctx.shadowOffsetX = ctx.shadowOffsetY = 2 * r;
+                ctx.shadowBlur = opcoes.borrao;
+                ctx.shadowColor = "black";
+                ctx.beginPath();
+                ctx.arc(-r, -r, opcoes.raio, 0, 2 * Math.PI);
+                ctx.fill();
+                return c;
+            })();
+
+            function calor(canvas, dados) {
+                var ctx = canvas.getContext("2d"), vmax = dados.vmax || 1;
+                for (var k = 0; k < dados.x.length; k++) {
+                    ctx.globalAlpha = Math.min(Math.max(dados.v[k] / vmax, opcoes.minimo), 1);
+                    ctx.drawImage(carimbo, dados.x[k] - r, dados.y[k] - r);
+                }
+                var img = ctx.getImageData(0, 0, canvas.width, canvas.height);
+                var px = img.data;
+                for (var i = 3; i < px.length; i += 4) {
+                    var j = px[i] * 4;
+                    if (j) {
+                        px[i - 3] = paleta[j];
+                        px[i - 2] = paleta[j + 1];
+                        px[i - 1] = paleta[j + 2];
+                    }
+                }
+                ctx.putImageData(img, 0, 0);
+            }
+
+            function pontos(canvas, dados) {
+                var ctx = canvas.getContext("2d");
+                ctx.fillStyle = opcoes.cor;
+                ctx.globalAlpha = 0.6;
+                for (var k = 0; k < dados.x.length; k++) {
+                    // células da grade crescem com a quantidade de focos
+                    var raio = dados.n ? Math.min(opcoes.raio + Math.sqrt(dados.n[k]), 12) : opcoes.raio;
+                    ctx.beginPath();
+                    ctx.arc(dados.x[k], dados.y[k], raio, 0, 2 * Math.PI);
+                    ctx.fill();
+                }
+            }
+
+            var Camada = L.GridLayer.extend({
+                createTile: function (coords, done) {
+                    var tile = L.DomUtil.create("canvas", "leaflet-tile");
+                    var tamanho = this.getTileSize(), carregados = this._dados;
+                    var chave = this._tileCoordsToKey(coords);
+                    tile.width = tamanho.x;
+                    tile.height = tamanho.y;
+                    fetch(L.Util.template(opcoes.url, coords) + "?b=" + opcoes.margem)
+                        .then(function (resposta) {
+                            if (!resposta.ok) throw new Error(resposta.status);
+                            return resposta.json();
+                        })
+                        .then(function (dados) {
+                            carregados[chave] = {coords: coords, dados: dados};
+                            (opcoes.modo === "calor" ? calor : pontos)(tile, dados);
+                            done(null, tile);
+                        })
+                        .catch(function (erro) { done(erro, tile); });
+                    return tile;
+                }
+            });
+            var camada = new Camada({pane: "overlayPane", attribution: "INPE"});
+            camada._dados = {};
+            camada.on("tileunload", function (e) {
+                delete camada._dados[camada._tileCoordsToKey(e.coords)];
+            });
+            camada.addTo(map);
+
+            function escapa(texto) {
+                return String(texto).replace(/[&<>"]/g, function (c) {
+                    return {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"}[c];
+                });
+            }
+
+            // popup do ponto mais próximo do clique, entre os tiles carregados
+            if (opcoes.campos.length) {
+                map.on("click", function (e) {
+                    var z = camada._tileZoom, p = map.project(e.latlng, z);
+                    var melhor = null, limite = Math.pow(opcoes.raio + 4, 2);
+                    Object.keys(camada._dados).forEach(function (k) {
+                        var item = camada._dados[k], c = item.coords;
+                        if (c.z !== z || !item.dados.p) return;
+                        var ox = c.x * 256, oy = c.y * 256;
+                        var d = item.dados;
+                        for (var i = 0; i < d.x.length; i++) {
+                            var dist = Math.pow(ox + d.x[i] - p.x, 2) + Math.pow(oy + d.y[i] - p.y, 2);
+                            if (dist <= limite) {
+                                limite = dist;
+                                melhor = [ox + d.x[i], oy + d.y[i], d.p[i]];
+                            }
+                        }
+                    });
+                    if (!melhor) return;
+                    var html = opcoes.campos.map(function (rotulo, i) {
+                        return "<b>" + escapa(rotulo) + "</b>: " + escapa(melhor[2][i]);
+                    }).join("<br>");
+                    L.popup()
+                        .setLatLng(map.unproject([melhor[0], melhor[1]], z))
+                        .setContent(html)
+                        .openOn(map);
+                });
+            }
+            return camada;
+        })();
+        {% endmacro %}
+        """)
+
+    def __init__(self, url, mode="calor", radius=10, blur=15, fields=(), color="red"):
+        super().__init__()
+        self._name = "HotspotTiles"
+        margem = radius + blur if mode == "calor" else radius + 12
+        self.options = {
+            "url": url,
+            "modo": mode,
+            "raio": radius,
+            "borrao": blur if mode == "calor" else 0,
+            "margem": margem,
+            "minimo": 0.05,
+            "gradiente": {str(k): v for k, v in HEAT_GRADIENT.items()},
+            "cor": color,
+            "campos": list(fields),
+        }
+
+
+def add_hotspot_tiles(m, url, mode="calor", radius=10, fields=None):
+    """Adiciona ao mapa `m` a camada de tiles de focos em `url` (modelo
+    devolvido por `queimadas.tiles.serve_layer`). `fields` mapeia as
+    colunas dos popups para os rótulos, na ordem registrada na camada."""
+    camada = HotspotTiles(url, mode, radius, fields=list((fields or {}).values()))
+    camada.add_to(m)
+    return camada
@@ -0,0 +1,329 @@
+"""Cubo pré-agregado de focos por dia, município, bioma e satélite.
+
+Séries temporais de meses ou anos não cabem em reagrupar milhões de focos
+brutos a cada rerun. O cubo guarda, para cada dia × município × estado ×
+bioma × satélite, a contagem de focos e, para cada medida de `MEASURES`,
+a soma, o máximo e quantos focos tinham valor (para a média). São
+algumas dezenas de vezes menos linhas que os focos, e qualquer série
+por semana, mês, município ou bioma sai dele com um ``groupby`` pequeno.
+
+O cubo fica em ``INPE_ROLLUP_DIR``, um Parquet por mês, e é mantido de
+forma incremental: ``_estado.json`` guarda, por dia, a versão dos dados
+de onde ele saiu (o mês no arquivo histórico ou a versão do arquivo
+diário no cache). `update_days` só reagrega os dias cuja versão mudou e
+reescreve apenas os meses deles; dias passados vindos dos arquivos
+diários não mudam mais e nem são conferidos. A pré-carga atualiza os
+últimos dias e ``python -m queimadas archive`` os meses arquivados.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from itertools import groupby
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from . import archive
+from .schema import concat_frames
+
+ROLLUP_DIR = Path(
+    os.environ.get(
+        "INPE_ROLLUP_DIR",
+        Path(__file__).resolve().parent.parent / ".cache" / "cubo",
+    )
+)
+STATE = "_estado.json"
+# um dia que falhou só é baixado de novo depois de tantos segundos
+RETRY_AFTER = int(os.environ.get("INPE_ROLLUP_RETRY_AFTER", 1800))
+
+KEYS = ["data", "municipio", "estado", "bioma", "satelite"]
+MEASURES = ["frp", "risco_fogo", "numero_dias_sem_chuva"]
+# colunas dos focos brutos lidas para montar o cubo
+RAW_COLUMNS = [*KEYS[1:], *MEASURES]
+FREQUENCIES = {"Dia": "D", "Semana": "W-SUN", "Mês": "MS"}
+
+_lock = threading.Lock()
+
+
+def build_rollup(df):
+    """Agrega focos brutos (com a coluna ``data``) nas chaves do cubo."""
+    if df.empty:
+        return pd.DataFrame(columns=[*KEYS, "focos"])
+    agregacoes = {"focos": ("data", "size")}
+    for m in MEASURES:
+        agregacoes.update(
+            {
+                f"{m}_soma": (m, "sum"),
+                f"{m}_max": (m, "max"),
+                f"{m}_n": (m, "count"),
+            }
+        )
+    cubo = df.groupby(KEYS, observed=True, dropna=False).agg(**agregacoes)
+    cubo = cubo.reset_index()
+    contagens = ["focos", *(f"{m}_n" for m in MEASURES)]
+    cubo[contagens] = cubo[contagens].astype("int32")
+    return cubo
+
+
+def month_path(mes, rollup_dir=ROLLUP_DIR):
+    return Path(rollup_dir) / f"{mes}.parquet"
+
+
+def _read_state(rollup_dir):
+    try:
+        return json.loads((Path(rollup_dir) / STATE).read_text())
+    except (FileNotFoundError, ValueError):
+        return {"dias": {}}
+
+
+def _write_atomic(rollup_dir, name, escrever):
+    path = Path(rollup_dir) / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        escrever(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _write_state(rollup_dir, estado):
+    def escrever(tmp):
+        with open(tmp, "w") as f:
+            json.dump(estado, f, indent=1, sort_keys=True)
+
+    _write_atomic(rollup_dir, STATE, escrever)
+
+
+def _merge_month(rollup_dir, mes, cubo, dias):
+    """Troca, no Parquet de `mes`, as linhas de `dias` pelas de `cubo`."""
+    path = month_path(mes, rollup_dir)
+    partes = []
+    if path.exists():
+        atual = pd.read_parquet(path)
+        partes.append(atual[~atual["data"].isin(pd.to_datetime(dias))])
+    if not cubo.empty:
+        partes.append(cubo)
+    partes = [p for p in partes if not p.empty]
+    if not partes:
+        if path.exists():
+            path.unlink()
+        return
+    novo = concat_frames(partes).sort_values(KEYS, ignore_index=True)
+    _write_atomic(rollup_dir, path.name, lambda tmp: novo.to_parquet(tmp, index=False))
+
+
+def _daily_version(day):
+    from .inpe import cache_path, read_meta
+
+    meta = read_meta(day)
+    if meta:
+        return f"diario:{meta['versao']}"
+    path = cache_path(day)
+    # cache sem .json (gravado por fora do download): vale a data do arquivo
+    return f"diario:{path.stat().st_mtime_ns}" if path.exists() else None
+
+
+def _refresh_recent(dates, estado):
+    """Confere no INPE os dias que ainda recebem focos e já estão no cubo."""
+    from .inpe import FetchError, ensure_fresh
+
+    recentes = date.today() - timedelta(days=1)
+    for d in dates:
+        if d >= recentes and d.isoformat() in estado["dias"]:
+            try:
+                ensure_fresh(d)
+            except FetchError:
+                pass  # sem dados novos; fica o que já está no cubo
+
+
+def _recent_failures(estado, agora=None):
+    """Dias que falharam há menos de `RETRY_AFTER`: ``{dia: erro}``."""
+    agora = time.time() if agora is None else agora
+    return {
+        date.fromisoformat(dia): falha["erro"]
+        for dia, falha in estado.get("falhas", {}).items()
+        if falha["tentar_apos"] > agora
+    }
+
+
+def _pending(dates, estado):
+    """Dias a reagregar: ``{dia: versão}`` (None se ainda não baixado).
+
+    Só lê o cache local; os dias recentes já passaram por `_refresh_recent`.
+    Dias que falharam há pouco ficam de fora até `RETRY_AFTER`.
+    """
+    arquivados = archive.complete_months()
+    recentes = date.today() - timedelta(days=1)
+    falhados = _recent_failures(estado)
+    pendentes = {}
+    for d in dates:
+        if d in falhados:
+            continue
+        atual = estado["dias"].get(d.isoformat())
+        mes = f"{d:%Y-%m}"
+        if mes in arquivados:
+            versao = f"arquivo:{arquivados[mes]}"
+        elif d < recentes and atual and atual.startswith("diario:"):
+            continue  # dia fechado: o arquivo diário não muda mais
+        elif d >= recentes and atual:
+            versao = _daily_version(d)
+        else:
+            versao = None
+        if versao is None or versao != atual:
+            pendentes[d] = versao
+    return pendentes
+
+
+def pending_days(dates, rollup_dir=ROLLUP_DIR):
+    """Dias de `dates` que ainda não estão no cubo, sem ir à rede (os que
+    falharam há pouco não contam: não serão baixados agora)."""
+    estado = _read_state(rollup_dir)
+    falhados = _recent_failures(estado)
+    return [
+        d
+        for d in sorted(set(dates))
+        if d.isoformat() not in estado["dias"] and d not in falhados
+    ]
+
+
+def _raw_month(dias, pendentes):
+    """Focos brutos de `dias` (de um mesmo mês); devolve ``(df, falhas)``."""
+    from .inpe import fetch_days
+
+    partes = []
+    falhas = {}
+    arquivados = [d for d in dias if (pendentes[d] or "").startswith("arquivo:")]
+    diarios = [d for d in dias if d not in arquivados]
+    if arquivados:
+        df = archive.query(min(arquivados), max(arquivados), columns=RAW_COLUMNS)
+        if not df.empty:
+            partes.append(df[df["data"].isin(pd.to_datetime(arquivados))])
+    if diarios:
+        df, falhas = fetch_days(diarios, RAW_COLUMNS)
+        if not df.empty:
+            partes.append(df)
+    partes = [p for p in partes if not p.empty]
+    return (concat_frames(partes) if partes else pd.DataFrame()), falhas
+
+
+def update_days(dates, rollup_dir=ROLLUP_DIR, progress=None):
+    """Leva para o cubo os dias de `dates` que mudaram; devolve as falhas.
+
+    Os dias são processados mês a mês, e o estado é gravado ao fim de cada
+    mês: uma atualização interrompida recomeça de onde parou. Dias que
+    falharam ficam no estado e voltam em `falhas`, sem nova tentativa, por
+    `RETRY_AFTER` segundos. Os downloads correm fora da trava, que só
+    protege a fusão dos meses e o estado; outra sessão não espera por eles.
+    `progress`, se dado, é chamado ao fim de
+    cada mês com ``(dias feitos, dias pendentes)``.
+    """
+    rollup_dir = Path(rollup_dir)
+    dates = sorted(set(dates))
+    _refresh_recent(dates, _read_state(rollup_dir))
+    with _lock:
+        estado = _read_state(rollup_dir)
+        pendentes = _pending(dates, estado)
+        # falhas recentes voltam sem nova tentativa
+        falhas = {d: erro for d, erro in _recent_failures(estado).items() if d in dates}
+    feitos_total = 0
+    for mes, dias in groupby(pendentes, key=lambda d: f"{d:%Y-%m}"):
+        dias = list(dias)
+        bruto, falhas_mes = _raw_month(dias, pendentes)
+        falhas.update(falhas_mes)
+        feitos = [d for d in dias if d not in falhas_mes]
+        cubo = build_rollup(bruto) if feitos else None
+        with _lock:
+            estado = _read_state(rollup_dir)
+            if feitos:
+                _merge_month(rollup_dir, mes, cubo, feitos)
+            for d in feitos:
+                # dias recém-baixados: a versão só existe depois do download
+                estado["dias"][d.isoformat()] = pendentes[d] or _daily_version(d)
+                estado.get("falhas", {}).pop(d.isoformat(), None)
+            tentar_apos = time.time() + RETRY_AFTER
+            for d, erro in falhas_mes.items():
+                estado.setdefault("falhas", {})[d.isoformat()] = {
+                    "erro": str(erro),
+                    "tentar_apos": tentar_apos,
+                }
+            _write_state(rollup_dir, estado)
+        feitos_total += len(dias)
+        if progress:
+            progress(feitos_total, len(pendentes))
+    return falhas
+
+
+def _months_schema(arquivos):
+    """Esquema comum dos Parquet mensais.
+
+    O pandas grava os códigos das categorias com a menor largura que cabe
+    (int8 num mês com poucos municípios, int16 num mês movimentado), e o
+    dataset não junta larguras diferentes: os dicionários passam a int32.
+    """
+    esquema = ds.dataset(arquivos[0], format="parquet").schema
+    return pa.schema(
+        [
+            (
+                f.with_type(pa.dictionary(pa.int32(), f.type.value_type))
+                if pa.types.is_dictionary(f.type)
+                else f
+            )
+            for f in esquema
+        ],
+        metadata=esquema.metadata,
+    )
+
+
+def load_rollup(dates, biomas=None, rollup_dir=ROLLUP_DIR):
+    """Cubo dos dias de `dates`, atualizado antes; devolve ``(cubo, falhas)``.
+
+    `biomas` filtra na leitura dos Parquet mensais.
+    """
+    dates = sorted(set(dates))
+    falhas = update_days(dates, rollup_dir)
+    meses = sorted({f"{d:%Y-%m}" for d in dates})
+    arquivos = [
+        str(p) for p in (month_path(m, rollup_dir) for m in meses) if p.exists()
+    ]
+    if not arquivos:
+        return pd.DataFrame(), falhas
+    filtro = ds.field("data").isin(pd.to_datetime(dates).to_list())
+    if biomas:
+        filtro &= ds.field("bioma").isin(list(biomas))
+    dataset = ds.dataset(arquivos, format="parquet", schema=_months_schema(arquivos))
+    cubo = dataset.to_table(filter=filtro).to_pandas()
+    return cubo, falhas
+
+
+def time_series(cubo, by, freq="D", metric="frp", stat="soma", top=None):
+    """Focos e `metric` por período e por `by`, a partir do cubo.
+
+    `freq` é uma frequência do pandas (veja `FREQUENCIES`) e `stat` uma de
+    ``"soma"``, ``"media"`` ou ``"maximo"``. Com `top`, fica só com os
+    `top` valores de `by` com mais focos no período inteiro. Retorna as
+    colunas ``data``, `by`, ``focos`` e ``valor``.
+    """
+    if top is not None:
+        maiores = cubo.groupby(by, observed=True)["focos"].sum().nlargest(top)
+        cubo = cubo[cubo[by].isin(maiores.index)]
+    serie = cubo.groupby([pd.Grouper(key="data", freq=freq), by], observed=True).agg(
+        focos=("focos", "sum"),
+        soma=(f"{metric}_soma", "sum"),
+        maximo=(f"{metric}_max", "max"),
+        n=(f"{metric}_n", "sum"),
+    )
+    if stat == "media":
+        serie["valor"] = serie["soma"] / serie["n"].replace(0, np.nan)
+    else:
+        serie["valor"] = serie[stat]
+    return serie[["focos", "valor"]].reset_index()
@@ -0,0 +1,159 @@
+"""Pré-carga dos dias mais consultados em segundo plano.
+
+Uma thread por processo do servidor baixa e deixa prontos no armazenamento
+compartilhado o dia corrente e os ``INPE_PREFETCH_DAYS`` dias anteriores
+(entre eles ontem, a data padrão das páginas), e volta a cada
+``INPE_REFRESH_INTERVAL`` segundos para atualizar o dia corrente. Assim o
+primeiro acesso do dia encontra o cache quente. Cada rodada também leva
+esses dias para o cubo das séries temporais (`queimadas.rollup`).
+``INPE_PREFETCH=0`` desliga a pré-carga.
+
+O módulo só importa `queimadas.inpe` (pandas, pyarrow, requests) dentro da
+thread, para que a página inicial não espere por essas importações.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get("INPE_PREFETCH", "1") != "0"
+PREFETCH_DAYS = int(os.environ.get("INPE_PREFETCH_DAYS", 7))
+# sem valor, usa o TTL do dia corrente (INPE_TODAY_TTL)
+REFRESH_INTERVAL = os.environ.get("INPE_REFRESH_INTERVAL")
+
+
+@dataclass(frozen=True)
+class PrefetchStatus:
+    """Estado da última rodada; `falhas` mapeia cada dia ao erro."""
+
+    execucoes: int = 0
+    em_andamento: bool = False
+    ultima_execucao: datetime | None = None
+    duracao: float | None = None
+    dias: int = 0
+    falhas: dict = field(default_factory=dict)
+
+
+def warm_day(day):
+    """Garante `day` atualizado em disco e aberto no armazenamento."""
+    from .inpe import cache_path, ensure_fresh
+    from .store import get_store
+
+    ensure_fresh(day)
+    get_store().table(cache_path(day))
+
+
+class PrefetchScheduler:
+    def __init__(self, days=PREFETCH_DAYS, interval=REFRESH_INTERVAL):
+        self.days = days
+        self.interval = int(interval) if interval else None
+        self._status = PrefetchStatus()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def status(self):
+        with self._lock:
+            return self._status
+
+    def _update(self, **campos):
+        with self._lock:
+            self._status = replace(self._status, **campos)
+
+    def run_once(self):
+        """Aquece hoje e os últimos `days` dias; devolve as falhas por dia."""
+        from .inpe import MAX_WORKERS, FetchError
+        from .rollup import update_days
+
+        hoje = date.today()
+        # ontem primeiro: é a data padrão das páginas
+        dias = [hoje - timedelta(days=1), hoje]
+        dias += [hoje - timedelta(days=i) for i in range(2, self.days + 1)]
+        self._update(em_andamento=True)
+        inicio = time.perf_counter()
+        falhas = {}
+
+        def worker(day):
+            try:
+                warm_day(day)
+            except FetchError as e:
+                falhas[day] = str(e)
+
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(dias))) as pool:
+            list(pool.map(worker, dias))
+        # o cubo das séries temporais acompanha os dias recém-atualizados
+        update_days([d for d in dias if d not in falhas])
+        for day, erro in falhas.items():
+            logger.warning("Pré-carga de %s falhou: %s", day, erro)
+
+        self._update(
+            execucoes=self.status().execucoes + 1,
+            em_andamento=False,
+            ultima_execucao=datetime.now(),
+            duracao=time.perf_counter() - inicio,
+            dias=len(dias) - len(falhas),
+            falhas=falhas,
+        )
+        return falhas
+
+    def _loop(self):
+        from .inpe import TODAY_TTL
+
+        intervalo = self.interval or TODAY_TTL
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                # a thread não pode morrer: a próxima rodada tenta de novo
+                logger.exception("Pré-carga interrompida")
+                self._update(em_andamento=False)
+            self._stop.wait(intervalo)
+
+    def start(self):
+        if self._thread is None:
+            self._update(em_andamento=True)
+            self._thread = threading.Thread(
+                target=self._loop, name="inpe-prefetch", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+def format_status(status):
+    """Resumo de uma linha do estado da pré-carga, para a barra lateral."""
+    if status.ultima_execucao is None:
+        if not status.em_andamento:
+            return "Pré-carga desligada (INPE_PREFETCH=0)"
+        return "Pré-carga dos últimos dias em andamento..."
+    texto = (
+        f"Pré-carga: {status.dias} dias prontos às "
+        f"{status.ultima_execucao:%H:%M} ({status.duracao:.1f} s)"
+    )
+    if status.falhas:
+        dias = ", ".join(f"{d:%d/%m}" for d in sorted(status.falhas))
+        texto += f" · indisponíveis: {dias}"
+    return texto
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def start_scheduler():
+    """Inicia a pré-carga uma única vez por processo; devolve o agendador."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PrefetchScheduler()
+            if ENABLED:
+                _scheduler.start()
+        return _scheduler
@@ -0,0 +1,149 @@
+"""Esquema dos CSVs de focos do INPE e leitura tipada a partir dos bytes."""
+
+import os
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+CSV_ENGINE = os.environ.get("INPE_CSV_ENGINE", "pyarrow")
+
+# colunas conhecidas dos arquivos focos_diario_br_*.csv
+INPE_DTYPES = {
+    "id": "string",
+    "lat": "float32",
+    "lon": "float32",
+    "satelite": "category",
+    "municipio": "category",
+    "estado": "category",
+    "pais": "category",
+    "municipio_id": "Int32",
+    "estado_id": "Int16",
+    "pais_id": "Int16",
+    "numero_dias_sem_chuva": "float32",
+    "precipitacao": "float32",
+    "risco_fogo": "float32",
+    "bioma": "category",
+    "frp": "float32",
+}
+DATE_COLUMNS = ["data_hora_gmt"]
+
+# identifica um foco quando o arquivo não traz a coluna ``id``
+HOTSPOT_KEY = ["lat", "lon", "data_hora_gmt", "satelite"]
+
+ESTADO_SIGLAS = {
+    "ACRE": "AC", "ALAGOAS": "AL", "AMAPÁ": "AP", "AMAZONAS": "AM", "BAHIA": "BA",
+    "CEARÁ": "CE", "DISTRITO FEDERAL": "DF", "ESPÍRITO SANTO": "ES", "GOIÁS": "GO",
+    "MARANHÃO": "MA", "MATO GROSSO": "MT", "MATO GROSSO DO SUL": "MS", "MINAS GERAIS": "MG",
+    "PARÁ": "PA", "PARAÍBA": "PB", "PARANÁ": "PR", "PERNAMBUCO": "PE", "PIAUÍ": "PI",
+    "RIO DE JANEIRO": "RJ", "RIO GRANDE DO NORTE": "RN", "RIO GRANDE DO SUL": "RS",
+    "RONDÔNIA": "RO", "RORAIMA": "RR", "SANTA CATARINA": "SC", "SÃO PAULO": "SP",
+    "SERGIPE": "SE", "TOCANTINS": "TO",
+}  # fmt: skip
+
+
+def parse_inpe_csv(raw, columns=None, engine=None):
+    """Lê o CSV do INPE direto dos bytes da resposta, com tipos explícitos.
+
+    `columns` restringe a leitura às colunas informadas; `engine` pode ser
+    ``"pyarrow"`` (padrão, ``INPE_CSV_ENGINE``) ou ``"c"``. Colunas fora do
+    esquema conhecido ficam com o tipo inferido pelo pandas.
+    """
+    engine = engine or CSV_ENGINE
+    usecols = None
+    if columns is not None:
+        usecols = lambda c: c in columns  # noqa: E731
+        if engine == "pyarrow":
+            # o engine pyarrow não aceita callables em usecols
+            header = bytes(raw[: raw.find(b"\n")]).decode("utf-8").strip()
+            usecols = [c for c in header.split(",") if c in columns]
+    df = pd.read_csv(
+        BytesIO(raw),
+        usecols=usecols,
+        dtype=INPE_DTYPES,
+        engine=engine,
+    )
+    return coerce_schema(df)
+
+
+def coerce_schema(df):
+    """Garante os tipos do esquema, inclusive em frames lidos de caches antigos."""
+    tipos = {c: t for c, t in INPE_DTYPES.items() if c in df and str(df[c].dtype) != t}
+    if tipos:
+        df = df.astype(tipos)
+    for c in DATE_COLUMNS:
+        if c in df and not pd.api.types.is_datetime64_any_dtype(df[c]):
+            df[c] = pd.to_datetime(df[c], format="%Y-%m-%d %H:%M:%S", errors="coerce")
+    return df
+
+
+def concat_frames(frames):
+    """Concatena frames de dias diferentes mantendo as colunas categóricas.
+
+    O pandas cai para ``object`` quando as categorias de cada parte diferem;
+    aqui as categorias são unificadas antes, e a concatenação é feita uma
+    única vez.
+    """
+    frames = list(frames)
+    if len(frames) == 1:
+        return frames[0]  # nada a juntar: evita copiar o dia inteiro
+    for c in frames[0].columns:
+        if isinstance(frames[0][c].dtype, pd.CategoricalDtype) and all(
+            c in f for f in frames
+        ):
+            categorias = union_categoricals(
+                [f[c] for f in frames], ignore_order=True
+            ).categories
+            for f in frames:
+                f[c] = f[c].cat.set_categories(categorias)
+    return pd.concat(frames, ignore_index=True)
+
+
+def hotspot_key(df):
+    colunas = ["id"] if "id" in df else [c for c in HOTSPOT_KEY if c in df]
+    return pd.MultiIndex.from_frame(df[colunas])
+
+
+def drop_duplicate_hotspots(df):
+    return df[~hotspot_key(df).duplicated()]
+
+
+def only_new_rows(existing, incoming):
+    """Linhas de `incoming` que ainda não estão em `existing` (nem repetidas)."""
+    if "data_hora_gmt" in existing and "data_hora_gmt" in incoming:
+        # um foco repetido tem o mesmo horário: basta comparar com a
+        # janela do lote, e não com o dia inteiro
+        hora = incoming["data_hora_gmt"]
+        existing = existing[existing["data_hora_gmt"].between(hora.min(), hora.max())]
+    chave = hotspot_key(incoming)
+    novas = ~chave.isin(hotspot_key(existing)) & ~chave.duplicated()
+    return incoming[novas]
+
+
+def add_uf_columns(df):
+    """Adiciona `estado_sigla` e `municipio_siglaUF` (ex.: "Corumbá-MS").
+
+    O rótulo é montado uma vez por par (município, UF) presente no frame, e
+    não a cada foco: num período longo são milhões de strings a menos.
+    """
+    df["estado_sigla"] = df["estado"].map(ESTADO_SIGLAS)
+    municipio = df["municipio"].astype("category").cat
+    sigla = df["estado_sigla"].astype("category").cat
+    k = len(sigla.categories) + 1
+    chave = (municipio.codes.to_numpy("int64") + 1) * k + (
+        sigla.codes.to_numpy("int64") + 1
+    )
+    pares, inverso = np.unique(chave, return_inverse=True)
+    m, s = pares // k - 1, pares % k - 1
+    validos = (m >= 0) & (s >= 0)
+    rotulos = (
+        municipio.categories[m[validos]].astype("string").str.title()
+        + "-"
+        + sigla.categories[s[validos]].astype("string")
+    ).to_numpy(dtype=object)
+    categorias = np.unique(rotulos)
+    codigos = np.full(len(pares), -1)
+    codigos[validos] = np.searchsorted(categorias, rotulos)
+    df["municipio_siglaUF"] = pd.Categorical.from_codes(codigos[inverso], categorias)
+    return df
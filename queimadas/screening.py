@@ -0,0 +1,90 @@
+"""Cruzamento dos focos do dia com muitas propriedades de uma vez."""
+
+import numpy as np
+import pandas as pd
+import shapely
+
+
+def points_within(polygons, lon, lat):
+    """Pares ``(índice do ponto, índice do polígono)`` de cada ponto dentro de
+    cada polígono, com uma STRtree sobre os polígonos."""
+    # descarta de cara o que está fora da extensão de todas as propriedades
+    minx, miny, maxx, maxy = shapely.total_bounds(polygons)
+    perto = np.flatnonzero(
+        (lon >= minx) & (lon <= maxx) & (lat >= miny) & (lat <= maxy)
+    )
+
+    tree = shapely.STRtree(polygons)
+    idx_ponto, idx_poly = tree.query(
+        shapely.points(lon[perto], lat[perto]), predicate="within"
+    )
+    return perto[idx_ponto], idx_poly
+
+
+def _totals(grupo, frp, n):
+    frp_max = np.full(n, np.nan)
+    np.fmax.at(frp_max, grupo, frp)
+    focos = np.bincount(grupo, minlength=n)
+    frp_total = np.bincount(grupo, weights=np.nan_to_num(frp), minlength=n)
+    return focos, frp_total, frp_max
+
+
+def _coords(df):
+    return (
+        df["lon"].to_numpy(dtype="float64"),
+        df["lat"].to_numpy(dtype="float64"),
+        df["frp"].to_numpy(dtype="float64"),
+    )
+
+
+def screen_properties(names, polygons, df):
+    """Conta focos e soma o FRP por propriedade.
+
+    Monta uma STRtree sobre os polígonos e consulta todos os focos de uma
+    vez, em vez de testar cada polígono contra cada ponto. Retorna um
+    DataFrame com ``nome``, ``focos``, ``frp_total`` e ``frp_max`` para
+    todas as propriedades, ordenado pelo número de focos.
+    """
+    polygons = np.asarray(polygons, dtype=object)
+    lon, lat, frp = _coords(df)
+    pontos, idx_poly = points_within(polygons, lon, lat)
+    focos, frp_total, frp_max = _totals(idx_poly, frp[pontos], len(polygons))
+
+    resultado = pd.DataFrame(
+        {
+            "nome": list(names),
+            "focos": focos,
+            "frp_total": frp_total,
+            "frp_max": frp_max,
+        }
+    )
+    return resultado.sort_values(
+        ["focos", "frp_total"], ascending=False, ignore_index=True
+    )
+
+
+def screen_properties_by_day(names, polygons, df):
+    """Como `screen_properties`, com uma linha por dia e propriedade.
+
+    Usa a coluna ``data`` de `df` (a de `fetch_days`). As linhas saem na
+    ordem dos dias e, dentro de cada dia, na ordem de `polygons`, inclusive
+    as propriedades sem focos.
+    """
+    polygons = np.asarray(polygons, dtype=object)
+    n = len(polygons)
+    codigo, dias = pd.factorize(df["data"], sort=True)
+    lon, lat, frp = _coords(df)
+    pontos, idx_poly = points_within(polygons, lon, lat)
+    # um grupo por (dia, propriedade) numa única passada
+    grupo = codigo[pontos] * n + idx_poly
+    focos, frp_total, frp_max = _totals(grupo, frp[pontos], len(dias) * n)
+
+    return pd.DataFrame(
+        {
+            "data": np.repeat(dias, n),
+            "nome": np.tile(np.asarray(names, dtype=object), len(dias)),
+            "focos": focos,
+            "frp_total": frp_total,
+            "frp_max": frp_max,
+        }
+    )
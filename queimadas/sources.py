@@ -0,0 +1,277 @@
+"""Origens dos arquivos diários de focos.
+
+`queimadas.inpe` pede cada arquivo a uma origem, escolhida por
+``INPE_SOURCE``:
+
+* ``inpe`` (padrão): HTTP, em ``INPE_BASE_URL`` (o servidor do INPE ou o
+  substituto local abaixo);
+* ``mirror``: um diretório com os CSVs no mesmo nome do INPE
+  (``INPE_MIRROR_DIR``), sem rede nenhuma.
+
+As duas respondem do mesmo jeito: `serve_file` reproduz sobre um arquivo
+local o que o INPE faz por HTTP (ETag, Last-Modified, requisições
+condicionais e ``Range``), de modo que a atualização incremental do dia
+corrente funciona igual com o espelho.
+
+O substituto (`make_server`, ``python -m queimadas serve``) serve um
+espelho por HTTP com latência e banda configuráveis, para rodar as páginas
+e testes de carga sem depender do INPE; com ``synthetic``, gera com
+`queimadas.synthetic` os dias que não estiverem gravados. `sync_days`
+(``python -m queimadas sync``) preenche o espelho com um intervalo de
+datas.
+"""
+
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date as date_type
+from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+CHUNK = 64 * 1024
+
+
+def file_name(date):
+    return f"focos_diario_br_{date.strftime('%Y%m%d')}.csv"
+
+
+@dataclass
+class SourceResponse:
+    """Resposta de uma origem local, com os atributos usados de
+    ``requests.Response``."""
+
+    status_code: int
+    content: bytes = b""
+    headers: dict = field(default_factory=dict)
+
+
+def _parse_range(valor, tamanho):
+    """``(início, fim)`` de ``bytes=a-b``/``bytes=a-``, ou None se inválido."""
+    unidade, _, faixa = valor.partition("=")
+    inicio, _, fim = faixa.strip().partition("-")
+    if unidade.strip() != "bytes" or not inicio.isdigit() or "," in faixa:
+        return None
+    fim = int(fim) if fim.isdigit() else tamanho - 1
+    return int(inicio), min(fim, tamanho - 1)
+
+
+def _not_modified(headers, etag, mtime):
+    if headers.get("If-None-Match") is not None:
+        return headers["If-None-Match"] == etag
+    desde = headers.get("If-Modified-Since")
+    if desde is None:
+        return False
+    try:
+        return int(mtime) <= parsedate_to_datetime(desde).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+def serve_file(path, headers=None):
+    """Responde a um GET de `path` como um servidor HTTP responderia.
+
+    Trata ``If-None-Match``/``If-Modified-Since`` (304) e ``Range`` de um
+    único intervalo (206, ou 416 se começar depois do fim). O ETag muda
+    sempre que o arquivo muda de tamanho ou de data.
+    """
+    headers = headers or {}
+    try:
+        info = os.stat(path)
+    except FileNotFoundError:
+        return SourceResponse(404)
+    etag = f'"{info.st_size:x}-{info.st_mtime_ns:x}"'
+    validadores = {
+        "ETag": etag,
+        "Last-Modified": formatdate(info.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+    }
+    if _not_modified(headers, etag, info.st_mtime):
+        return SourceResponse(304, b"", validadores)
+
+    faixa = headers.get("Range")
+    faixa = _parse_range(faixa, info.st_size) if faixa else None
+    with open(path, "rb") as f:
+        if faixa is None:
+            return SourceResponse(200, f.read(), validadores)
+        inicio, fim = faixa
+        if inicio >= info.st_size:
+            validadores["Content-Range"] = f"bytes */{info.st_size}"
+            return SourceResponse(416, b"", validadores)
+        f.seek(inicio)
+        conteudo = f.read(fim - inicio + 1)
+    validadores["Content-Range"] = f"bytes {inicio}-{fim}/{info.st_size}"
+    return SourceResponse(206, conteudo, validadores)
+
+
+class HttpSource:
+    """Arquivos servidos por HTTP (o INPE ou o substituto local)."""
+
+    def __init__(self, base_url, session, timeout=60):
+        self.base_url = base_url.rstrip("/")
+        self.session = session
+        self.timeout = timeout
+
+    def url(self, date):
+        return f"{self.base_url}/{file_name(date)}"
+
+    def get(self, date, headers=None):
+        return self.session.get(self.url(date), headers=headers, timeout=self.timeout)
+
+    def __repr__(self):
+        return f"HttpSource({self.base_url!r})"
+
+
+class MirrorSource:
+    """Arquivos num diretório local, com os nomes do INPE."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def path(self, date):
+        return self.directory / file_name(date)
+
+    def get(self, date, headers=None):
+        return serve_file(self.path(date), headers)
+
+    def __repr__(self):
+        return f"MirrorSource({str(self.directory)!r})"
+
+
+def _write_file(path, content, last_modified=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(content)
+    if last_modified:
+        # mantém a data do INPE: o espelho responde com o mesmo Last-Modified
+        try:
+            instante = parsedate_to_datetime(last_modified).timestamp()
+            os.utime(tmp, (instante, instante))
+        except (TypeError, ValueError):
+            pass
+    os.replace(tmp, path)
+
+
+def sync_days(source, directory, dates, max_workers=4, force=False):
+    """Copia os arquivos de `dates` de `source` para o espelho `directory`.
+
+    Dias passados que já estão no espelho são pulados (salvo com `force`);
+    os demais são pedidos com ``If-Modified-Since`` da cópia local, então
+    um arquivo que não mudou não é baixado de novo. Retorna
+    ``(baixados, pulados, falhas)``, com `falhas` mapeando dia a erro.
+    """
+    espelho = MirrorSource(directory)
+    baixados, pulados, falhas = [], [], {}
+    hoje = date_type.today()
+
+    def worker(day):
+        path = espelho.path(day)
+        headers = {}
+        if path.exists():
+            if day < hoje and not force:
+                pulados.append(day)
+                return
+            headers["If-Modified-Since"] = formatdate(path.stat().st_mtime, usegmt=True)
+        try:
+            response = source.get(day, headers)
+        except OSError as e:  # inclui as exceções do requests
+            falhas[day] = f"erro de conexão: {e}"
+            return
+        if response.status_code == 304:
+            pulados.append(day)
+        elif response.status_code == 200:
+            _write_file(path, response.content, response.headers.get("Last-Modified"))
+            baixados.append(day)
+        else:
+            falhas[day] = f"resposta inesperada ({response.status_code})"
+
+    if dates:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(dates))) as pool:
+            list(pool.map(worker, dates))
+    return sorted(baixados), sorted(pulados), dict(sorted(falhas.items()))
+
+
+def _synthetic_day(path, day, n):
+    from .synthetic import synthetic_csv
+
+    # mesma data, mesmos focos: a semente vem do dia
+    _write_file(path, synthetic_csv(n, day=day, seed=day.toordinal()))
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        config = self.server.config
+        nome = self.path.rsplit("/", 1)[-1].split("?", 1)[0]
+        path = config["directory"] / nome
+        if config["synthetic"] and not path.exists():
+            try:
+                day = datetime.strptime(nome, "focos_diario_br_%Y%m%d.csv").date()
+            except ValueError:
+                day = None
+            if day is not None and day <= date_type.today():
+                with config["lock"]:
+                    if not path.exists():
+                        _synthetic_day(path, day, config["synthetic"])
+
+        latencia = config["latency"]
+        if latencia:
+            time.sleep(latencia * random.uniform(0.5, 1.5))
+        response = serve_file(path, self.headers)
+        self.send_response(response.status_code)
+        for chave, valor in response.headers.items():
+            self.send_header(chave, valor)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(len(response.content)))
+        self.end_headers()
+        self._send_body(response.content, config["bandwidth"])
+
+    def _send_body(self, conteudo, banda):
+        if not banda:
+            self.wfile.write(conteudo)
+            return
+        for inicio in range(0, len(conteudo), CHUNK):
+            pedaco = conteudo[inicio : inicio + CHUNK]
+            self.wfile.write(pedaco)
+            time.sleep(len(pedaco) / banda)
+
+    def log_message(self, format, *args):
+        logger.debug("%s %s", self.address_string(), format % args)
+
+
+def make_server(
+    directory,
+    host="127.0.0.1",
+    port=8765,
+    latency=0.2,
+    bandwidth=None,
+    synthetic=0,
+):
+    """Servidor HTTP que faz as vezes do INPE sobre o espelho `directory`.
+
+    Cada resposta espera `latency` segundos (±50%) e o corpo sai a no
+    máximo `bandwidth` bytes/s. Com `synthetic` > 0, os dias ausentes (até
+    hoje) são gerados com esse número de focos e gravados no espelho.
+    Use ``serve_forever()`` e aponte ``INPE_BASE_URL`` para ``server_url``.
+    """
+    server = ThreadingHTTPServer((host, port), _StandInHandler)
+    server.daemon_threads = True
+    server.config = {
+        "directory": Path(directory),
+        "latency": latency,
+        "bandwidth": bandwidth,
+        "synthetic": synthetic,
+        "lock": threading.Lock(),
+    }
+    server.server_url = f"http://{host}:{server.server_port}"
+    return server
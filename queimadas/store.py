@@ -0,0 +1,255 @@
+"""Armazenamento compartilhado, somente leitura, dos dias já baixados.
+
+Cada dia em cache (Parquet) ganha uma cópia em Arrow IPC sem compressão
+ao lado, que é aberta com ``memory_map``. As colunas das tabelas apontam
+direto para as páginas do arquivo: sessões do mesmo processo recebem a
+mesma tabela, e processos diferentes compartilham as páginas pelo cache
+do sistema operacional em vez de cada um manter sua cópia do dia.
+
+Dentro do processo as tabelas abertas ficam num LRU limitado por
+``INPE_STORE_BUDGET_MB``. No disco, as cópias Arrow de todos os dias
+somam no máximo ``INPE_STORE_DISK_MB``: a mais antiga em uso (data de
+acesso, atualizada a cada abertura) é apagada primeiro, e volta a ser
+gerada do Parquet se o dia for pedido de novo.
+
+Os frames que as páginas montam sobre os dias (filtros, agrupamento de
+detecções) ficam em `FrameCache`, também um LRU por bytes
+(``INPE_FRAMES_BUDGET_MB``), e não no ``st.cache_resource``, que só
+limita o número de entradas.
+"""
+
+import functools
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+BUDGET_BYTES = int(os.environ.get("INPE_STORE_BUDGET_MB", 1024)) * 2**20
+DISK_BYTES = int(os.environ.get("INPE_STORE_DISK_MB", 2048)) * 2**20
+FRAMES_BUDGET_BYTES = int(os.environ.get("INPE_FRAMES_BUDGET_MB", 512)) * 2**20
+
+
+class ArrowDayStore:
+    def __init__(self, budget_bytes=BUDGET_BYTES, disk_bytes=DISK_BYTES):
+        self.budget_bytes = budget_bytes
+        self.disk_bytes = disk_bytes
+        self._tables = OrderedDict()  # caminho arrow -> (mtime do parquet, tabela)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def nbytes(self):
+        return sum(t.nbytes for _, t in self._tables.values())
+
+    def table(self, parquet_path):
+        """Tabela Arrow mapeada em memória para o Parquet em `parquet_path`."""
+        arrow_path = parquet_path.with_suffix(".arrow")
+        versao = parquet_path.stat().st_mtime_ns
+        with self._lock:
+            item = self._tables.get(arrow_path)
+            if item is not None and item[0] == versao:
+                self._tables.move_to_end(arrow_path)
+                self.hits += 1
+                return item[1]
+            self.misses += 1
+
+        if not arrow_path.exists() or arrow_path.stat().st_mtime_ns < versao:
+            # um único lote por coluna: com vários, o to_pandas precisa
+            # concatenar os pedaços e a leitura deixa de ser sem cópia
+            write_arrow(pq.read_table(parquet_path).combine_chunks(), arrow_path)
+            self.prune(arrow_path.parent, manter=arrow_path)
+        else:
+            # a data de acesso marca o uso; a de modificação é a versão
+            os.utime(arrow_path, ns=(time.time_ns(), arrow_path.stat().st_mtime_ns))
+        table = pa.ipc.open_file(pa.memory_map(str(arrow_path))).read_all()
+
+        with self._lock:
+            self._tables[arrow_path] = (versao, table)
+            self._tables.move_to_end(arrow_path)
+            while len(self._tables) > 1 and self.nbytes > self.budget_bytes:
+                self._tables.popitem(last=False)
+        return table
+
+    def prune(self, diretorio, manter=None):
+        """Apaga as cópias Arrow menos usadas de `diretorio` até caberem em
+        `disk_bytes`; devolve quantas saíram.
+
+        Tabelas já mapeadas continuam válidas: o sistema só libera as
+        páginas quando o último mapeamento é fechado.
+        """
+        arquivos = []
+        for path in diretorio.glob("*.arrow"):
+            try:
+                info = path.stat()
+            except FileNotFoundError:
+                continue  # outro processo apagou antes
+            arquivos.append((info.st_atime_ns, info.st_size, path))
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        removidos = 0
+        for _, tamanho, path in sorted(arquivos):
+            if total <= self.disk_bytes:
+                break
+            if path == manter:
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= tamanho
+            removidos += 1
+        return removidos
+
+    def frame(self, parquet_path, columns=None):
+        """DataFrame do dia; colunas numéricas sem nulos não são copiadas."""
+        table = self.table(parquet_path)
+        if columns is not None:
+            table = table.select([c for c in columns if c in table.column_names])
+        # split_blocks evita consolidar as colunas num bloco 2D novo
+        return table.to_pandas(split_blocks=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "dias": len(self._tables),
+                "bytes": self.nbytes,
+                "acertos": self.hits,
+                "faltas": self.misses,
+            }
+
+
+def write_arrow(table, path):
+    # mesmo esquema de troca atômica do cache Parquet: outros processos
+    # podem estar mapeando o arquivo antigo nesse momento
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        with pa.OSFile(tmp, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _frame_bytes(valor):
+    frames = valor if isinstance(valor, tuple) else (valor,)
+    return sum(
+        int(f.memory_usage(deep=True).sum())
+        for f in frames
+        if hasattr(f, "memory_usage")
+    )
+
+
+class FrameCache:
+    """Resultados de funções que devolvem frames, num LRU limitado por bytes.
+
+    Faz o papel do ``st.cache_resource`` para os frames das páginas: todas
+    as sessões recebem o mesmo objeto (somente leitura), mas o total fica
+    em `budget_bytes` em vez de num número fixo de entradas.
+    """
+
+    def __init__(self, budget_bytes=FRAMES_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._items = OrderedDict()  # chave -> (expira em, bytes, valor)
+        self._computing = {}  # chave -> trava de quem está calculando
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def nbytes(self):
+        return sum(tamanho for _, tamanho, _ in self._items.values())
+
+    def _get(self, chave):
+        item = self._items.get(chave)
+        if item is None:
+            return None
+        if item[0] < time.monotonic():
+            del self._items[chave]
+            return None
+        self._items.move_to_end(chave)
+        return item
+
+    def get_or_compute(self, chave, calcular, ttl=None):
+        with self._lock:
+            item = self._get(chave)
+            if item is not None:
+                self.hits += 1
+                return item[2]
+            trava = self._computing.setdefault(chave, threading.Lock())
+        # uma sessão calcula; as outras com a mesma chave esperam por ela
+        with trava:
+            with self._lock:
+                item = self._get(chave)
+                if item is not None:
+                    self.hits += 1
+                    return item[2]
+                self.misses += 1
+            try:
+                valor = calcular()
+            finally:
+                with self._lock:
+                    self._computing.pop(chave, None)
+            expira = time.monotonic() + ttl if ttl else float("inf")
+            with self._lock:
+                self._items[chave] = (expira, _frame_bytes(valor), valor)
+                while len(self._items) > 1 and self.nbytes > self.budget_bytes:
+                    self._items.popitem(last=False)
+            return valor
+
+    def stats(self):
+        with self._lock:
+            return {
+                "frames": len(self._items),
+                "bytes": self.nbytes,
+                "acertos": self.hits,
+                "faltas": self.misses,
+            }
+
+
+_frames = FrameCache()
+
+
+def cache_frames(ttl=None):
+    """Decorador: memoiza a função em `FrameCache`, pelos argumentos.
+
+    A chave inclui o arquivo onde a função foi definida, para que funções
+    de mesmo nome em páginas diferentes não se misturem.
+    """
+
+    def decorador(funcao):
+        codigo = funcao.__code__
+        nome = (codigo.co_filename, funcao.__qualname__)
+
+        @functools.wraps(funcao)
+        def memoizada(*args, **kwargs):
+            chave = (nome, args, tuple(sorted(kwargs.items())))
+            return _frames.get_or_compute(chave, lambda: funcao(*args, **kwargs), ttl)
+
+        return memoizada
+
+    return decorador
+
+
+def get_frame_cache():
+    """Instância única do processo."""
+    return _frames
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Instância única do processo."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArrowDayStore()
+        return _store
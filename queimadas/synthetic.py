@@ -0,0 +1,141 @@
+"""Focos de incêndio sintéticos, no esquema dos CSVs do INPE.
+
+Serve para testar carga e rodar benchmarks sem rede. Os pontos são
+sorteados em lotes dentro do retângulo do polígono e filtrados com um
+único teste vetorizado por lote (`points_in_polygon`), até completar `n`.
+As distribuições imitam as dos arquivos diários: FRP com cauda longa
+(log-normal), biomas e satélites com as proporções típicas da temporada
+de queimadas, risco de fogo concentrado perto de 1 e horários com pico
+à tarde.
+"""
+
+import numpy as np
+import pandas as pd
+from shapely.geometry import box
+
+from .geo import points_in_polygon
+from .schema import ESTADO_SIGLAS, coerce_schema
+
+# retângulo do Brasil (lon_min, lat_min, lon_max, lat_max)
+BRASIL = box(-73.99, -33.75, -34.79, 5.27)
+
+BIOMAS = {
+    "Amazônia": 0.46,
+    "Cerrado": 0.34,
+    "Caatinga": 0.07,
+    "Mata Atlântica": 0.07,
+    "Pantanal": 0.05,
+    "Pampa": 0.01,
+}
+SATELITES = {
+    "NOAA-20": 0.30,
+    "NPP-375D": 0.25,
+    "NOAA-21": 0.20,
+    "AQUA_M-T": 0.10,
+    "TERRA_M-T": 0.08,
+    "GOES-16": 0.07,
+}
+MUNICIPIOS = {
+    "MATO GROSSO DO SUL": ["CORUMBÁ", "AQUIDAUANA", "MIRANDA", "PORTO MURTINHO"],
+    "MATO GROSSO": ["POCONÉ", "CÁCERES", "BARÃO DE MELGAÇO", "COLNIZA"],
+    "PARÁ": ["ALTAMIRA", "SÃO FÉLIX DO XINGU", "NOVO PROGRESSO"],
+    "AMAZONAS": ["LÁBREA", "APUÍ", "BOCA DO ACRE"],
+    "TOCANTINS": ["LAGOA DA CONFUSÃO", "FORMOSO DO ARAGUAIA"],
+    "MARANHÃO": ["BALSAS", "GRAJAÚ"],
+}
+ID_ESTADO = {nome: 11 + i for i, nome in enumerate(ESTADO_SIGLAS)}
+# lotes de `_sample_in_polygon` antes de desistir de um polígono estreito
+MAX_ROUNDS = 100
+
+
+def _sample_in_polygon(poly, n, rng, batch=None):
+    """`n` pontos uniformes dentro de `poly`, sorteados em lotes."""
+    if n and poly.area == 0:
+        # linha, ponto ou polígono vazio: nenhum sorteio cairia dentro
+        raise ValueError("polígono sem área: não há onde sortear focos")
+    minx, miny, maxx, maxy = poly.bounds
+    # a fração aceita é a razão de áreas; o lote já cobre o que falta
+    aceite = max(poly.area / ((maxx - minx) * (maxy - miny) or 1), 1e-3)
+    lon = np.empty(n)
+    lat = np.empty(n)
+    feitos = 0
+    for _ in range(MAX_ROUNDS):
+        if feitos >= n:
+            break
+        tamanho = batch or int((n - feitos) / aceite * 1.1) + 16
+        x = rng.uniform(minx, maxx, tamanho)
+        y = rng.uniform(miny, maxy, tamanho)
+        dentro = points_in_polygon(poly, x, y)
+        x, y = x[dentro][: n - feitos], y[dentro][: n - feitos]
+        lon[feitos : feitos + x.size] = x
+        lat[feitos : feitos + y.size] = y
+        feitos += x.size
+    if feitos < n:
+        raise ValueError(
+            f"só {feitos} de {n} pontos caíram no polígono em {MAX_ROUNDS} lotes"
+        )
+    return lon, lat
+
+
+def _choice(rng, pesos, n):
+    nomes = list(pesos)
+    p = np.array(list(pesos.values()))
+    codigos = rng.choice(len(nomes), n, p=p / p.sum())
+    return pd.Categorical.from_codes(codigos, categories=nomes)
+
+
+def generate_hotspots(n, poly=None, day=None, seed=None):
+    """DataFrame com `n` focos sintéticos dentro de `poly` (padrão: Brasil).
+
+    As colunas e os tipos são os de `parse_inpe_csv`. `day` fixa a data
+    dos horários (padrão: hoje); `seed` torna o resultado reprodutível.
+    """
+    rng = np.random.default_rng(seed)
+    lon, lat = _sample_in_polygon(poly if poly is not None else BRASIL, n, rng)
+    day = pd.Timestamp(day or pd.Timestamp.now()).normalize()
+
+    # passagens concentradas à tarde (~17h30 UTC), espalhadas pelo dia
+    segundos = rng.normal(17.5 * 3600, 3 * 3600, n).clip(0, 86399).astype("int64")
+    segundos -= segundos % 60
+
+    estados = list(MUNICIPIOS)
+    idx_estado = rng.integers(0, len(estados), n)
+    municipios = np.array([m for e in estados for m in MUNICIPIOS[e]], dtype=object)
+    # município sorteado entre os do estado do foco
+    inicio = np.cumsum([0] + [len(MUNICIPIOS[e]) for e in estados])
+    deslocamento = rng.random(n) * np.diff(inicio)[idx_estado]
+    idx_municipio = inicio[idx_estado] + deslocamento.astype("int64")
+
+    dias_sem_chuva = rng.geometric(0.08, n).clip(0, 120).astype("float32")
+    chuva = np.where(rng.random(n) < 0.85, 0.0, rng.exponential(4.0, n))
+    risco = rng.beta(4, 1.2, n).astype("float32")
+    risco[rng.random(n) < 0.03] = np.nan  # o INPE publica alguns sem risco
+
+    df = pd.DataFrame(
+        {
+            "id": pd.array([f"sint-{seed or 0}-{i}" for i in range(n)], dtype="string"),
+            "lat": lat.astype("float32"),
+            "lon": lon.astype("float32"),
+            "data_hora_gmt": day + pd.to_timedelta(segundos, unit="s"),
+            "satelite": _choice(rng, SATELITES, n),
+            "municipio": pd.Categorical(municipios[idx_municipio]),
+            "estado": pd.Categorical.from_codes(idx_estado, categories=estados),
+            "pais": pd.Categorical(["Brasil"] * n),
+            "municipio_id": (idx_municipio + 5000000).astype("int32"),
+            "estado_id": np.array([ID_ESTADO[e] for e in estados])[idx_estado],
+            "pais_id": 33,
+            "numero_dias_sem_chuva": dias_sem_chuva,
+            "precipitacao": chuva.round(1).astype("float32"),
+            "risco_fogo": risco,
+            "bioma": _choice(rng, BIOMAS, n),
+            # FRP em MW: mediana ~15, alguns incêndios grandes acima de 1000
+            "frp": rng.lognormal(np.log(15), 1.2, n).round(1).astype("float32"),
+        }
+    )
+    return coerce_schema(df)
+
+
+def synthetic_csv(n, poly=None, day=None, seed=None):
+    """Mesmos focos de `generate_hotspots`, como os bytes de um CSV do INPE."""
+    df = generate_hotspots(n, poly, day, seed)
+    return df.to_csv(index=False, date_format="%Y-%m-%d %H:%M:%S").encode("utf-8")
@@ -0,0 +1,425 @@
+"""Tiles dos focos servidos por um servidor HTTP local, ao lado do Streamlit.
+
+Embutir os focos no HTML do mapa (``add_heatmap``, GeoJSON) faz o iframe
+crescer com os dados e ser reenviado inteiro a cada rerun. Aqui a página
+só registra o frame dos focos (`serve_layer`) e o mapa recebe uma URL de
+tiles ``/{camada}/{z}/{x}/{y}.json``: o navegador busca apenas os tiles da
+área visível, no nível de detalhe do zoom, e os desenha num canvas
+(`queimadas.render.add_hotspot_tiles`).
+
+Cada tile traz os focos com posição em pixels dentro dele: os próprios
+pontos (com os campos dos popups) enquanto couberem em `MAX_POINTS`, e
+acima disso os centróides de uma grade de `GRID` × `GRID` células, com a
+métrica agregada como no mapa de calor pré-agregado. ``?b=`` pede também
+os focos a até tantos pixels da borda, para o calor não ter emendas
+entre tiles vizinhos.
+
+O identificador da camada é um hash do conteúdo: o mesmo frame em outro
+rerun ou em outra sessão cai na mesma camada, os tiles prontos ficam num
+LRU por processo e o navegador pode guardá-los sem revalidar. As camadas
+ficam em memória num LRU limitado por ``INPE_TILES_BUDGET_MB`` e os tiles
+prontos (JSON comprimido) por ``INPE_TILES_CACHE_MB``.
+
+O servidor escuta em ``INPE_TILES_HOST``:``INPE_TILES_PORT`` (outra porta
+livre se essa estiver ocupada por outro processo), e o navegador precisa
+alcançar esse endereço. Por isso os tiles são opcionais: as páginas só os
+usam com ``INPE_TILES_URL`` apontando para o caminho público que leva ao
+servidor (Streamlit atrás de um proxy, HTTPS) ou com ``INPE_TILES=1``
+quando o navegador roda na mesma máquina. Sem isso, `serve_layer`
+devolve None e as páginas embutem os focos no HTML como antes.
+
+Os tiles são JSON e não Mapbox Vector Tiles: o projeto não depende de um
+codificador de MVT nem de um plugin do Leaflet para lê-los.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from .geo import spread_bits
+from .grid import METRIC_AGG, TILE_SIZE
+
+logger = logging.getLogger(__name__)
+
+HOST = os.environ.get("INPE_TILES_HOST", "127.0.0.1")
+PORT = int(os.environ.get("INPE_TILES_PORT", 8766))
+PUBLIC_URL = os.environ.get("INPE_TILES_URL")
+# 127.0.0.1 só é alcançável por um navegador na mesma máquina
+ENABLED = os.environ.get("INPE_TILES", "1" if PUBLIC_URL else "0") != "0"
+BUDGET_BYTES = int(os.environ.get("INPE_TILES_BUDGET_MB", 256)) * 2**20
+CACHE_BYTES = int(os.environ.get("INPE_TILES_CACHE_MB", 64)) * 2**20
+
+# os focos são ordenados pela curva Z dos tiles deste zoom: qualquer tile
+# até ele é um intervalo contíguo da ordem
+KEY_ZOOM = 16
+MAX_ZOOM = 22
+MAX_POINTS = 2000
+GRID = 32
+MAX_BUFFER = TILE_SIZE // 2
+MAX_LAT = 85.0511287798
+
+
+def mercator(lon, lat):
+    """Posição de cada ponto no plano Web Mercator, normalizada em [0, 1)."""
+    lon = np.asarray(lon, dtype="float64")
+    lat = np.clip(np.asarray(lat, dtype="float64"), -MAX_LAT, MAX_LAT)
+    x = (lon + 180) / 360
+    y = 0.5 - np.arcsinh(np.tan(np.radians(lat))) / (2 * math.pi)
+    limite = np.nextafter(1.0, 0.0)
+    return np.clip(x, 0, limite), np.clip(y, 0, limite)
+
+
+def tile_key(x, y):
+    """Posição dos tiles `x`/`y` (do mesmo zoom) na curva Z."""
+    x = np.asarray(x, dtype="int64")
+    y = np.asarray(y, dtype="int64")
+    return spread_bits(x).astype("int64") | (spread_bits(y).astype("int64") << 1)
+
+
+class HotspotLayer:
+    """Focos de uma camada de tiles, na ordem da curva Z de `KEY_ZOOM`.
+
+    `value` é a coluna da métrica (sem ela, cada foco pesa 1), combinada
+    nas células da grade segundo `how` (``"sum"`` ou ``"mean"``); `fields`
+    são as colunas enviadas para os popups quando o tile traz os pontos.
+    """
+
+    def __init__(self, df, value=None, fields=(), how="sum"):
+        lon = df["lon"].to_numpy(dtype="float64")
+        lat = df["lat"].to_numpy(dtype="float64")
+        validos = np.flatnonzero(~(np.isnan(lon) | np.isnan(lat)))
+        x, y = mercator(lon[validos], lat[validos])
+        lado = 2**KEY_ZOOM
+        chave = tile_key(x * lado, y * lado)
+        ordem = np.argsort(chave, kind="stable")
+        self.keys = chave[ordem]
+        self.x = x[ordem]
+        self.y = y[ordem]
+        if value is None:
+            self.value = np.ones(len(ordem), dtype="float32")
+        else:
+            valor = df[value].to_numpy(dtype="float32", na_value=np.nan)
+            self.value = np.nan_to_num(valor[validos][ordem])
+        self.how = how
+        self.rows = validos[ordem]
+        self.fields = df[list(fields)] if fields else None
+        self._vmax = {}
+        self._vmax_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def nbytes(self):
+        total = sum(
+            a.nbytes for a in (self.keys, self.x, self.y, self.value, self.rows)
+        )
+        if self.fields is not None:
+            total += int(self.fields.memory_usage(index=False, deep=True).sum())
+        return total
+
+    def _span(self, z, x, y):
+        """Intervalo da ordem ocupado pelo tile (z, x, y)."""
+        if z >= KEY_ZOOM:
+            deslocamento = z - KEY_ZOOM
+            inicio = int(tile_key(x >> deslocamento, y >> deslocamento))
+            fim = inicio + 1
+        else:
+            deslocamento = KEY_ZOOM - z
+            inicio = int(tile_key(x << deslocamento, y << deslocamento))
+            fim = inicio + (1 << 2 * deslocamento)
+        return np.searchsorted(self.keys, [inicio, fim])
+
+    def select(self, z, x, y, buffer=0):
+        """Posições dos focos do tile, mais os a até `buffer` pixels dele."""
+        lado = 2**z
+        vizinhos = 1 if buffer else 0
+        partes = []
+        for ty in range(max(y - vizinhos, 0), min(y + vizinhos, lado - 1) + 1):
+            for tx in range(max(x - vizinhos, 0), min(x + vizinhos, lado - 1) + 1):
+                inicio, fim = self._span(z, tx, ty)
+                if fim > inicio:
+                    partes.append(np.arange(inicio, fim))
+        if not partes:
+            return np.empty(0, dtype="int64")
+        idx = np.concatenate(partes)
+        if z < KEY_ZOOM and not buffer:
+            return idx
+        margem = buffer / TILE_SIZE
+        px = self.x[idx] * lado - x
+        py = self.y[idx] * lado - y
+        dentro = (
+            (px >= -margem) & (px < 1 + margem) & (py >= -margem) & (py < 1 + margem)
+        )
+        return idx[dentro]
+
+    def _cells(self, px, py, valor):
+        """Agrega pontos (em pixels) nas células da grade: centróide,
+        métrica combinada segundo `how` e quantidade."""
+        celula = TILE_SIZE / GRID
+        codigos, _ = pd.factorize(
+            np.floor(px / celula).astype("int64") * (1 << 32)
+            + np.floor(py / celula).astype("int64")
+        )
+        n = np.bincount(codigos)
+        soma = np.bincount(codigos, weights=valor)
+        return (
+            np.bincount(codigos, weights=px) / n,
+            np.bincount(codigos, weights=py) / n,
+            soma if self.how == "sum" else soma / n,
+            n,
+        )
+
+    def vmax(self, z):
+        """Valor que satura o mapa de calor no zoom `z`: o percentil 99 das
+        células da grade na camada inteira, igual para todos os tiles."""
+        with self._vmax_lock:
+            if z not in self._vmax:
+                self._vmax[z] = self._percentile_cells(z)
+            return self._vmax[z]
+
+    def _percentile_cells(self, z):
+        if not len(self):
+            return 1.0
+        valor = self.value.astype("float64")
+        nivel = z + int(math.log2(GRID))
+        if nivel <= KEY_ZOOM:
+            # as células são prefixos da chave: trechos contíguos da ordem
+            celula = self.keys >> 2 * (KEY_ZOOM - nivel)
+            inicio = np.flatnonzero(np.r_[True, celula[1:] != celula[:-1]])
+            n = np.diff(np.r_[inicio, len(celula)])
+            agregado = np.add.reduceat(valor, inicio)
+            if self.how != "sum":
+                agregado = agregado / n
+        else:
+            lado = 2**z * TILE_SIZE
+            _, _, agregado, _ = self._cells(self.x * lado, self.y * lado, valor)
+        return float(np.percentile(agregado, 99))
+
+    def tile(self, z, x, y, buffer=0):
+        """Conteúdo do tile (z, x, y) como dicionário pronto para JSON.
+
+        Colunas: ``x``/``y`` em pixels a partir do canto do tile e ``v``, a
+        métrica, por foco (``modo`` ``"pontos"``, com ``p``, os campos de
+        cada um) ou por célula da grade (``"grade"``, com ``n``, a
+        quantidade de focos).
+        """
+        idx = self.select(z, x, y, buffer)
+        lado = 2**z
+        px = (self.x[idx] * lado - x) * TILE_SIZE
+        py = (self.y[idx] * lado - y) * TILE_SIZE
+        valor = self.value[idx].astype("float64")
+        dados = {"z": z, "vmax": round(self.vmax(z), 3)}
+        if len(idx) <= MAX_POINTS:
+            dados["modo"] = "pontos"
+            dados.update(x=px.round(1).tolist(), y=py.round(1).tolist())
+            dados["v"] = valor.round(2).tolist()
+            if self.fields is not None:
+                campos = self.fields.iloc[self.rows[idx]]
+                dados["p"] = (
+                    campos.astype(str).where(campos.notna(), None).values.tolist()
+                )
+        else:
+            dados["modo"] = "grade"
+            cx, cy, agregado, n = self._cells(px, py, valor)
+            # meio pixel não aparece no calor: inteiros encurtam o JSON
+            dados.update(
+                x=cx.round().astype("int32").tolist(),
+                y=cy.round().astype("int32").tolist(),
+            )
+            dados["v"] = agregado.round(1).tolist()
+            dados["n"] = n.tolist()
+        return dados
+
+
+def layer_id(df, value=None, fields=(), how="sum"):
+    """Hash do conteúdo da camada: mesmos focos, mesma camada."""
+    h = hashlib.blake2b(digest_size=12)
+    h.update(repr((value, tuple(fields), how, len(df))).encode())
+    colunas = ["lon", "lat", *([value] if value else []), *fields]
+    h.update(pd.util.hash_pandas_object(df[colunas], index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+class TileService:
+    """Camadas registradas e tiles prontos, cada um num LRU por bytes."""
+
+    def __init__(self, budget_bytes=BUDGET_BYTES, cache_bytes=CACHE_BYTES):
+        self.budget_bytes = budget_bytes
+        self.cache_bytes = cache_bytes
+        self._layers = OrderedDict()  # id -> HotspotLayer
+        self._tiles = OrderedDict()  # (id, z, x, y, buffer) -> JSON comprimido
+        self._tiles_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, df, value=None, fields=(), how=None):
+        """Registra os focos de `df` e devolve o identificador da camada."""
+        how = how or METRIC_AGG.get(value, "sum")
+        chave = layer_id(df, value, fields, how)
+        with self._lock:
+            if chave in self._layers:
+                self._layers.move_to_end(chave)
+                return chave
+        camada = HotspotLayer(df, value, fields, how)
+        with self._lock:
+            self._layers[chave] = camada
+            self._layers.move_to_end(chave)
+            while len(self._layers) > 1 and self.nbytes > self.budget_bytes:
+                self._drop(self._layers.popitem(last=False)[0])
+        return chave
+
+    @property
+    def nbytes(self):
+        return sum(c.nbytes for c in self._layers.values())
+
+    def _drop(self, chave):
+        for k in [k for k in self._tiles if k[0] == chave]:
+            self._tiles_bytes -= len(self._tiles.pop(k))
+
+    def tile(self, chave, z, x, y, buffer=0):
+        """JSON comprimido (gzip) do tile, ou None se a camada não existe."""
+        k = (chave, z, x, y, buffer)
+        with self._lock:
+            corpo = self._tiles.get(k)
+            if corpo is not None:
+                self._tiles.move_to_end(k)
+                self.hits += 1
+                return corpo
+            camada = self._layers.get(chave)
+            if camada is None:
+                return None
+            self.misses += 1
+
+        dados = camada.tile(z, x, y, buffer)
+        corpo = gzip.compress(
+            json.dumps(dados, separators=(",", ":")).encode(), compresslevel=5
+        )
+
+        with self._lock:
+            if k not in self._tiles:
+                self._tiles[k] = corpo
+                self._tiles_bytes += len(corpo)
+            while self._tiles and self._tiles_bytes > self.cache_bytes:
+                self._tiles_bytes -= len(self._tiles.popitem(last=False)[1])
+        return corpo
+
+    def stats(self):
+        with self._lock:
+            return {
+                "camadas": len(self._layers),
+                "bytes": self.nbytes,
+                "tiles": len(self._tiles),
+                "bytes_tiles": self._tiles_bytes,
+                "acertos": self.hits,
+                "faltas": self.misses,
+            }
+
+
+class _TileHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        partes = urlsplit(self.path)
+        try:
+            chave, z, x, y = partes.path.strip("/").removesuffix(".json").split("/")
+            z, x, y = int(z), int(x), int(y)
+            buffer = int(parse_qs(partes.query).get("b", ["0"])[0])
+        except ValueError:
+            return self._send(404)
+        if not (0 <= z <= MAX_ZOOM and 0 <= x < 2**z and 0 <= y < 2**z):
+            return self._send(404)
+        corpo = self.server.service.tile(
+            chave, z, x, y, min(max(buffer, 0), MAX_BUFFER)
+        )
+        if corpo is None:
+            return self._send(404)
+        cabecalhos = {
+            "Content-Type": "application/json",
+            # o identificador da camada muda junto com os focos
+            "Cache-Control": "public, max-age=86400, immutable",
+        }
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            cabecalhos["Content-Encoding"] = "gzip"
+        else:
+            corpo = gzip.decompress(corpo)
+        self._send(200, corpo, cabecalhos)
+
+    def _send(self, status, corpo=b"", cabecalhos=None):
+        self.send_response(status)
+        # o mapa roda num iframe de outra origem
+        self.send_header("Access-Control-Allow-Origin", "*")
+        for chave, valor in (cabecalhos or {}).items():
+            self.send_header(chave, valor)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, format, *args):
+        logger.debug("%s %s", self.address_string(), format % args)
+
+
+def make_tile_server(service=None, host=HOST, port=PORT):
+    """Servidor HTTP dos tiles de `service`; use ``serve_forever()``.
+
+    ``server_url`` é a base das URLs de tiles vista deste processo.
+    """
+    server = ThreadingHTTPServer((host, port), _TileHandler)
+    server.daemon_threads = True
+    server.service = service or TileService()
+    server.server_url = f"http://{host}:{server.server_port}"
+    return server
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_tile_server():
+    """Inicia o servidor de tiles uma única vez por processo.
+
+    Devolve o servidor, ou None se os tiles estão desligados ou o servidor
+    não pôde subir (as páginas então embutem os focos no HTML).
+    """
+    global _server
+    if not ENABLED:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                server = make_tile_server()
+            except OSError:
+                if PUBLIC_URL:
+                    # o caminho público leva a uma porta fixa
+                    logger.exception("porta dos tiles ocupada (%s:%s)", HOST, PORT)
+                    _server = False
+                    return None
+                # outro processo do app já usa a porta; as camadas são por processo
+                server = make_tile_server(port=0)
+            threading.Thread(
+                target=server.serve_forever, name="tiles", daemon=True
+            ).start()
+            _server = server
+        return _server or None
+
+
+def serve_layer(df, value=None, fields=(), how=None):
+    """Registra `df` no servidor de tiles e devolve o modelo de URL dos
+    tiles (``.../{z}/{x}/{y}.json``), ou None sem servidor."""
+    server = start_tile_server()
+    if server is None:
+        return None
+    chave = server.service.register(df, value, fields, how)
+    base = (PUBLIC_URL or server.server_url).rstrip("/")
+    return f"{base}/{chave}/{{z}}/{{x}}/{{y}}.json"
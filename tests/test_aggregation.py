@@ -0,0 +1,53 @@
+"""Agregações da página de Focos contra um groupby direto por coluna."""
+
+import numpy as np
+import pandas as pd
+
+from queimadas.aggregation import summarize
+
+
+def _focos(n=5_000, seed=0):
+    rng = np.random.default_rng(seed)
+    municipios = np.array([f"M{i}-MT" for i in range(40)], dtype=object)
+    biomas = np.array(["Amazônia", "Cerrado", "Pantanal"], dtype=object)
+    municipio = municipios[rng.integers(0, 40, n)]
+    bioma = biomas[rng.integers(0, 3, n)]
+    municipio[rng.random(n) < 0.02] = None
+    bioma[rng.random(n) < 0.02] = None
+    frp = rng.gamma(2, 10, n).astype("float32")
+    frp[rng.random(n) < 0.05] = np.nan
+    categorias = [*municipios, "SEM FOCOS-MT"]
+    return pd.DataFrame(
+        {
+            "municipio_siglaUF": pd.Categorical(municipio, categories=categorias),
+            "bioma": pd.Categorical(bioma),
+            "frp": frp,
+        }
+    )
+
+
+def _ingenuo(df, coluna, metric):
+    return df.groupby(coluna, observed=True).agg(
+        quantidade_focos=(metric, "size"), metrica=(metric, "sum")
+    )
+
+
+def test_resumo_bate_com_groupby_por_coluna():
+    df = _focos()
+    resumo = summarize(df, "frp")
+
+    assert resumo.total == len(df)
+    for obtido, coluna in (
+        (resumo.por_municipio, "municipio_siglaUF"),
+        (resumo.por_bioma, "bioma"),
+    ):
+        esperado = _ingenuo(df, coluna, "frp")
+        obtido = obtido.sort_index()
+        assert list(obtido.index) == list(esperado.sort_index().index)
+        np.testing.assert_array_equal(
+            obtido["quantidade_focos"], esperado.sort_index()["quantidade_focos"]
+        )
+        np.testing.assert_allclose(
+            obtido["metrica"], esperado.sort_index()["metrica"], rtol=1e-5
+        )
+    assert "SEM FOCOS-MT" not in resumo.por_municipio.index
@@ -0,0 +1,83 @@
+"""Agrupamento em grade contra comparar todos os pares de detecções."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from queimadas.dedup import cluster_labels, deduplicate
+from queimadas.geo import KM_POR_GRAU
+
+
+def _pares(lon, lat, hours, distance_km, window_h):
+    """Rótulos por união-busca sobre todos os pares, na mesma métrica."""
+    n = len(lon)
+    pai = list(range(n))
+
+    def raiz(i):
+        while pai[i] != i:
+            pai[i] = pai[pai[i]]
+            i = pai[i]
+        return i
+
+    coslat = np.cos(np.radians(lat))
+    for i in range(n):
+        if np.isnan(lon[i]) or np.isnan(lat[i]):
+            continue
+        dx = (lon[i] - lon) * KM_POR_GRAU * (coslat[i] + coslat) / 2
+        dy = (lat[i] - lat) * KM_POR_GRAU
+        perto = dx * dx + dy * dy <= distance_km**2
+        if hours is not None:
+            perto &= np.abs(hours[i] - hours) <= window_h
+        for j in np.flatnonzero(perto):
+            pai[raiz(i)] = raiz(j)
+    return np.array([raiz(i) for i in range(n)])
+
+
+def _deteccoes(rng, n):
+    # fogos com várias detecções próximas, espalhados por uma área pequena
+    fogos = rng.uniform([-56, -19, 0], [-55.6, -18.6, 48], (n // 4, 3))
+    base = fogos[rng.integers(0, len(fogos), n)]
+    lon = base[:, 0] + rng.normal(0, 0.005, n)
+    lat = base[:, 1] + rng.normal(0, 0.005, n)
+    hours = base[:, 2] + rng.uniform(0, 4, n)
+    lon[:5] = np.nan
+    return lon, lat, hours
+
+
+@pytest.mark.parametrize(
+    "distance_km, window_h, com_horas",
+    [(1.0, 3.0, True), (0.5, 1.0, True), (2.0, 3.0, False)],
+)
+def test_mesmos_eventos_que_todos_os_pares(distance_km, window_h, com_horas):
+    rng = np.random.default_rng(int(distance_km * 10))
+    lon, lat, hours = _deteccoes(rng, 3_000)
+    hours = hours if com_horas else None
+
+    grade = cluster_labels(lon, lat, hours, distance_km, window_h)
+    pares = _pares(lon, lat, hours, distance_km, window_h)
+
+    # a mesma partição, com rótulos diferentes
+    np.testing.assert_array_equal(pd.factorize(grade)[0], pd.factorize(pares)[0])
+    assert sorted(set(grade)) == list(range(grade.max() + 1))
+    assert 1 < grade.max() + 1 < len(lon)
+
+
+def test_eventos_somam_as_deteccoes():
+    rng = np.random.default_rng(7)
+    lon, lat, hours = _deteccoes(rng, 2_000)
+    df = pd.DataFrame(
+        {
+            "lon": lon,
+            "lat": lat,
+            "data_hora_gmt": pd.Timestamp("2024-09-01")
+            + pd.to_timedelta(hours, unit="h"),
+            "satelite": pd.Categorical(rng.choice(["AQUA_M-T", "NOAA-20"], len(lon))),
+            "frp": rng.gamma(2, 10, len(lon)),
+        }
+    )
+    eventos = deduplicate(df)
+
+    assert eventos["deteccoes"].sum() == len(df)
+    assert eventos["frp_total"].sum() == pytest.approx(df["frp"].sum())
+    assert (eventos["frp"] <= eventos["frp_total"] + 1e-9).all()
+    assert eventos["satelites"].between(1, 2).all()
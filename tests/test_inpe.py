@@ -0,0 +1,93 @@
+"""Atualização incremental do dia com Range/ETag sobre um espelho local."""
+
+from datetime import date
+
+import pytest
+
+from queimadas import inpe
+from queimadas.sources import MirrorSource
+from queimadas.synthetic import synthetic_csv
+
+DIA = date(2024, 9, 1)
+
+
+class Gravador:
+    """Origem que anota o status de cada resposta."""
+
+    def __init__(self, origem):
+        self.origem = origem
+        self.status = []
+
+    def get(self, day, headers=None):
+        resposta = self.origem.get(day, headers)
+        self.status.append(resposta.status_code)
+        return resposta
+
+
+@pytest.fixture
+def espelho(tmp_path, monkeypatch):
+    origem = Gravador(MirrorSource(tmp_path / "espelho"))
+    monkeypatch.setattr(inpe, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(inpe, "get_source", lambda: origem)
+    (tmp_path / "espelho").mkdir()
+    (tmp_path / "cache").mkdir()
+    return origem
+
+
+def _linhas(n, seed):
+    cabecalho, *linhas = synthetic_csv(n, day=DIA, seed=seed).splitlines(True)
+    return cabecalho, linhas
+
+
+def _grava(origem, conteudo):
+    path = origem.origem.path(DIA)
+    path.write_bytes(conteudo)
+
+
+def _focos():
+    return len(inpe.load_day(DIA))
+
+
+def test_anexos_linha_incompleta_304_e_arquivo_encolhido(espelho):
+    cabecalho, linhas = _linhas(100, seed=1)
+    _, novas = _linhas(30, seed=2)
+    arquivo = cabecalho + b"".join(linhas)
+    _grava(espelho, arquivo)
+    assert inpe.refresh_day(DIA) == 100
+    assert espelho.status == [200]
+
+    # linhas anexadas: só o fim do arquivo é pedido
+    arquivo += b"".join(novas[:20])
+    _grava(espelho, arquivo)
+    espelho.status.clear()
+    assert inpe.refresh_day(DIA) == 20
+    assert espelho.status == [206]
+    assert _focos() == 120
+
+    # nada mudou: o ETag devolve 304
+    espelho.status.clear()
+    assert inpe.refresh_day(DIA) == 0
+    assert espelho.status == [304]
+
+    # a última linha ainda está sendo escrita: fica para a próxima vez
+    metade = len(novas[25]) // 2
+    arquivo += b"".join(novas[20:25]) + novas[25][:metade]
+    _grava(espelho, arquivo)
+    assert inpe.refresh_day(DIA) == 5
+    assert inpe.read_meta(DIA)["etag"] is None
+    arquivo += novas[25][metade:]
+    _grava(espelho, arquivo)
+    espelho.status.clear()
+    assert inpe.refresh_day(DIA) == 1
+    assert espelho.status == [206]
+    assert _focos() == 126
+
+    # arquivo reescrito menor: o trecho conhecido não bate e o dia é
+    # baixado inteiro
+    cabecalho, outras = _linhas(50, seed=3)
+    _grava(espelho, cabecalho + b"".join(outras))
+    espelho.status.clear()
+    assert inpe.refresh_day(DIA) == 0
+    assert espelho.status[-1] == 200
+    assert _focos() == 50
+    assert inpe.read_meta(DIA)["linhas"] == 50
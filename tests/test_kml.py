@@ -0,0 +1,76 @@
+"""Leitura em fluxo dos KMLs de propriedades."""
+
+import pytest
+import shapely
+
+from queimadas.kml import PolygonFileError, read_kml_polygons
+
+KML = """<?xml version="1.0" encoding="UTF-8"?>
+<kml xmlns="http://www.opengis.net/kml/2.2">
+<Document><name>CAR</name>
+<Folder><name>Propriedades</name>
+  <Placemark><name>Com buraco</name>
+    <Polygon>
+      <outerBoundaryIs><LinearRing><coordinates>
+        0,0,0 4,0,0 4,4,0 0,4,0 0,0,0
+      </coordinates></LinearRing></outerBoundaryIs>
+      <innerBoundaryIs><LinearRing><coordinates>
+        1,1 2,1 2,2 1,2 1,1
+      </coordinates></LinearRing></innerBoundaryIs>
+    </Polygon>
+  </Placemark>
+  <Folder>
+    <Placemark><name>Duas glebas</name>
+      <MultiGeometry>
+        <Polygon><outerBoundaryIs><LinearRing><coordinates>
+          10,0 12,0 12,1 10,1 10,0
+        </coordinates></LinearRing></outerBoundaryIs></Polygon>
+        <Polygon><outerBoundaryIs><LinearRing><coordinates>
+          13,0 14,0 14,1 13,1 13,0
+        </coordinates></LinearRing></outerBoundaryIs></Polygon>
+        <Point><coordinates>11,0.5</coordinates></Point>
+      </MultiGeometry>
+    </Placemark>
+  </Folder>
+  <Placemark><name>Linha fechada</name>
+    <LineString><coordinates>20,0 21,0 21,1 20,0</coordinates></LineString>
+  </Placemark>
+  <Placemark><name>Linha aberta</name>
+    <LineString><coordinates>30,0 31,0 31,1</coordinates></LineString>
+  </Placemark>
+  <Placemark>
+    <Polygon><outerBoundaryIs><LinearRing><coordinates>
+      40,0 40.5,0 40.5,0.5 40,0
+    </coordinates></LinearRing></outerBoundaryIs></Polygon>
+  </Placemark>
+</Folder>
+</Document>
+</kml>
+"""
+
+
+def test_placemarks_com_buraco_multigeometria_e_linha_fechada():
+    itens = {p.name: p for p in read_kml_polygons(KML.encode())}
+
+    assert list(itens) == ["Com buraco", "Duas glebas", "Linha fechada", "<sem nome>"]
+
+    buraco = itens["Com buraco"]
+    assert buraco.area == pytest.approx(15)
+    assert buraco.geometry.area == pytest.approx(15)
+    assert len(buraco.geometry.interiors) == 1
+
+    glebas = itens["Duas glebas"].geometry
+    assert isinstance(glebas, shapely.MultiPolygon)
+    assert len(glebas.geoms) == 2
+    assert itens["Duas glebas"].area == pytest.approx(3)
+
+    assert itens["Linha fechada"].geometry.area == pytest.approx(0.5)
+    assert itens["Linha fechada"].folium_coords[0] == [0, 20]
+
+
+def test_kml_sem_poligono():
+    sem_anel = (
+        KML.split("<Placemark><name>Com buraco")[0] + "</Folder></Document></kml>"
+    )
+    with pytest.raises(PolygonFileError):
+        read_kml_polygons(sem_anel.encode())
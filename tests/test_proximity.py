@@ -0,0 +1,39 @@
+"""Focos logo dentro da borda dos anéis de proximidade."""
+
+import pandas as pd
+import pyproj
+import pytest
+import shapely
+
+from queimadas.proximity import distances_km, proximity_rings
+from queimadas.render import filter_near_polygon
+
+DISTANCIAS_KM = (9.8, 9.9, 9.95, 9.99)
+
+
+def _ao_norte_e_ao_sul(poly, distancias_km):
+    """Focos a `distancias_km` de `poly`, ao norte e ao sul do centro."""
+    geod = pyproj.Geod(ellps="WGS84")
+    minx, miny, maxx, maxy = poly.bounds
+    x = (minx + maxx) / 2
+    lon, lat = [], []
+    for d in distancias_km:
+        for y, azimute in ((maxy, 0), (miny, 180)):
+            lon_d, lat_d, _ = geod.fwd(x, y, azimute, d * 1000)
+            lon.append(lon_d)
+            lat.append(lat_d)
+    return pd.DataFrame({"lon": lon, "lat": lat, "frp": 1.0})
+
+
+@pytest.mark.parametrize("lat", [-15.9, 0.0, -33.5])
+def test_focos_na_borda_do_anel(lat):
+    poly = shapely.box(-55, lat - 0.1, -54.9, lat)
+    df = _ao_norte_e_ao_sul(poly, DISTANCIAS_KM)
+
+    distancia = distances_km(poly, df, 10)
+    assert len(distancia) == len(df)
+    assert (distancia <= 10).all()
+
+    aneis = proximity_rings(poly, df).set_index("anel")
+    assert aneis.loc["5–10 km", "focos"] == len(df)
+    assert len(filter_near_polygon(df, poly, 10)) == len(df)
@@ -0,0 +1,85 @@
+"""Cubo das séries temporais: meses gravados com categorias diferentes."""
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from queimadas import rollup
+
+
+@pytest.fixture
+def cubo_dir(tmp_path, monkeypatch):
+    # sem arquivo histórico: os meses vêm só do que o teste grava
+    monkeypatch.setattr(rollup.archive, "complete_months", lambda: {})
+    return tmp_path
+
+
+def _focos(dia, municipios, rng):
+    n = len(municipios)
+    return pd.DataFrame(
+        {
+            "data": pd.Timestamp(dia),
+            "municipio": pd.Categorical(municipios),
+            "estado": pd.Categorical(["MATO GROSSO"] * n),
+            "bioma": pd.Categorical(["Pantanal"] * n),
+            "satelite": pd.Categorical(["AQUA_M-T"] * n),
+            **{m: rng.uniform(0, 50, n).astype("float32") for m in rollup.MEASURES},
+        }
+    )
+
+
+def _grava(cubo_dir, dia, df):
+    rollup._merge_month(cubo_dir, f"{dia:%Y-%m}", rollup.build_rollup(df), [dia])
+    estado = rollup._read_state(cubo_dir)
+    estado["dias"][dia.isoformat()] = "diario:teste"
+    rollup._write_state(cubo_dir, estado)
+
+
+def test_meses_com_poucas_e_muitas_categorias(cubo_dir):
+    rng = np.random.default_rng(0)
+    quieto, movimentado = date(2023, 5, 10), date(2023, 6, 10)
+    _grava(cubo_dir, quieto, _focos(quieto, ["A", "B", "C"], rng))
+    muitos = [f"MUNICÍPIO {i:03d}" for i in range(300)]
+    _grava(cubo_dir, movimentado, _focos(movimentado, muitos, rng))
+
+    cubo, falhas = rollup.load_rollup([quieto, movimentado], rollup_dir=cubo_dir)
+
+    assert falhas == {}
+    assert len(cubo) == 303
+    assert cubo["focos"].sum() == 303
+    assert set(cubo["municipio"]) == {"A", "B", "C", *muitos}
+
+    cubo, _ = rollup.load_rollup(
+        [quieto, movimentado], biomas=["Pantanal"], rollup_dir=cubo_dir
+    )
+    assert len(cubo) == 303
+
+
+def test_dias_que_falharam_esperam_antes_de_nova_tentativa(cubo_dir, monkeypatch):
+    rng = np.random.default_rng(1)
+    bom, ruim = date(2023, 7, 1), date(2023, 7, 2)
+    pedidos = []
+
+    def raw_month(dias, pendentes):
+        pedidos.append(list(dias))
+        df = _focos(bom, ["A"], rng) if bom in dias else pd.DataFrame()
+        return df, {d: "resposta inesperada (404)" for d in dias if d == ruim}
+
+    monkeypatch.setattr(rollup, "_raw_month", raw_month)
+    monkeypatch.setattr(rollup, "_daily_version", lambda dia: "diario:teste")
+
+    falhas = rollup.update_days([bom, ruim], cubo_dir)
+    assert falhas == {ruim: "resposta inesperada (404)"}
+    assert rollup.pending_days([bom, ruim], cubo_dir) == []
+
+    # dentro do prazo: a falha volta sem ir à rede e o mês não é refeito
+    assert rollup.update_days([bom, ruim], cubo_dir) == falhas
+    assert pedidos == [[bom, ruim]]
+
+    # vencido o prazo, o dia é tentado de novo
+    monkeypatch.setattr(rollup.time, "time", lambda: 4e9)
+    assert rollup.pending_days([bom, ruim], cubo_dir) == [ruim]
+    rollup.update_days([bom, ruim], cubo_dir)
+    assert pedidos == [[bom, ruim], [ruim]]
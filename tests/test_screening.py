@@ -0,0 +1,76 @@
+"""Cruzamento com STRtree contra testar cada propriedade com cada foco."""
+
+import numpy as np
+import pandas as pd
+import shapely
+
+from queimadas.screening import screen_properties, screen_properties_by_day
+
+
+def _propriedades(rng, n):
+    centros = rng.uniform([-56, -20], [-54, -18], (n, 2))
+    raios = rng.uniform(0.05, 0.3, n)
+    polys = [shapely.Point(c).buffer(r, quad_segs=4) for c, r in zip(centros, raios)]
+    # uma propriedade com buraco e outra fora de todos os focos
+    polys[0] = polys[0].difference(shapely.Point(centros[0]).buffer(raios[0] / 2))
+    polys[-1] = shapely.box(10, 10, 11, 11)
+    return [f"P{i}" for i in range(n)], polys
+
+
+def _focos(rng, n):
+    frp = rng.gamma(2, 10, n)
+    frp[rng.random(n) < 0.1] = np.nan
+    return pd.DataFrame(
+        {
+            "lon": rng.uniform(-56.5, -53.5, n),
+            "lat": rng.uniform(-20.5, -17.5, n),
+            "frp": frp,
+            "data": pd.Timestamp("2024-09-01")
+            + pd.to_timedelta(rng.integers(0, 3, n), unit="D"),
+        }
+    )
+
+
+def _ingenuo(names, polys, df):
+    linhas = []
+    for nome, poly in zip(names, polys):
+        dentro = df[shapely.contains_xy(poly, df["lon"], df["lat"])]
+        linhas.append(
+            {
+                "nome": nome,
+                "focos": len(dentro),
+                "frp_total": dentro["frp"].sum(),
+                "frp_max": dentro["frp"].max(),
+            }
+        )
+    return pd.DataFrame(linhas)
+
+
+def test_totais_por_propriedade():
+    rng = np.random.default_rng(0)
+    names, polys = _propriedades(rng, 40)
+    df = _focos(rng, 20_000)
+
+    obtido = screen_properties(names, polys, df).set_index("nome").sort_index()
+    esperado = _ingenuo(names, polys, df).set_index("nome").sort_index()
+
+    assert obtido["focos"].sum() > 0
+    pd.testing.assert_frame_equal(obtido, esperado, check_dtype=False)
+
+
+def test_totais_por_dia_e_propriedade():
+    rng = np.random.default_rng(1)
+    names, polys = _propriedades(rng, 15)
+    df = _focos(rng, 5_000)
+
+    obtido = screen_properties_by_day(names, polys, df)
+    esperado = pd.concat(
+        [
+            _ingenuo(names, polys, dia_df).assign(data=dia)
+            for dia, dia_df in df.groupby("data")
+        ],
+        ignore_index=True,
+    )[obtido.columns]
+
+    assert len(obtido) == 3 * len(names)
+    pd.testing.assert_frame_equal(obtido, esperado, check_dtype=False)
@@ -0,0 +1,49 @@
+"""Limites de memória e de disco do armazenamento dos dias."""
+
+import numpy as np
+import pandas as pd
+
+from queimadas.store import ArrowDayStore, FrameCache
+
+
+def _dia(tmp_path, i, n=20_000):
+    path = tmp_path / f"focos_diario_br_2024010{i}.parquet"
+    pd.DataFrame({"frp": np.arange(n, dtype="float64") + i}).to_parquet(path)
+    return path
+
+
+def test_copias_arrow_respeitam_o_limite_de_disco(tmp_path):
+    dias = [_dia(tmp_path, i) for i in range(1, 6)]
+    tamanho = 20_000 * 8
+    store = ArrowDayStore(disk_bytes=int(2.5 * tamanho))
+
+    for path in dias:
+        store.table(path)
+    arrow = sorted(tmp_path.glob("*.arrow"))
+    assert sum(p.stat().st_size for p in arrow) <= store.disk_bytes
+    assert dias[-1].with_suffix(".arrow") in arrow
+    assert dias[0].with_suffix(".arrow") not in arrow
+
+    # um dia apagado do disco volta a ser gerado do Parquet
+    store = ArrowDayStore(disk_bytes=int(2.5 * tamanho))
+    assert store.frame(dias[0])["frp"].iloc[0] == 1
+
+
+def test_frames_limitados_por_bytes():
+    frame = pd.DataFrame({"x": np.zeros(1000)})
+    cache = FrameCache(budget_bytes=int(frame.memory_usage(deep=True).sum() * 2.5))
+    chamadas = []
+
+    def calcular(i):
+        chamadas.append(i)
+        return frame.copy(), {}
+
+    primeiro = cache.get_or_compute(0, lambda: calcular(0))
+    assert cache.get_or_compute(0, lambda: calcular(0)) is primeiro
+    for i in range(1, 4):
+        cache.get_or_compute(i, lambda i=i: calcular(i))
+
+    assert cache.nbytes <= cache.budget_bytes
+    assert cache.stats()["frames"] == 2
+    cache.get_or_compute(0, lambda: calcular(0))
+    assert chamadas == [0, 1, 2, 3, 0]
@@ -0,0 +1,56 @@
+"""Cobertura dos tiles: cada foco cai em exatamente um tile por zoom."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from queimadas.grid import TILE_SIZE
+from queimadas.tiles import KEY_ZOOM, MAX_POINTS, HotspotLayer, mercator
+
+
+def _focos(rng, n):
+    lon = rng.normal(-55, 0.3, n)
+    lat = rng.normal(-12, 0.3, n)
+    # bordas de tiles em todos os zooms, extremos do mapa e sem posição
+    lon[:6] = [0.0, -180.0, 180.0, -90.0, -55.0, np.nan]
+    lat[:6] = [0.0, -90.0, 90.0, 0.0, np.nan, -12.0]
+    return pd.DataFrame({"lon": lon, "lat": lat, "frp": rng.gamma(2, 10, n)})
+
+
+@pytest.mark.parametrize("z", [0, 3, 7, 11, KEY_ZOOM, KEY_ZOOM + 2])
+def test_cada_foco_em_um_tile(z):
+    rng = np.random.default_rng(z)
+    df = _focos(rng, 4_000)
+    camada = HotspotLayer(df, value="frp")
+    validos = df.dropna(subset=["lon", "lat"])
+
+    x, y = mercator(validos["lon"], validos["lat"])
+    lado = 2**z
+    tiles = set(zip((x * lado).astype(int).tolist(), (y * lado).astype(int).tolist()))
+
+    vistos = []
+    contados = 0
+    soma = 0.0
+    for tx, ty in tiles:
+        vistos.append(camada.select(z, tx, ty))
+        dados = camada.tile(z, tx, ty)
+        contados += sum(dados["n"]) if dados["modo"] == "grade" else len(dados["x"])
+        soma += sum(dados["v"])
+        # posições dentro do próprio tile (arredondadas a 0,1 pixel)
+        assert all(0 <= v <= TILE_SIZE for v in dados["x"] + dados["y"])
+
+    idx = np.concatenate(vistos)
+    assert len(idx) == len(np.unique(idx)) == len(validos) == len(camada)
+    assert contados == len(validos)
+    assert soma == pytest.approx(validos["frp"].sum(), rel=1e-3)
+
+
+def test_grade_acima_do_limite_de_pontos():
+    rng = np.random.default_rng(1)
+    df = _focos(rng, 3 * MAX_POINTS)
+    camada = HotspotLayer(df)
+    dados = camada.tile(0, 0, 0)
+    assert dados["modo"] == "grade"
+    assert sum(dados["n"]) == len(camada) == len(df) - 2
+    # sem métrica, cada foco pesa 1
+    assert dados["v"] == [float(n) for n in dados["n"]]